@@ -0,0 +1,62 @@
+"""
+Compression Benchmark
+
+CPU cost vs bytes saved of each encoding of `CompressionMiddleware` at different levels,
+on ~200 KB and ~800 KB JSON list responses. `br` and `zstd` are skipped if `brotli`/ `zstandard` are not installed.
+
+Usage:
+   python benchmarks/compression.py
+"""
+
+import time
+
+from panther.middlewares.compression import COMPRESSORS, compress
+from panther.response import Response
+
+NUMBER = 20
+
+LEVELS = {
+    'gzip': (1, 4, 6, 9),
+    'br': (1, 4, 6, 11),
+    'zstd': (1, 3, 9, 19),
+}
+
+
+def payload(rows: int) -> bytes:
+    data = [
+        {'id': i, 'username': f'user-{i}', 'email': f'user-{i}@example.com', 'is_active': i % 3 == 0, 'score': i * 1.5}
+        for i in range(rows)
+    ]
+    return Response(data=data).body
+
+
+def measure(encoding: str, level: int, body: bytes) -> tuple[float, int]:
+    """Return (ms per response, compressed size)"""
+    compressor_class = COMPRESSORS[encoding]
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        compressed = compress(compressor_class(level), body)
+    return (time.perf_counter() - start) / NUMBER * 1e3, len(compressed)
+
+
+def main():
+    for rows in (2_000, 8_000):
+        body = payload(rows)
+        print(f'\npayload: {len(body) / 1024:.0f} KB')
+        print(f'{"encoding":>8} | {"level":>5} | {"ms / response":>13} | {"size (KB)":>9} | {"saved":>6} | {"MB/s":>7}')
+        for encoding, levels in LEVELS.items():
+            if COMPRESSORS[encoding] is None:
+                print(f'{encoding:>8} | not installed')
+                continue
+            for level in levels:
+                duration, size = measure(encoding=encoding, level=level, body=body)
+                saved = 1 - size / len(body)
+                throughput = len(body) / 1024 / 1024 / (duration / 1e3)
+                print(
+                    f'{encoding:>8} | {level:>5} | {duration:>13.3f} | {size / 1024:>9.1f} | '
+                    f'{saved:>6.1%} | {throughput:>7.1f}',
+                )
+
+
+if __name__ == '__main__':
+    main()
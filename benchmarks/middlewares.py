@@ -0,0 +1,76 @@
+"""
+Middlewares Chain Benchmark
+
+Compares building the global middlewares chain on every request (previous behaviour)
+with the chain which is built once in `Panther.load_middlewares_chain()`, with 5 middlewares.
+
+Usage:
+   python benchmarks/middlewares.py
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from panther.middlewares import HTTPMiddleware
+from panther.response import Response
+
+REQUESTS = 100_000
+
+
+class NoOpMiddleware(HTTPMiddleware):
+    async def __call__(self, request):
+        return await self.dispatch(request=request)
+
+
+MIDDLEWARES = [NoOpMiddleware] * 5
+RESPONSE = Response(data={'detail': 'Hello World'})
+
+
+async def endpoint(request):
+    return RESPONSE
+
+
+async def per_request_chain(request):
+    chained_func = endpoint
+    for middleware in MIDDLEWARES:
+        chained_func = middleware(dispatch=chained_func)
+    return await chained_func(request=request)
+
+
+PRECOMPOSED_CHAIN = endpoint
+for _middleware in MIDDLEWARES:
+    PRECOMPOSED_CHAIN = _middleware(dispatch=PRECOMPOSED_CHAIN)
+
+
+async def precomposed_chain(request):
+    return await PRECOMPOSED_CHAIN(request=request)
+
+
+async def measure(handler) -> tuple[float, float]:
+    """Return (µs per request, transient allocated bytes per request)"""
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await handler(request=None)
+    latency = (time.perf_counter() - start) / REQUESTS
+
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(1_000):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await handler(request=None)
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return latency * 1e6, allocated / 1_000
+
+
+async def main():
+    print(f'{"chain":>12} | {"latency (µs)":>13} | {"allocated bytes / request":>26}')
+    for name, handler in (('per-request', per_request_chain), ('precomposed', precomposed_chain)):
+        latency, allocated = await measure(handler)
+        print(f'{name:>12} | {latency:>13.3f} | {allocated:>26.0f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Request Allocation Benchmark
+
+Compares the per-request allocation & latency of the previous dict-backed `Request` and eager `Headers`
+with the slotted `Request` and lazy `Headers`, on a request with 14 headers which reads 2 of them.
+
+Usage:
+   python benchmarks/request.py
+"""
+
+import time
+import tracemalloc
+
+from panther.request import Request
+
+REQUESTS = 100_000
+
+SCOPE = {
+    'type': 'http',
+    'http_version': '1.1',
+    'method': 'GET',
+    'scheme': 'http',
+    'path': '/api/v1/users/',
+    'query_string': b'',
+    'server': ('127.0.0.1', 8000),
+    'client': ('127.0.0.1', 54321),
+    'headers': [
+        (b'host', b'127.0.0.1:8000'),
+        (b'connection', b'keep-alive'),
+        (b'accept', b'application/json'),
+        (b'accept-encoding', b'gzip, deflate, br'),
+        (b'accept-language', b'en-US,en;q=0.9'),
+        (b'authorization', b'Bearer eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJ1c2VyX2lkIjoxfQ.signature'),
+        (b'cache-control', b'no-cache'),
+        (b'content-type', b'application/json'),
+        (b'origin', b'http://localhost:3000'),
+        (b'pragma', b'no-cache'),
+        (b'referer', b'http://localhost:3000/'),
+        (b'sec-fetch-mode', b'cors'),
+        (b'user-agent', b'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0'),
+        (b'cookie', b'csrftoken=aaa; sessionid=bbb'),
+    ],
+}
+
+
+class LegacyHeaders:
+    """The `Headers` which was used before, it decodes every header on the first read."""
+
+    def __init__(self, headers: list):
+        self.__headers = {header[0].decode('utf-8'): header[1].decode('utf-8') for header in headers}
+        self.__pythonic_headers = {k.lower().replace('-', '_'): v for k, v in self.__headers.items()}
+
+    def __getattr__(self, item: str):
+        if result := self.__pythonic_headers.get(item):
+            return result
+        return self.__headers.get(item)
+
+
+class LegacyRequest:
+    """The dict-backed `Request` which was used before."""
+
+    def __init__(self, scope: dict, receive, send):
+        self._data = ...
+        self.validated_data = None
+        self.scope = scope
+        self.asgi_send = send
+        self.asgi_receive = receive
+        self._headers = None
+        self._params = None
+        self.user = None
+        self.path_variables = None
+
+    @property
+    def headers(self) -> LegacyHeaders:
+        if self._headers is None:
+            self._headers = LegacyHeaders(self.scope['headers'])
+        return self._headers
+
+
+def handle(request_class):
+    request = request_class(scope=SCOPE, receive=None, send=None)
+    request.headers.authorization
+    request.headers.content_type
+    return request
+
+
+def measure(request_class) -> tuple[float, float]:
+    """Return (µs per request, allocated bytes per request)"""
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        handle(request_class)
+    latency = (time.perf_counter() - start) / REQUESTS
+
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(1_000):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        handle(request_class)
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return latency * 1e6, allocated / 1_000
+
+
+def main():
+    print(f'{"request":>8} | {"latency (µs)":>13} | {"allocated bytes / request":>26}')
+    for name, request_class in (('legacy', LegacyRequest), ('slotted', Request)):
+        latency, allocated = measure(request_class)
+        print(f'{name:>8} | {latency:>13.3f} | {allocated:>26.0f}')
+
+
+if __name__ == '__main__':
+    main()
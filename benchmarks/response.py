@@ -0,0 +1,45 @@
+"""
+Response Body Benchmark
+
+Compares rendering `Response.body` on every access (previous behaviour) with the memoized body,
+on a ~1 MB JSON payload which is sent & cached (`bytes_headers`, `send()` and `set_response_in_cache()`).
+
+Usage:
+   python benchmarks/response.py
+"""
+
+import timeit
+
+from panther.response import Response
+
+NUMBER = 100
+
+DATA = [
+    {'id': i, 'username': f'user-{i}', 'email': f'user-{i}@example.com', 'is_active': True, 'score': i * 1.5}
+    for i in range(12_000)
+]
+
+
+class LegacyResponse(Response):
+    @property
+    def body(self) -> bytes:
+        return self.render_body()
+
+
+def send_and_cache(response_class):
+    response = response_class(data=DATA)
+    response.bytes_headers  # `Content-Length` on `http.response.start`
+    response.body  # `http.response.body`
+    response.body  # `set_response_in_cache()`
+
+
+def main():
+    print(f'payload: {len(Response(data=DATA).body) / 1024 / 1024:.2f} MB')
+    print(f'{"body":>9} | {"ms / response":>14}')
+    for name, response_class in (('legacy', LegacyResponse), ('memoized', Response)):
+        duration = timeit.timeit(lambda: send_and_cache(response_class), number=NUMBER) / NUMBER
+        print(f'{name:>9} | {duration * 1e3:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
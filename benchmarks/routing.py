@@ -0,0 +1,140 @@
+"""
+Routing Micro-Benchmark
+
+Compares the compiled router (`panther.routings.find_endpoint()`)
+with the previous dict-walk matcher + `collect_path_variables()` on 10, 100 and 1000 routes.
+
+Usage:
+   python benchmarks/routing.py
+"""
+
+import random
+import timeit
+from collections.abc import Callable
+
+from panther.configs import config
+from panther.routings import finalize_urls, find_endpoint, flatten_urls
+
+ROUTES_COUNTS = (10, 100, 1000)
+NUMBER = 20_000
+
+
+def legacy_find_endpoint(path: str) -> tuple[Callable | None, str]:
+    """The dict-walk matcher which was used before the compiled router."""
+    urls = config.URLS
+
+    parts = path.split('?')[0].strip('/').split('/')
+    paths_len = len(parts)
+
+    found_path = []
+    for i, part in enumerate(parts):
+        last_path = bool((i + 1) == paths_len)
+        found = urls.get(part)
+
+        if last_path:
+            if callable(found):
+                found_path.append(part)
+                return found, '/'.join(found_path)
+
+            if isinstance(found, dict):
+                if (endpoint := found.get('')) and callable(endpoint):
+                    found_path.append(part)
+                    return endpoint, '/'.join(found_path)
+                else:
+                    return None, ''
+
+            for key, value in urls.items():
+                if key.startswith('<'):
+                    if callable(value):
+                        found_path.append(key)
+                        return value, '/'.join(found_path)
+
+                    elif isinstance(value, dict) and (endpoint := value.get('')):
+                        if callable(endpoint):
+                            found_path.append(key)
+                            return endpoint, '/'.join(found_path)
+                        else:
+                            return None, ''
+
+            return None, ''
+
+        elif isinstance(found, dict):
+            found_path.append(part)
+            urls = found
+            continue
+
+        elif callable(found):
+            return None, ''
+
+        else:
+            for key, value in urls.items():
+                if key.startswith('<') and isinstance(value, dict):
+                    found_path.append(key)
+                    urls = value
+                    break
+            else:
+                return None, ''
+
+
+def legacy_resolve(path: str) -> tuple[Callable | None, dict]:
+    """The previous flow, `find_endpoint()` then `BaseRequest.collect_path_variables()`"""
+    endpoint, found_path = legacy_find_endpoint(path)
+    path_variables = {
+        variable.strip('< >'): value
+        for variable, value in zip(found_path.strip('/').split('/'), path.split('?')[0].strip('/').split('/'))
+        if variable.startswith('<')
+    }
+    return endpoint, path_variables
+
+
+def endpoint():
+    pass
+
+
+def generate_urls(count: int) -> dict:
+    """Every group has 5 routes, half of them with path variables."""
+    urls = {}
+    for i in range(count // 5):
+        urls[f'api/v1/resource{i}/'] = endpoint
+        urls[f'api/v1/resource{i}/<id>/'] = endpoint
+        urls[f'api/v1/resource{i}/<id>/detail/'] = endpoint
+        urls[f'api/v1/resource{i}/<id>/comments/<comment_id>/'] = endpoint
+        urls[f'api/v1/resource{i}/search/'] = endpoint
+    return urls
+
+
+def generate_paths(count: int) -> list[str]:
+    paths = []
+    for _ in range(100):
+        i = random.randrange(count // 5)
+        paths += [
+            f'/api/v1/resource{i}/',
+            f'/api/v1/resource{i}/{random.randint(1, 1000)}/',
+            f'/api/v1/resource{i}/{random.randint(1, 1000)}/detail/',
+            f'/api/v1/resource{i}/{random.randint(1, 1000)}/comments/{random.randint(1, 1000)}/',
+            f'/api/v1/resource{i}/search/?q=panther',
+            f'/api/v1/not-found{i}/',  # Miss
+        ]
+    return paths
+
+
+def main():
+    print(f'{"routes":>8} | {"legacy (µs)":>12} | {"compiled (µs)":>14} | {"speedup":>8}')
+    for count in ROUTES_COUNTS:
+        config.URLS = finalize_urls(flatten_urls(generate_urls(count)))
+        paths = generate_paths(count)
+
+        for path in paths:
+            assert find_endpoint(path) == legacy_resolve(path), path
+
+        def run(matcher):
+            for path in paths:
+                matcher(path)
+
+        legacy = timeit.timeit(lambda: run(legacy_resolve), number=NUMBER // 100) / (NUMBER // 100 * len(paths))
+        compiled = timeit.timeit(lambda: run(find_endpoint), number=NUMBER // 100) / (NUMBER // 100 * len(paths))
+        print(f'{count:>8} | {legacy * 1e6:>12.3f} | {compiled * 1e6:>14.3f} | {legacy / compiled:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
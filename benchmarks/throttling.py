@@ -0,0 +1,80 @@
+"""
+Throttling Benchmark
+
+Per-request overhead of `check_and_increment()` of each throttling strategy (`Throttle`, `SlidingWindow`,
+`TokenBucket` and `LeasedThrottle`), with the in-memory storage and with `fakeredis` (if it is installed,
+it has no network latency, so it only shows the client-side cost of the commands of each strategy).
+
+Usage:
+   python benchmarks/throttling.py
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from panther.exceptions import ThrottlingAPIError
+from panther.throttling import LeasedThrottle, SlidingWindow, Throttle, TokenBucket, _fallback_throttle_storage
+
+try:
+    from fakeredis import FakeAsyncRedis
+except ImportError:
+    FakeAsyncRedis = None
+
+NUMBER = 20_000
+CLIENTS = 100
+
+STRATEGIES = {
+    'Throttle': Throttle(rate=100, duration=timedelta(seconds=1)),
+    'SlidingWindow': SlidingWindow(rate=100, duration=timedelta(seconds=1)),
+    'TokenBucket': TokenBucket(rate=100, duration=timedelta(seconds=1), burst=20),
+    'LeasedThrottle': LeasedThrottle(rate=100, duration=timedelta(seconds=1), lease=10),
+}
+
+
+class Client:
+    def __init__(self, ip: str):
+        self.ip = ip
+
+
+class Request:
+    def __init__(self, ip: str):
+        self.user = None
+        self.client = Client(ip)
+        self.path = '/api/users/'
+
+
+async def measure(throttling: Throttle, number: int) -> tuple[float, int]:
+    """Return (µs per request, rejected requests)"""
+    requests = [Request(ip=f'10.0.0.{i}') for i in range(CLIENTS)]
+    rejected = 0
+    start = time.perf_counter()
+    for i in range(number):
+        try:
+            await throttling.check_and_increment(request=requests[i % CLIENTS])
+        except ThrottlingAPIError:
+            rejected += 1
+    return (time.perf_counter() - start) / number * 1e6, rejected
+
+
+async def main():
+    print(f'{"strategy":>14} | {"storage":>9} | {"µs / request":>12} | {"rejected":>8}')
+    for name, throttling in STRATEGIES.items():
+        _fallback_throttle_storage.clear()
+        duration, rejected = await measure(throttling=throttling, number=NUMBER)
+        print(f'{name:>14} | {"memory":>9} | {duration:>12.2f} | {rejected:>8}')
+
+        if FakeAsyncRedis is None:
+            print(f'{name:>14} | fakeredis is not installed')
+            continue
+        redis = FakeAsyncRedis()
+        redis.is_connected = True
+        with patch('panther.throttling.redis', redis):
+            duration, rejected = await measure(throttling=throttling, number=NUMBER // 10)
+        print(f'{name:>14} | {"fakeredis":>9} | {duration:>12.2f} | {rejected:>8}')
+        await redis.aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
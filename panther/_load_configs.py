@@ -19,22 +19,29 @@ from panther.exceptions import PantherError
 from panther.middlewares.base import HTTPMiddleware, WebsocketMiddleware
 from panther.middlewares.monitoring import MonitoringMiddleware, WebsocketMonitoringMiddleware
 from panther.panel.views import HomeView
-from panther.routings import finalize_urls, flatten_urls
+from panther.routings import finalize_urls, flatten_urls, is_mount, refresh_router
 
 __all__ = (
     'check_endpoints_inheritance',
     'load_authentication_class',
     'load_auto_reformat',
     'load_background_tasks',
+    'load_cache_l1',
+    'load_cache_max_entries',
+    'load_cache_max_size',
     'load_configs_module',
     'load_database',
+    'load_etag',
     'load_log_queries',
+    'load_max_body_size',
     'load_middlewares',
     'load_other_configs',
     'load_redis',
+    'load_route_cache_size',
     'load_secret_key',
     'load_templates_dir',
     'load_throttling',
+    'load_throttling_storage',
     'load_timezone',
     'load_urls',
     'load_user_model',
@@ -203,6 +210,61 @@ def load_middlewares(_configs: dict, /) -> None:
         config.WS_MIDDLEWARES.insert(0, middleware)
 
 
+def load_route_cache_size(_configs: dict, /) -> None:
+    if route_cache_size := _configs.get('ROUTE_CACHE_SIZE'):
+        if not isinstance(route_cache_size, int) or route_cache_size < 0:
+            raise _exception_handler(field='ROUTE_CACHE_SIZE', error='should be a positive integer.')
+        config.ROUTE_CACHE_SIZE = route_cache_size
+
+
+def load_max_body_size(_configs: dict, /) -> None:
+    if max_body_size := _configs.get('MAX_BODY_SIZE'):
+        if not isinstance(max_body_size, int) or max_body_size < 0:
+            raise _exception_handler(field='MAX_BODY_SIZE', error='should be a positive integer.')
+        config.MAX_BODY_SIZE = max_body_size
+
+
+def load_cache_max_entries(_configs: dict, /) -> None:
+    if (cache_max_entries := _configs.get('CACHE_MAX_ENTRIES')) is not None:
+        if not isinstance(cache_max_entries, int) or cache_max_entries < 0:
+            raise _exception_handler(field='CACHE_MAX_ENTRIES', error='should be a positive integer.')
+        config.CACHE_MAX_ENTRIES = cache_max_entries
+
+
+def load_cache_max_size(_configs: dict, /) -> None:
+    if (cache_max_size := _configs.get('CACHE_MAX_SIZE')) is not None:
+        if not isinstance(cache_max_size, int) or cache_max_size < 0:
+            raise _exception_handler(field='CACHE_MAX_SIZE', error='should be a positive integer.')
+        config.CACHE_MAX_SIZE = cache_max_size
+
+
+def load_cache_l1(_configs: dict, /) -> None:
+    if (cache_l1_size := _configs.get('CACHE_L1_SIZE')) is not None:
+        if not isinstance(cache_l1_size, int) or cache_l1_size < 0:
+            raise _exception_handler(field='CACHE_L1_SIZE', error='should be a positive integer.')
+        config.CACHE_L1_SIZE = cache_l1_size
+
+    if _configs.get('CACHE_L1_INVALIDATION'):
+        config.CACHE_L1_INVALIDATION = True
+
+
+def load_throttling_storage(_configs: dict, /) -> None:
+    if (throttling_max_keys := _configs.get('THROTTLING_MAX_KEYS')) is not None:
+        if not isinstance(throttling_max_keys, int) or throttling_max_keys < 0:
+            raise _exception_handler(field='THROTTLING_MAX_KEYS', error='should be a positive integer.')
+        config.THROTTLING_MAX_KEYS = throttling_max_keys
+
+    if _configs.get('THROTTLING_SHARED_MEMORY'):
+        if sys.platform == 'win32':
+            raise _exception_handler(field='THROTTLING_SHARED_MEMORY', error='is not supported on Windows.')
+        config.THROTTLING_SHARED_MEMORY = True
+
+
+def load_etag(_configs: dict, /) -> None:
+    if _configs.get('ETAG'):
+        config.ETAG = True
+
+
 def load_auto_reformat(_configs: dict, /) -> None:
     if _configs.get('AUTO_REFORMAT'):
         config.AUTO_REFORMAT = True
@@ -252,6 +314,7 @@ def load_urls(_configs: dict, /, urls: dict | None) -> None:
 
     config.FLAT_URLS = flatten_urls(urls)
     config.URLS = finalize_urls(config.FLAT_URLS)
+    refresh_router()
 
 
 def load_authentication_class(_configs: dict, /) -> None:
@@ -309,6 +372,8 @@ def check_endpoints_inheritance():
 
         if isinstance(endpoint, types.FunctionType):
             check_function_type_endpoint(endpoint=endpoint)
+        elif is_mount(endpoint):
+            continue
         else:
             check_class_type_endpoint(endpoint=endpoint)
 
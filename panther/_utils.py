@@ -5,6 +5,7 @@ import logging
 import mimetypes
 import re
 import subprocess
+import tempfile
 import traceback
 import types
 from collections.abc import AsyncGenerator, Callable, Generator, Iterator
@@ -21,6 +22,7 @@ logger = logging.getLogger('panther')
 ENDPOINT_FUNCTION_BASED_API = 0
 ENDPOINT_CLASS_BASED_API = 1
 ENDPOINT_WEBSOCKET = 2
+ENDPOINT_STATIC_FILES = 3
 
 
 def import_class(dotted_path: str, /) -> type[Any]:
@@ -36,60 +38,203 @@ def import_class(dotted_path: str, /) -> type[Any]:
     return getattr(module, name)
 
 
-NEWLINE_CRLF = b'\r\n'  # Windows-style
-NEWLINE_LF = b'\n'  # Unix/Linux-style
+MULTIPART_SPOOL_SIZE = 1024 * 1024  # File parts bigger than this are spooled to a temporary file
+MULTIPART_MAX_HEADERS_SIZE = 16 * 1024
+DISPOSITION_NAME_PATTERN = re.compile(rb'(?:^|;)\s*name="([^"]*)"')
+DISPOSITION_FILENAME_PATTERN = re.compile(rb'(?:^|;)\s*filename="([^"]*)"')
 
-# Regex patterns for CRLF (Windows)
-FIELD_PATTERN_CRLF = re.compile(rb'Content-Disposition: form-data; name="(.*)"\r\n\r\n(.*)', flags=re.DOTALL)
-FILE_PATTERN_CRLF = re.compile(rb'Content-Disposition: form-data; name="(.*)"; filename="(.*)"\r\nContent-Type: (.*)')
-
-# Regex patterns for LF (Linux)
-FIELD_PATTERN_LF = re.compile(rb'Content-Disposition: form-data; name="(.*)"\n\n(.*)', flags=re.DOTALL)
-FILE_PATTERN_LF = re.compile(rb'Content-Disposition: form-data; name="(.*)"; filename="(.*)"\nContent-Type: (.*)')
 
+class MultipartParser:
+    """
+    Incremental `multipart/form-data` parser, it is fed chunk by chunk (e.g. from `request.stream()`).
+        Fields are kept in memory, file parts are kept in memory until they get bigger than `spool_size`,
+        then they are spooled to a temporary file, so the memory usage stays bounded.
+    `feed()` doesn't write to the disk, the spooled content is written by `flush()`, `feed_async()` calls it
+        in a thread whenever `spool_size` bytes are pending, so the uploads don't block the event loop.
 
-def read_multipart_form_data(boundary: str, body: bytes) -> dict:
-    boundary_bytes = b'--' + boundary.encode()
+    Both `\r\n` & `\n` newlines are supported.
+    """
 
-    # Choose newline type and corresponding patterns
-    if body.endswith(NEWLINE_CRLF):
-        newline = NEWLINE_CRLF
-        field_pattern = FIELD_PATTERN_CRLF
-        file_pattern = FILE_PATTERN_CRLF
-    else:
-        newline = NEWLINE_LF
-        field_pattern = FIELD_PATTERN_LF
-        file_pattern = FILE_PATTERN_LF
+    PREAMBLE, DELIMITER, HEADERS, BODY, END = range(5)
+
+    def __init__(self, boundary: str, spool_size: int = MULTIPART_SPOOL_SIZE):
+        self.delimiter = b'--' + boundary.encode()
+        self.spool_size = spool_size
+        self.newline = b'\r\n'
+        self.buffer = bytearray()
+        self.state = self.PREAMBLE
+        self.data = {}
+        # Current part
+        self.name = None
+        self.file_name = None
+        self.content_type = None
+        self.content = bytearray()
+        self.temporary_file = None
+        self.pending = bytearray()  # Content of `temporary_file` which has not been written yet
+        self.spooled = []  # (temporary_file, pending) of the finished parts which have not been written yet
+
+    async def feed_async(self, chunk: bytes) -> None:
+        self.feed(chunk)
+        if self.spooled or len(self.pending) >= self.spool_size:
+            await asyncio.to_thread(self.flush)
+
+    async def finish_async(self) -> dict:
+        if self.spooled or self.pending:
+            await asyncio.to_thread(self.flush)
+        return self.finish()
+
+    def flush(self) -> None:
+        """Write the pending content of the spooled file parts to their temporary files"""
+        for temporary_file, pending in self.spooled:
+            temporary_file.write(pending)
+            temporary_file.close()
+        self.spooled = []
+        if self.pending:
+            self.temporary_file.write(self.pending)
+            self.pending = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        while self.state != self.END:
+            if self.state == self.PREAMBLE:
+                if (index := self.buffer.find(self.delimiter)) == -1:
+                    del self.buffer[: -len(self.delimiter)]
+                    return
+                del self.buffer[: index + len(self.delimiter)]
+                self.state = self.DELIMITER
+
+            elif self.state == self.DELIMITER:
+                if len(self.buffer) < 2:
+                    return
+                if self.buffer.startswith(b'--'):
+                    self.state = self.END
+                elif self.buffer.startswith(b'\r\n'):
+                    self.newline = b'\r\n'
+                    del self.buffer[:2]
+                    self.state = self.HEADERS
+                elif self.buffer.startswith(b'\n'):
+                    self.newline = b'\n'
+                    del self.buffer[:1]
+                    self.state = self.HEADERS
+                else:
+                    logger.error('Malformed multipart body.')
+                    self.state = self.END
+
+            elif self.state == self.HEADERS:
+                if (index := self.buffer.find(2 * self.newline)) == -1:
+                    if len(self.buffer) > MULTIPART_MAX_HEADERS_SIZE:
+                        logger.error('Multipart headers are too large.')
+                        self.state = self.END
+                    return
+                self.start_part(headers=bytes(self.buffer[:index]))
+                del self.buffer[: index + 2 * len(self.newline)]
+                self.state = self.BODY
+
+            elif self.state == self.BODY:
+                end = self.newline + self.delimiter
+                if (index := self.buffer.find(end)) == -1:
+                    # Keep the tail, it may be the beginning of the delimiter
+                    if (safe := len(self.buffer) - len(end) + 1) > 0:
+                        self.write_part(self.buffer[:safe])
+                        del self.buffer[:safe]
+                    return
+                self.write_part(self.buffer[:index])
+                del self.buffer[: index + len(end)]
+                self.finish_part()
+                self.state = self.DELIMITER
+
+    def start_part(self, headers: bytes) -> None:
+        self.name = self.file_name = self.content_type = None
+        for line in headers.split(self.newline):
+            key, _, value = line.partition(b':')
+            match key.strip().lower():
+                case b'content-disposition':
+                    if match := DISPOSITION_NAME_PATTERN.search(value):
+                        self.name = match.group(1).decode('utf-8')
+                    if match := DISPOSITION_FILENAME_PATTERN.search(value):
+                        self.file_name = match.group(1).decode('utf-8')
+                case b'content-type':
+                    self.content_type = value.strip().decode('utf-8')
+
+    def write_part(self, content: bytes | bytearray) -> None:
+        if self.temporary_file:
+            self.pending += content
+            return
+
+        self.content += content
+        if self.file_name is not None and len(self.content) > self.spool_size:
+            self.temporary_file = tempfile.NamedTemporaryFile(prefix='panther-', delete=False)
+            self.pending = self.content
+            self.content = bytearray()
+
+    def finish_part(self) -> None:
+        if self.name is None:
+            logger.error('Unrecognized multipart format')
+        elif self.file_name is None:
+            self.data[self.name] = self.content.decode('utf-8')
+        elif self.temporary_file:
+            self.spooled.append((self.temporary_file, self.pending))
+            self.pending = bytearray()
+            self.data[self.name] = File.from_temporary_file(
+                path=self.temporary_file.name,
+                file_name=self.file_name,
+                content_type=self.content_type or 'application/octet-stream',
+            )
+        else:
+            self.data[self.name] = File(
+                file_name=self.file_name,
+                content_type=self.content_type or 'application/octet-stream',
+                file=bytes(self.content),
+            )
+        self.content = bytearray()
+        self.temporary_file = None
+
+    def finish(self) -> dict:
+        if self.state != self.END:
+            logger.error('Malformed multipart body, it is not terminated.')
+            self.remove_temporary_file()
+        self.flush()
+        return self.data
+
+    def abort(self) -> None:
+        """Close & remove the temporary files of the current part and the finished parts (e.g. on `413`)"""
+        self.remove_temporary_file()
+        for temporary_file, _ in self.spooled:
+            temporary_file.close()
+        self.spooled = []
+        for value in self.data.values():
+            if isinstance(value, File) and value._finalizer:
+                value._finalizer()
+        self.data = {}
+        self.state = self.END
+
+    def remove_temporary_file(self) -> None:
+        if self.temporary_file:
+            self.temporary_file.close()
+            Path(self.temporary_file.name).unlink(missing_ok=True)
+            self.temporary_file = None
+            self.pending = bytearray()
 
-    data = {}
-    for part in body.split(boundary_bytes):
-        part = part.removeprefix(newline).removesuffix(newline)
 
-        if part in (b'', b'--'):
-            continue
+def read_multipart_form_data(boundary: str, body: bytes) -> dict:
+    parser = MultipartParser(boundary=boundary)
+    parser.feed(body)
+    return parser.finish()
 
-        if match := field_pattern.match(string=part):
-            field_name, value = match.groups()
-            data[field_name.decode('utf-8')] = value.decode('utf-8')
-            continue
 
+def accepted_encodings(accept_encoding: str | None) -> set[str]:
+    """'gzip, br;q=0.8, zstd;q=0' --> {'gzip', 'br'}"""
+    encodings = set()
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.partition(';')
         try:
-            headers, file_content = part.split(2 * newline, 1)
+            if params and float(params.replace(' ', '').removeprefix('q=')) == 0:
+                continue  # `q=0` means "not acceptable"
         except ValueError:
-            logger.error('Malformed part, skipping.')
-            continue
-
-        if match := file_pattern.match(string=headers):
-            field_name, file_name, content_type = match.groups()
-            data[field_name.decode('utf-8')] = File(
-                file_name=file_name.decode('utf-8'),
-                content_type=content_type.decode('utf-8'),
-                file=file_content,
-            )
-        else:
-            logger.error('Unrecognized multipart format')
-
-    return data
+            pass
+        if name := name.strip().lower():
+            encodings.add(name)
+    return encodings
 
 
 def is_function_async(func: Callable) -> bool:
@@ -368,7 +513,7 @@ def detect_mime_type(file_path: str | Path) -> str:
         pass
 
     # Custom mapping fallback
-    if (ext := file_path.rsplit('.', maxsplit=1)[1].lower()) in CUSTOM_MIME_TYPES:
+    if (ext := Path(file_path).suffix[1:].lower()) in CUSTOM_MIME_TYPES:
         return CUSTOM_MIME_TYPES[ext]
 
     # Fallback if no match
@@ -6,6 +6,7 @@ from collections.abc import Callable
 from datetime import timedelta
 from typing import Literal
 
+import orjson as json
 from pydantic import BaseModel
 
 from panther._utils import (
@@ -17,19 +18,25 @@ from panther._utils import (
     validate_api_permissions,
 )
 from panther.base_request import BaseRequest
-from panther.caching import (
-    get_response_from_cache,
-    set_response_in_cache,
-)
-from panther.configs import config
+from panther.caching import CachedResponse, CachePolicy, get_or_set_response_in_cache
+from panther.configs import PipelineObservable, config
 from panther.exceptions import (
     AuthorizationAPIError,
     MethodNotAllowedAPIError,
+    PantherError,
 )
 from panther.middlewares import HTTPMiddleware
 from panther.openapi import OutputSchema
 from panther.request import Request
-from panther.response import Response
+from panther.response import (
+    ENCODED_HEADERS,
+    FileResponse,
+    NotModifiedResponse,
+    Response,
+    StreamingResponse,
+    generate_etag,
+    is_etag_matched,
+)
 from panther.serializer import ModelSerializer
 from panther.throttling import Throttle
 
@@ -50,8 +57,20 @@ class API:
         `panther.exceptions.AuthenticationAPIError`.
     permissions: List of permissions that will be called sequentially after authentication to authorize the user.
     throttling: It will limit the users' request on a specific (time-window, path)
-    cache: Specify the duration of the cache (Will be used only in GET requests).
+    cache: Specify the duration of the cache (Will be used only in GET requests), or a `panther.caching.CachePolicy`
+        to share it between the users or choose which query params & headers make a different response.
+        When it is expired, only one of the concurrent requests calls the endpoint and the others wait for its response.
+    stale_while_revalidate: Serve the expired cache for this long while one request refreshes it in the background.
     middlewares: These middlewares have inner priority than global middlewares.
+    etag: Set the `ETag` of the GET responses (a hash of their body) and return a bodiless `304 Not Modified`
+        if it matches the `If-None-Match` of the request, it can be enabled globally with `ETAG = True` in configs.
+        With `cache`, the `ETag` is cached with the response, so a revalidation costs neither serialization nor hashing.
+    stream: The body is not read before calling the endpoint, so it can receive it chunk by chunk with
+        `request.stream()`, it can't have `input_model`.
+    fast: Serve the endpoint on the fast path, it can't have any of the above features (except `methods`),
+        and if there are no global middlewares the endpoint is called directly and its `dict` result
+        is sent without creating a `Response`. Useful for health-check, ping, feature-flag, ... endpoints.
+        If there is a global `AUTHENTICATION` or `THROTTLING`, it is served on the normal path (with them).
     """
 
     func: Callable
@@ -66,8 +85,12 @@ class API:
         auth: Callable | None = None,
         permissions: list[Callable] | Callable | None = None,
         throttling: Throttle | None = None,
-        cache: timedelta | None = None,
+        cache: timedelta | CachePolicy | None = None,
+        stale_while_revalidate: timedelta | None = None,
         middlewares: list[type[HTTPMiddleware]] | None = None,
+        etag: bool = False,
+        stream: bool = False,
+        fast: bool = False,
         **kwargs,
     ):
         self.methods = {m.upper() for m in methods} if methods else {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
@@ -80,12 +103,37 @@ class API:
             self.permissions = [self.permissions]
         self.throttling = throttling
         self.cache = cache
+        self.cache_policy = CachePolicy(duration=cache) if isinstance(cache, timedelta) else cache
+        self.stale_while_revalidate = stale_while_revalidate
         self.middlewares = middlewares
-        self.request: Request | None = None
+        self.etag = etag
+        self.stream = stream
+        self.fast = fast
+        if self.fast and (
+            auth or permissions or throttling or cache or input_model or output_model or middlewares or etag
+        ):
+            msg = (
+                '`fast` API can not have `auth`, `permissions`, `throttling`, `cache`, '
+                '`input_model`, `output_model`, `middlewares` or `etag`.'
+            )
+            logger.error(msg)
+            raise PantherError(msg)
+        if self.stream and self.input_model:
+            msg = '`stream` API can not have `input_model`.'
+            logger.error(msg)
+            raise PantherError(msg)
+        if self.stale_while_revalidate and not self.cache:
+            msg = '`stale_while_revalidate` needs `cache`.'
+            logger.error(msg)
+            raise PantherError(msg)
         if self.auth is not None:
             validate_api_auth(self.auth)
         validate_api_permissions(self.permissions)
-        check_api_deprecations(self.cache, **kwargs)
+        check_api_deprecations(self.cache.duration if isinstance(cache, CachePolicy) else self.cache, **kwargs)
+        self._etag = False  # It's been set in self.compile_pipeline(), `fast` endpoints never set it
+        self._fast = False  # It's been set in self.compile_pipeline()
+        self.pipeline: Callable | None = None  # It's been set in self.compile_pipeline()
+        PipelineObservable.observe(self)
 
     def __call__(self, func):
         self.func = func
@@ -93,73 +141,172 @@ class API:
         self.function_annotations = {
             k: v for k, v in func.__annotations__.items() if v in {BaseRequest, Request, bool, int}
         }
+        # The body is only read if the endpoint or its `input_model` is going to use it,
+        #   `stream` endpoints are going to read it themselves with `request.stream()`.
+        self.needs_body = not self.stream and (
+            bool(self.input_model) or any(v in {BaseRequest, Request} for v in self.function_annotations.values())
+        )
 
         @functools.wraps(func)
         async def wrapper(request: Request) -> Response:
-            chained_func = self.handle_endpoint
-            if self.middlewares:
-                for middleware in reversed(self.middlewares):
-                    chained_func = middleware(chained_func)
-            return await chained_func(request=request)
+            if self.pipeline is None:
+                self.compile_pipeline()
+            return await self.pipeline(request=request)
 
         # Store attributes on the function, so have the same behaviour as class-based (useful in `openapi.view.OpenAPI`)
         wrapper.auth = self.auth
         wrapper.cache = self.cache
+        wrapper.stale_while_revalidate = self.stale_while_revalidate
         wrapper.methods = self.methods
         wrapper.throttling = self.throttling
         wrapper.permissions = self.permissions
         wrapper.middlewares = self.middlewares
+        wrapper.etag = self.etag
+        wrapper.stream = self.stream
         wrapper.input_model = self.input_model
         wrapper.output_model = self.output_model
         wrapper.output_schema = self.output_schema
+        wrapper.fast_handler = self.handle_fast_endpoint if self.fast else None
         wrapper._endpoint_type = ENDPOINT_FUNCTION_BASED_API
         return wrapper
 
-    async def handle_endpoint(self, request: Request) -> Response:
-        self.request = request
+    def compile_pipeline(self) -> None:
+        """
+        Resolve everything which doesn't change between requests once,
+            auth & permissions instances, throttling, etag and the middlewares chain.
+        It will be compiled again (on the next request) whenever
+            `config.AUTHENTICATION`, `config.THROTTLING` or `config.ETAG` changes.
+        """
+        auth = self.auth or config.AUTHENTICATION
+        self._auth = auth() if inspect.isclass(auth) else auth
+        self._permissions = [perm() if inspect.isclass(perm) else perm for perm in self.permissions or []]
+        self._throttling = self.throttling or config.THROTTLING
+        self._etag = not self.fast and (self.etag or config.ETAG)
+        # The global auth & throttling are not skipped, a `fast` endpoint is not made public silently.
+        self._fast = self.fast and not (self._auth or self._throttling)
+
+        if (
+            self._auth
+            or self._permissions
+            or self._throttling
+            or self._etag
+            or self.cache
+            or self.input_model
+            or self.output_model
+        ):
+            pipeline = self.handle_endpoint
+        else:
+            pipeline = self.handle_simple_endpoint
+
+        for middleware in reversed(self.middlewares or []):
+            pipeline = middleware(pipeline)
+        self.pipeline = pipeline
+
+    def reset_pipeline(self) -> None:
+        self.pipeline = None
+
+    async def handle_simple_endpoint(self, request: Request) -> Response:
+        """Same as `handle_endpoint()`, for endpoints without auth, permissions, throttling, cache & models"""
+        if request.method not in self.methods:
+            raise MethodNotAllowedAPIError
+
+        if self.needs_body:
+            await request.read_body()
+        return await self.call_endpoint(request=request)
+
+    async def handle_fast_endpoint(self, request: Request, send: Callable) -> Response | None:
+        """
+        Called directly by `Panther.handle_http()` when there are no global middlewares,
+            a `dict` result is sent right away (returns `None`), anything else is returned as a `Response`.
+        """
+        if self.pipeline is None:
+            self.compile_pipeline()
+        if not self._fast:
+            # Global `AUTHENTICATION` or `THROTTLING`
+            return await self.pipeline(request=request)
+
+        if request.method not in self.methods:
+            raise MethodNotAllowedAPIError
+
+        if self.needs_body:
+            await request.read_body()
+        response = await self.call_function(request=request)
+
+        if type(response) is dict:
+            body = json.dumps(response)
+            await send(
+                {
+                    'type': 'http.response.start',
+                    'status': 200,
+                    'headers': [
+                        (b'Content-Length', str(len(body)).encode()),
+                        ENCODED_HEADERS[('Content-Type', 'application/json')],
+                    ],
+                },
+            )
+            await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+            return None
+
+        return await self.clean_response(request=request, response=response)
 
+    async def handle_endpoint(self, request: Request) -> Response:
         # 1. Check Method
-        if self.request.method not in self.methods:
+        if request.method not in self.methods:
             raise MethodNotAllowedAPIError
 
         # 2. Authentication
-        if self.auth or config.AUTHENTICATION:
-            auth = self.auth or config.AUTHENTICATION
-            if inspect.isclass(auth):
-                auth = auth()
-            self.request.user = await auth(self.request)
+        if self._auth:
+            request.user = await self._auth(request)
 
         # 3. Permissions
-        if self.permissions:
-            for perm in self.permissions:
-                if inspect.isclass(perm):
-                    perm = perm()
-                if await perm(self.request) is False:
-                    raise AuthorizationAPIError
+        for perm in self._permissions:
+            if await perm(request) is False:
+                raise AuthorizationAPIError
 
         # 4. Throttle
-        if self.throttling or config.THROTTLING:
-            throttling = self.throttling or config.THROTTLING
-            await throttling.check_and_increment(request=self.request)
+        if self._throttling:
+            await self._throttling.check_and_increment(request=request)
+
+        # 5. Read Body & Validate Input
+        if self.needs_body:
+            await request.read_body()
+        if self.input_model and request.method in {'POST', 'PUT', 'PATCH'}:
+            request.validate_data(model=self.input_model)
+
+        # 6. Get Cached Response Or Call The Endpoint (Once For The Concurrent Requests) And Cache Its Response
+        if self.cache and request.method == 'GET':
+            response = await get_or_set_response_in_cache(
+                request=request,
+                policy=self.cache_policy,
+                call_endpoint=functools.partial(self.call_endpoint, request=request),
+                stale_while_revalidate=self.stale_while_revalidate,
+            )
+            if isinstance(response, CachedResponse):
+                response = Response(data=response.data, headers=response.headers, status_code=response.status_code)
+        else:
+            response = await self.call_endpoint(request=request)
+
+        # 11. Not Modified
+        etag = self._etag and response.headers.get('ETag')
+        if etag and is_etag_matched(if_none_match=request.headers.if_none_match, etag=etag):
+            return NotModifiedResponse.from_response(response)
 
-        # 5. Validate Input
-        if self.input_model and self.request.method in {'POST', 'PUT', 'PATCH'}:
-            self.request.validate_data(model=self.input_model)
+        return response
 
-        # 6. Get Cached Response
-        if self.cache and self.request.method == 'GET':
-            if cached := await get_response_from_cache(request=self.request, duration=self.cache):
-                return Response(data=cached.data, headers=cached.headers, status_code=cached.status_code)
+    async def call_endpoint(self, request: Request) -> Response:
+        response = await self.call_function(request=request)
+        return await self.clean_response(request=request, response=response)
 
+    async def call_function(self, request: Request) -> typing.Any:
         # 7. Put PathVariables and Request(If User Wants It) In kwargs
-        kwargs = self.request.clean_parameters(self.function_annotations)
+        kwargs = request.clean_parameters(self.function_annotations)
 
         # 8. Call Endpoint
         if self.is_function_async:
-            response = await self.func(**kwargs)
-        else:
-            response = self.func(**kwargs)
+            return await self.func(**kwargs)
+        return self.func(**kwargs)
 
+    async def clean_response(self, request: Request, response: typing.Any) -> Response:
         # 9. Clean Response
         if not isinstance(response, Response):
             response = Response(data=response)
@@ -168,10 +315,14 @@ class API:
         if response.pagination:
             response.data = await response.pagination.template(response.data)
 
-        # 10. Set New Response To Cache
-        if self.cache and self.request.method == 'GET':
-            await set_response_in_cache(request=self.request, response=response, duration=self.cache)
-
+        # 10. Set ETag
+        if (
+            self._etag
+            and request.method == 'GET'
+            and response.status_code == 200
+            and not isinstance(response, (StreamingResponse, FileResponse))
+        ):
+            response.headers['ETag'] = generate_etag(response.body)
         return response
 
 
@@ -181,6 +332,7 @@ class GenericAPI:
     """
 
     _endpoint_type = ENDPOINT_CLASS_BASED_API
+    _handlers: dict[str, Callable] = {}  # It's been set in __init_subclass__()
 
     input_model: type[ModelSerializer] | type[BaseModel] | None = None
     output_model: type[ModelSerializer] | type[BaseModel] | None = None
@@ -188,14 +340,29 @@ class GenericAPI:
     auth: Callable | None = None
     permissions: list[Callable] | Callable | None = None
     throttling: Throttle | None = None
-    cache: timedelta | None = None
+    cache: timedelta | CachePolicy | None = None
+    stale_while_revalidate: timedelta | None = None
     middlewares: list[HTTPMiddleware] | None = None
+    etag: bool = False
+    stream: bool = False
 
     def __init_subclass__(cls, **kwargs):
         if cls.permissions is not None and not isinstance(cls.permissions, list):
             cls.permissions = [cls.permissions]
-        # Creating API instance to validate the attributes.
-        API(
+        # Compile a handler for each overridden method once, `call_method()` only looks it up.
+        cls._handlers = {}
+        for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            func = getattr(cls, method.lower())
+            if func is not getattr(GenericAPI, method.lower()):
+                cls._handlers[method] = cls.create_api(methods=[method])(cls.bind_method(func))
+        if not cls._handlers:
+            # Creating API instance to validate the attributes.
+            cls.create_api()
+
+    @classmethod
+    def create_api(cls, methods: list[str] | None = None) -> API:
+        return API(
+            methods=methods,
             input_model=cls.input_model,
             output_model=cls.output_model,
             output_schema=cls.output_schema,
@@ -203,9 +370,26 @@ class GenericAPI:
             permissions=cls.permissions,
             throttling=cls.throttling,
             cache=cls.cache,
+            stale_while_revalidate=cls.stale_while_revalidate,
             middlewares=cls.middlewares,
+            etag=cls.etag,
+            stream=cls.stream,
         )
 
+    @classmethod
+    def bind_method(cls, func: Callable) -> Callable:
+        """Wrap `func` so it's called on a new instance of `cls` per request, keeping its annotations."""
+        if is_function_async(func):
+
+            async def handler(**kwargs):
+                return await func(cls(), **kwargs)
+        else:
+
+            def handler(**kwargs):
+                return func(cls(), **kwargs)
+
+        return functools.wraps(func)(handler)
+
     async def get(self, *args, **kwargs):
         raise MethodNotAllowedAPIError
 
@@ -221,28 +405,8 @@ class GenericAPI:
     async def delete(self, *args, **kwargs):
         raise MethodNotAllowedAPIError
 
-    async def call_method(self, request: Request):
-        match request.method:
-            case 'GET':
-                func = self.get
-            case 'POST':
-                func = self.post
-            case 'PUT':
-                func = self.put
-            case 'PATCH':
-                func = self.patch
-            case 'DELETE':
-                func = self.delete
-            case _:
-                raise MethodNotAllowedAPIError
-
-        return await API(
-            input_model=self.input_model,
-            output_model=self.output_model,
-            output_schema=self.output_schema,
-            auth=self.auth,
-            permissions=self.permissions,
-            throttling=self.throttling,
-            cache=self.cache,
-            middlewares=self.middlewares,
-        )(func)(request=request)
+    @classmethod
+    async def call_method(cls, request: Request):
+        if handler := cls._handlers.get(request.method):
+            return await handler(request=request)
+        raise MethodNotAllowedAPIError
@@ -30,32 +30,46 @@ class Headers:
     sec_websocket_version: str
     sec_websocket_key: str
 
-    def __init__(self, headers: list):
-        self.__headers = {header[0].decode('utf-8'): header[1].decode('utf-8') for header in headers}
-        self.__pythonic_headers = {k.lower().replace('-', '_'): v for k, v in self.__headers.items()}
+    __slots__ = ('_raw_headers', '_cache')
+
+    def __init__(self, headers: list[tuple[bytes, bytes]]):
+        # Headers are decoded lazily on lookup & only the ones which have been read are cached.
+        self._raw_headers = headers
+        self._cache = {}
+
+    def _lookup(self, item: str) -> str | None:
+        key = item.lower().replace('-', '_')
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        value = None
+        raw_key = key.encode()
+        for name, raw_value in self._raw_headers:
+            if name.lower().replace(b'-', b'_') == raw_key:
+                value = raw_value.decode('utf-8')  # Keep looking, the last one wins.
+        self._cache[key] = value
+        return value
 
     def __getattr__(self, item: str):
-        if result := self.__pythonic_headers.get(item):
-            return result
-        return self.__headers.get(item)
+        return self._lookup(item)
 
     def __getitem__(self, item: str):
-        if result := self.__headers.get(item):
-            return result
-        return self.__pythonic_headers.get(item)
+        return self._lookup(item)
 
     def __str__(self):
-        items = ', '.join(f'{k}={v}' for k, v in self.__headers.items())
+        items = ', '.join(f'{k}={v}' for k, v in self.__dict__.items())
         return f'Headers({items})'
 
     def __contains__(self, item):
-        return (item in self.__headers) or (item in self.__pythonic_headers)
+        return self._lookup(item) is not None
 
     __repr__ = __str__
 
     @property
     def __dict__(self):
-        return self.__headers
+        return {name.decode('utf-8'): value.decode('utf-8') for name, value in self._raw_headers}
 
     def get_cookies(self) -> dict:
         """
@@ -85,6 +99,19 @@ class Address:
 
 
 class BaseRequest:
+    # `__dict__` is kept, so middlewares & endpoints can still attach their own attributes to the request.
+    __slots__ = (
+        'scope',
+        'asgi_send',
+        'asgi_receive',
+        '_headers',
+        '_params',
+        'user',
+        'endpoint',
+        'path_variables',
+        '__dict__',
+    )
+
     def __init__(self, scope: dict, receive: Callable, send: Callable):
         self.scope = scope
         self.asgi_send = send
@@ -92,6 +119,8 @@ class BaseRequest:
         self._headers: Headers | None = None
         self._params: dict | None = None
         self.user: Model | None = None
+        # Both are set once the endpoint has been found, `path_variables` stays `None` until then.
+        self.endpoint: Callable | None = None
         self.path_variables: dict | None = None
 
     @property
@@ -126,13 +155,6 @@ class BaseRequest:
     def scheme(self) -> str:
         return self.scope['scheme']
 
-    def collect_path_variables(self, found_path: str):
-        self.path_variables = {
-            variable.strip('< >'): value
-            for variable, value in zip(found_path.strip('/').split('/'), self.path.strip('/').split('/'))
-            if variable.startswith('<')
-        }
-
     def clean_parameters(self, function_annotations: dict) -> dict:
         kwargs = self.path_variables.copy()
 
@@ -1,64 +1,485 @@
+import asyncio
+import hashlib
 import logging
-from collections import namedtuple
-from datetime import datetime, timedelta
+import math
+import struct
+import time
+from collections import OrderedDict, namedtuple
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+from urllib.parse import urlencode
+from uuid import uuid4
 
 import orjson as json
 
-from panther.db.connections import redis
+from panther.configs import config
+from panther.db.connections import RedisScript, redis
 from panther.request import Request
 from panther.response import Response
-from panther.utils import generate_hash_value_from_string, round_datetime
 
 logger = logging.getLogger('panther')
 
-caches: dict[str, tuple[bytes, dict, int]] = {}
-CachedResponse = namedtuple('CachedResponse', ['data', 'headers', 'status_code'])
+# `fresh_until` is a timestamp (`time.time()`), it is served as stale after it (with `stale_while_revalidate`)
+CachedResponse = namedtuple('CachedResponse', ['data', 'headers', 'status_code', 'fresh_until'], defaults=[math.inf])
+CacheInfo = namedtuple(
+    'CacheInfo',
+    ['hits', 'misses', 'evictions', 'expirations', 'entries', 'size', 'max_entries', 'max_size'],
+)
+
+
+class MemoryCache:
+    """
+    In-process cache of the responses, used when `redis` is not connected.
+    It is bounded by `config.CACHE_MAX_ENTRIES` & `config.CACHE_MAX_SIZE` (bytes), the least recently used entries
+        are evicted first. Each entry has its own TTL, the expired entries are removed when they are read (lazy),
+        and by a sweep of the whole cache, at most once per `sweep_interval` seconds (periodic, on `set()`).
+    """
+
+    sweep_interval = 60
+
+    def __init__(self):
+        self.entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()  # key --> (expires at, size, value)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.last_sweep = time.monotonic()
+
+    @property
+    def max_entries(self) -> int:
+        return config.CACHE_MAX_ENTRIES
+
+    @property
+    def max_size(self) -> int:
+        return config.CACHE_MAX_SIZE
+
+    def get(self, key: str) -> Any | None:
+        if (entry := self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+
+        if entry[0] <= time.monotonic():
+            self.delete(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        now = time.monotonic()
+        if now - self.last_sweep >= self.sweep_interval:
+            self.expire()
+
+        self.delete(key)
+        if size > self.max_size:
+            return  # It would evict everything else
+
+        self.entries[key] = (now + ttl, size, value)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_size:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if (entry := self.entries.pop(key, None)) is not None:
+            self.size -= entry[1]
+
+    def expire(self) -> None:
+        """Remove all the expired entries"""
+        now = self.last_sweep = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry[0] <= now]:
+            self.delete(key)
+            self.expirations += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            entries=len(self.entries),
+            size=self.size,
+            max_entries=self.max_entries,
+            max_size=self.max_size,
+        )
+
+
+class L1Cache(MemoryCache):
+    """
+    Per-worker cache in front of Redis (the L2), bounded by `config.CACHE_L1_SIZE` entries (`0` disables it).
+    The TTL of its entries is the remaining TTL of them in Redis.
+    """
+
+    @property
+    def max_entries(self) -> int:
+        return config.CACHE_L1_SIZE
+
+
+caches = MemoryCache()
+l1_caches = L1Cache()
+
+# Redis value of a cached response: header (version, status code, expires at, length of headers) + headers + body
+CACHE_FORMAT = struct.Struct('!BHdI')
+CACHE_FORMAT_VERSION = 1
+CACHE_INVALIDATION_CHANNEL = 'panther:cache:invalidate'
+WORKER_ID = uuid4().hex  # So a worker ignores its own invalidations
+_invalidation_listener: asyncio.Task | None = None
+
+# Concurrent requests of a key wait for the one which is calling the endpoint (single-flight)
+_in_flight: dict[str, asyncio.Future] = {}
+_background_refreshes: set[asyncio.Task] = set()
+CACHE_LOCK_TIMEOUT = 10  # Seconds, the other workers wait at most this long for the endpoint
+CACHE_LOCK_POLL_INTERVAL = 0.05
+# Delete the lock only if it is still ours, it may have been expired & taken by another worker.
+RELEASE_LOCK_SCRIPT = RedisScript(
+    "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0",
+)
+
+
+def pack_cached_response(cached: CachedResponse) -> bytes:
+    headers_blob = json.dumps(cached.headers)
+    header = CACHE_FORMAT.pack(CACHE_FORMAT_VERSION, cached.status_code, cached.fresh_until, len(headers_blob))
+    return header + headers_blob + cached.data
+
+
+def unpack_cached_response(value: bytes) -> CachedResponse | None:
+    """Return `None` if it is not in the `CACHE_FORMAT` (e.g. cached by an older version)"""
+    if len(value) < CACHE_FORMAT.size or value[0] != CACHE_FORMAT_VERSION:
+        return None
+    _, status_code, fresh_until, headers_length = CACHE_FORMAT.unpack_from(value)
+    headers_end = CACHE_FORMAT.size + headers_length
+    return CachedResponse(
+        data=value[headers_end:],
+        headers=json.loads(value[CACHE_FORMAT.size : headers_end]),
+        status_code=status_code,
+        fresh_until=fresh_until,
+    )
+
+
+def entry_size(key: str, cached: CachedResponse) -> int:
+    return len(key) + len(cached.data) + sum(len(k) + len(str(v)) for k, v in cached.headers.items())
+
+
+def to_seconds(duration: timedelta | int) -> float:
+    return duration.total_seconds() if isinstance(duration, timedelta) else duration
+
+
+def invalidate_l1_cache(message: bytes | str) -> None:
+    """`message` is '{worker id}:{key}', published by `delete_response_from_cache()`/ `set_response_in_cache()`"""
+    if isinstance(message, bytes):
+        message = message.decode()
+    worker_id, _, key = message.partition(':')
+    if worker_id != WORKER_ID:
+        l1_caches.delete(key)
+
+
+async def listen_to_invalidations() -> None:
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+    async for message in pubsub.listen():
+        if message['type'] == 'message':
+            invalidate_l1_cache(message['data'])
+
+
+def start_invalidation_listener() -> None:
+    global _invalidation_listener
+    if _invalidation_listener is None or _invalidation_listener.done():
+        _invalidation_listener = asyncio.create_task(listen_to_invalidations())
+        _invalidation_listener.add_done_callback(invalidation_listener_done)
+
+
+def invalidation_listener_done(task: asyncio.Task) -> None:
+    """It is started again on the next request, the invalidations may have been missed meanwhile, so clear the L1."""
+    if task.cancelled():
+        return
+    if exception := task.exception():
+        logger.error(f'L1 cache invalidation listener has stopped: {exception}', exc_info=exception)
+    l1_caches.clear()
+
+
+def is_l1_enabled() -> bool:
+    if not config.CACHE_L1_SIZE:
+        return False
+    if config.CACHE_L1_INVALIDATION:
+        start_invalidation_listener()
+    return True
+
+
+async def publish_invalidation(key: str) -> None:
+    if config.CACHE_L1_INVALIDATION:
+        await redis.publish(CACHE_INVALIDATION_CHANNEL, f'{WORKER_ID}:{key}')
+
+
+@dataclass(repr=False, eq=False)
+class CachePolicy:
+    """
+    duration: How long the response is cached.
+    public: Share the cached response between all the users, by default each user (or IP) has its own.
+    vary_query_params: Only these query params make a different response, default is all of them (`[]` for none).
+    vary_headers: These request headers make a different response, they are added to the `Vary` of the response.
+    key_func: Build the key from the request yourself (it is hashed), instead of all the above.
+    """
+
+    duration: timedelta
+    public: bool = False
+    vary_query_params: list[str] | None = None
+    vary_headers: list[str] | None = None
+    key_func: Callable[[Request], str] | None = None
+
+    def build_cache_key(self, request: Request) -> str:
+        """
+        A compact hash of the user or IP (if not `public`), path, query params & `vary_headers`.
+        This method is intended to be overridden by subclasses to customize caching logic.
+        """
+        if self.key_func:
+            key = self.key_func(request)
+        else:
+            if self.vary_query_params is None:
+                query_params = sorted(request.query_params.items())
+            else:
+                query_params = [(k, request.query_params.get(k)) for k in sorted(self.vary_query_params)]
+            key = '|'.join(
+                (
+                    '*' if self.public else str((request.user and request.user.id) or request.client.ip),
+                    request.path,
+                    urlencode([(k, v) for k, v in query_params if v is not None]),
+                    *(request.headers[header] or '' for header in self.vary_headers or ()),
+                ),
+            )
+        return f'cache-{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}'
+
+    def set_vary(self, response: Response) -> None:
+        for header in self.vary_headers or ():
+            if not (vary := response.headers.get('Vary')):
+                response.headers['Vary'] = header
+            elif header.lower() not in vary.lower():
+                response.headers['Vary'] = f'{vary}, {header}'
+
+
+def resolve_policy(policy: CachePolicy | None, duration: timedelta | int | None) -> CachePolicy:
+    """`duration` (without a `policy`) is the interface before `CachePolicy`, it means the default per-user policy"""
+    if policy is not None:
+        return policy
+    if duration is None:
+        raise TypeError('`policy` or `duration` is required.')
+    return CachePolicy(duration=duration)
 
 
 def api_cache_key(request: Request, duration: timedelta | None = None) -> str:
-    client = (request.user and request.user.id) or request.client.ip
-    query_params_hash = generate_hash_value_from_string(request.scope['query_string'].decode('utf-8'))
-    key = f'{client}-{request.path}-{query_params_hash}-{request.validated_data}'
+    """The key of the default per-user policy, `duration` is not a part of it anymore, the entries expire by TTL"""
+    return CachePolicy(duration=duration or timedelta()).build_cache_key(request)
+
 
-    if duration:
-        time = round_datetime(datetime.now(), duration)
-        return f'{time}-{key}'
+async def read_cache(key: str) -> CachedResponse | None:
+    """From memory if redis is not connected, else from L1 (if `CACHE_L1_SIZE`) or Redis, it may be stale."""
+    if not redis.is_connected:
+        return caches.get(key)
 
-    return key
+    if l1_enabled := is_l1_enabled():
+        if cached := l1_caches.get(key):
+            return cached
 
+    if (value := await redis.get(key)) is None or (cached := unpack_cached_response(value)) is None:
+        return None
+
+    # L1 only keeps the fresh responses, the stale ones are served from Redis.
+    if l1_enabled and (ttl := cached.fresh_until - time.time()) > 0:
+        l1_caches.set(key=key, value=cached, ttl=ttl, size=entry_size(key, cached))
+    return cached
+
+
+async def write_cache(key: str, cached: CachedResponse, ttl: float) -> None:
+    if redis.is_connected:
+        await redis.set(key, pack_cached_response(cached), px=max(int(ttl * 1000), 1))
+        if is_l1_enabled():
+            l1_caches.set(key=key, value=cached, ttl=cached.fresh_until - time.time(), size=entry_size(key, cached))
+            await publish_invalidation(key=key)
+    else:
+        caches.set(key=key, value=cached, ttl=ttl, size=entry_size(key, cached))
+        logger.info('`cache` is not shared between the workers when `redis` is not connected.')
 
-async def get_response_from_cache(*, request: Request, duration: timedelta) -> CachedResponse | None:
+
+async def get_response_from_cache(
+    *,
+    request: Request,
+    policy: CachePolicy | None = None,
+    duration: timedelta | None = None,
+) -> CachedResponse | None:
     """
     If redis.is_connected:
-        Get Cached Data From Redis
+        Get Cached Data From L1 (If `CACHE_L1_SIZE`) Or Redis
     else:
         Get Cached Data From Memory
+    `duration` (instead of `policy`) means the default per-user policy.
     """
-    if redis.is_connected:
-        key = api_cache_key(request=request)
-        data = (await redis.get(key) or b'{}').decode()
-        if value := json.loads(data):
-            return CachedResponse(data=value[0].encode(), headers=value[1], status_code=value[2])
-    else:
-        key = api_cache_key(request=request, duration=duration)
-        if value := caches.get(key):
-            return CachedResponse(*value)
+    policy = resolve_policy(policy=policy, duration=duration)
+    cached = await read_cache(key=policy.build_cache_key(request))
+    if cached and cached.fresh_until > time.time():
+        return cached
+    return None
 
 
-async def set_response_in_cache(*, request: Request, response: Response, duration: timedelta | int) -> None:
+async def set_response_in_cache(
+    *,
+    request: Request,
+    response: Response,
+    policy: CachePolicy | None = None,
+    duration: timedelta | int | None = None,
+    stale_while_revalidate: timedelta | int = 0,
+) -> CachedResponse:
     """
     If redis.is_connected:
-        Cache The Data In Redis
+        Cache The Data In Redis (And L1 If `CACHE_L1_SIZE`)
     else:
         Cache The Data In Memory
+    It is kept `stale_while_revalidate` longer than its `policy.duration`,
+        so it can be served while it is being refreshed.
+    `duration` (instead of `policy`) means the default per-user policy.
     """
+    policy = resolve_policy(policy=policy, duration=duration)
+    cached = CachedResponse(
+        data=response.body,
+        # Copy the headers, so the changes of the outer middlewares (e.g. `Content-Encoding`) are not cached
+        headers=dict(response.headers),
+        status_code=response.status_code,
+        fresh_until=time.time() + to_seconds(policy.duration),
+    )
+    ttl = to_seconds(policy.duration) + to_seconds(stale_while_revalidate)
+    await write_cache(key=policy.build_cache_key(request), cached=cached, ttl=ttl)
+    return cached
+
+
+async def get_or_set_response_in_cache(
+    *,
+    request: Request,
+    call_endpoint: Callable[[], Awaitable[Response]],
+    policy: CachePolicy | None = None,
+    duration: timedelta | None = None,
+    stale_while_revalidate: timedelta | None = None,
+) -> Response | CachedResponse:
+    """
+    Return the cached response of the `request`, or call the endpoint and cache its response.
+    Only one of the concurrent requests of a key calls the endpoint (single-flight), the others wait for its response,
+        in the worker with a `Future` and between the workers with a lock in Redis.
+    With `stale_while_revalidate`, the expired response is served while it is being refreshed in the background.
+    `duration` (instead of `policy`) means the default per-user policy.
+    """
+    policy = resolve_policy(policy=policy, duration=duration)
+    key = policy.build_cache_key(request)
+    while True:
+        if cached := await read_cache(key=key):
+            if cached.fresh_until > time.time():
+                return cached
+            if stale_while_revalidate:
+                if key not in _in_flight:
+                    task = asyncio.create_task(
+                        refresh_in_background(
+                            key=key,
+                            request=request,
+                            policy=policy,
+                            stale_while_revalidate=stale_while_revalidate,
+                            call_endpoint=call_endpoint,
+                            future=start_flight(key=key),
+                        ),
+                    )
+                    _background_refreshes.add(task)  # Keep a reference, so it's not garbage collected
+                    task.add_done_callback(_background_refreshes.discard)
+                return cached
+
+        if (future := _in_flight.get(key)) is None:
+            return await call_endpoint_once(
+                key=key,
+                request=request,
+                policy=policy,
+                stale_while_revalidate=stale_while_revalidate or 0,
+                call_endpoint=call_endpoint,
+                future=start_flight(key=key),
+            )
+
+        # `shield()`, so the cancellation of this request doesn't cancel the `future`
+        if cached := await asyncio.shield(future):
+            return cached
+        # The endpoint has failed, one of the waiters is going to call it again.
 
-    if redis.is_connected:
-        key = api_cache_key(request=request)
-        cache_data: tuple[str, dict, int] = (response.body.decode(), response.headers, response.status_code)
-        await redis.set(key, json.dumps(cache_data), ex=duration)
 
+def start_flight(key: str) -> asyncio.Future:
+    future = _in_flight[key] = asyncio.get_running_loop().create_future()
+    return future
+
+
+async def call_endpoint_once(
+    *,
+    key: str,
+    request: Request,
+    policy: CachePolicy,
+    stale_while_revalidate: timedelta | int,
+    call_endpoint: Callable[[], Awaitable[Response]],
+    future: asyncio.Future,
+) -> Response | CachedResponse:
+    """Call the endpoint (if another worker is not calling it) & cache its response, then resolve the `future`"""
+    cached = None
+    try:
+        lock = f'{key}-lock'
+        token = uuid4().hex if redis.is_connected else None
+        if token and not await redis.set(lock, token, nx=True, px=int(CACHE_LOCK_TIMEOUT * 1000)):
+            token = None
+            # Another worker is calling the endpoint, wait for its response.
+            deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline and await redis.exists(lock):
+                await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            if (cached := await read_cache(key=key)) and cached.fresh_until > time.time():
+                return cached
+            cached = None  # It has failed or timed out, call it in this worker.
+
+        try:
+            response = await call_endpoint()
+            policy.set_vary(response)
+            cached = await set_response_in_cache(
+                request=request,
+                response=response,
+                policy=policy,
+                stale_while_revalidate=stale_while_revalidate,
+            )
+        finally:
+            if token:
+                await RELEASE_LOCK_SCRIPT(redis, keys=[lock], args=[token])
+        return response
+    finally:
+        del _in_flight[key]
+        future.set_result(cached)
+
+
+async def refresh_in_background(**kwargs) -> None:
+    try:
+        await call_endpoint_once(**kwargs)
+    except Exception as e:
+        logger.error(f'Exception in refreshing the cache of {kwargs["request"].path}: {e}', exc_info=True)
+
+
+async def delete_response_from_cache(*, request: Request, policy: CachePolicy | None = None) -> None:
+    """
+    Delete the cached response of `request` (from Redis & the L1 of all the workers, or from memory)
+    Without a `policy`, it is the response of the default per-user policy.
+    """
+    key = policy.build_cache_key(request) if policy else api_cache_key(request=request)
+    if redis.is_connected:
+        await redis.delete(key)
+        l1_caches.delete(key)
+        await publish_invalidation(key=key)
     else:
-        key = api_cache_key(request=request, duration=duration)
-        caches[key] = (response.body, response.headers, response.status_code)
-        logger.info('`cache` is not very accurate when `redis` is not connected.')
+        caches.delete(key)
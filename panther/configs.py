@@ -3,6 +3,7 @@ from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import timedelta
 from pathlib import Path
+from weakref import WeakSet
 
 import jinja2
 from pydantic import BaseModel as PydanticBaseModel
@@ -50,6 +51,21 @@ class QueryObservable:
             observer._reload_bases(parent=config.QUERY_ENGINE)
 
 
+class PipelineObservable:
+    """`panther.app.API` compiles its pipeline with the global configs, so it should be reset when they change."""
+
+    observers = WeakSet()
+
+    @classmethod
+    def observe(cls, observer):
+        cls.observers.add(observer)
+
+    @classmethod
+    def update(cls):
+        for observer in cls.observers:
+            observer.reset_pipeline()
+
+
 @dataclass
 class Config:
     BASE_DIR: Path = Path()
@@ -66,6 +82,16 @@ class Config:
     MODELS: list = field(default_factory=list)
     FLAT_URLS: dict = field(default_factory=dict)
     URLS: dict = field(default_factory=dict)
+    ROUTER = None  # type: panther.routings.RouteNode
+    ROUTE_CACHE_SIZE: int = 0
+    MAX_BODY_SIZE: int | None = None
+    ETAG: bool = False
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_MAX_SIZE: int = 100 * 1024 * 1024
+    CACHE_L1_SIZE: int = 0
+    CACHE_L1_INVALIDATION: bool = False
+    THROTTLING_MAX_KEYS: int = 100_000
+    THROTTLING_SHARED_MEMORY: bool = False
     WEBSOCKET_CONNECTIONS: Callable | None = None
     BACKGROUND_TASKS: bool = False
     HAS_WS: bool = False
@@ -94,6 +120,8 @@ class Config:
         for field_name in current_fields - builtin_fields:
             delattr(self, field_name)
 
+        PipelineObservable.update()
+
     def vars(self) -> dict[str, typing.Any]:
         """Return all config variables (built-in + custom)."""
         return dict(self.__dict__)
@@ -102,6 +130,11 @@ class Config:
         super().__setattr__(key, value)
         if key == 'QUERY_ENGINE' and value:
             QueryObservable.update()
+        elif key in {'AUTHENTICATION', 'THROTTLING', 'ETAG'}:
+            PipelineObservable.update()
+        elif key == 'URLS':
+            # The compiled router is not valid anymore, it will be compiled again in `find_endpoint()`
+            super().__setattr__('ROUTER', None)
 
     def __getattr__(self, item: str):
         try:
@@ -1,5 +1,6 @@
 import asyncio
 import contextlib
+import hashlib
 from abc import abstractmethod
 from typing import TYPE_CHECKING, Any
 
@@ -17,6 +18,12 @@ except ImportError:
     #   we are going to force him to install it in `panther._load_configs.load_redis`
     _Redis = type('_Redis', (), {'__new__': lambda x: x})
 
+try:
+    from redis.exceptions import NoScriptError
+except ImportError:
+    # It is not going to be raised, `redis` is never connected without it.
+    NoScriptError = type('NoScriptError', (Exception,), {})
+
 if TYPE_CHECKING:
     from pymongo.database import Database
 
@@ -151,5 +158,22 @@ class RedisConnection(Singleton, _Redis):
         return self.websocket_connection
 
 
+class RedisScript:
+    """
+    Lua script which runs atomically in one round trip with `EVALSHA`,
+        it is sent with `EVAL` the first time a Redis server doesn't have it (`NOSCRIPT`).
+    """
+
+    def __init__(self, script: str):
+        self.script = script
+        self.sha = hashlib.sha1(script.encode()).hexdigest()
+
+    async def __call__(self, client: _Redis, keys: list, args: list) -> Any:
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await client.eval(self.script, len(keys), *keys, *args)
+
+
 db: DatabaseConnection = DatabaseConnection()
 redis: RedisConnection = RedisConnection()
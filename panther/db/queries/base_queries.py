@@ -207,7 +207,7 @@ class BaseQuery:
                 return model._id
             case File() as file:
                 # Write file to disk
-                return file.save()
+                return await file.save_async()
             case BaseModel() as model:
                 return {
                     field_name: await cls._clean_value(value=getattr(model, field_name))
@@ -59,6 +59,11 @@ class MethodNotAllowedAPIError(APIError):
     status_code = status.HTTP_405_METHOD_NOT_ALLOWED
 
 
+class PayloadTooLargeAPIError(APIError):
+    detail = 'Request Entity Too Large'
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
 class UnprocessableEntityError(APIError):
     detail = 'Unprocessable Entity Error'
     status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -1,3 +1,6 @@
+import asyncio
+import shutil
+import weakref
 from functools import cached_property
 from io import BufferedReader, BytesIO
 from pathlib import Path
@@ -15,6 +18,17 @@ class File(BaseModel):
     file: bytes | None = None
     _file_path: Path | None = None
     _buffer: BytesIO | BufferedReader | None = None
+    _temporary: bool = False  # Spooled upload, it will be removed if it doesn't get saved
+    _finalizer: weakref.finalize | None = None
+
+    @classmethod
+    def from_temporary_file(cls, path: str | Path, file_name: str, content_type: str) -> 'File':
+        """Wrap a spooled upload (e.g. by the multipart parser), `save()` moves it instead of copying it."""
+        file = cls(file_name=file_name, content_type=content_type)
+        file._file_path = Path(path)
+        file._temporary = True
+        file._finalizer = weakref.finalize(file, file._file_path.unlink, missing_ok=True)
+        return file
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -60,8 +74,6 @@ class File(BaseModel):
         if self._saved_path is not None:
             return self._saved_path
 
-        self._ensure_buffer()
-
         # Handle directory paths (ending with slash)
         if path and str(path).endswith('/'):
             # Treat as directory, use original file name
@@ -87,15 +99,28 @@ class File(BaseModel):
         # Ensure directory exists
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write file
-        with open(file_path, 'wb') as f:
-            f.write(self._buffer.read())
-            self._buffer.seek(0)
+        if self._temporary:
+            # Rename the spooled upload (falls back to copy if it is on another filesystem)
+            self.__exit__(None, None, None)
+            shutil.move(self._file_path, file_path)
+            self._finalizer.detach()
+            self._temporary = False
+            self._file_path = file_path
+        else:
+            # Write file
+            self._ensure_buffer()
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(self._buffer, f)
+                self._buffer.seek(0)
 
         # Store the saved path for idempotency
         self._saved_path = str(file_path)
         return self._saved_path
 
+    async def save_async(self, path: str | None = None, overwrite: bool = False) -> str:
+        """Same as `save()`, in a thread, so writing (or moving) a big file doesn't block the event loop."""
+        return await asyncio.to_thread(self.save, path, overwrite)
+
     @cached_property
     def size(self) -> int:
         if self.file is not None:
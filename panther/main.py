@@ -5,11 +5,11 @@ from logging.config import dictConfig
 from pathlib import Path
 
 import panther.logging
-from panther import status
 from panther._load_configs import *
 from panther._utils import (
     ENDPOINT_CLASS_BASED_API,
     ENDPOINT_FUNCTION_BASED_API,
+    ENDPOINT_STATIC_FILES,
     ENDPOINT_WEBSOCKET,
     reformat_code,
     traceback_message,
@@ -20,7 +20,7 @@ from panther.configs import config
 from panther.events import Event
 from panther.exceptions import APIError, BaseError, NotFoundAPIError, PantherError, UpgradeRequiredError
 from panther.request import Request
-from panther.response import Response
+from panther.response import INTERNAL_SERVER_ERROR_RESPONSE, Response, get_error_response
 from panther.routings import find_endpoint
 from panther.websocket import GenericWebsocket
 
@@ -71,6 +71,13 @@ class Panther:
         load_templates_dir(self._configs_module)
         load_middlewares(self._configs_module)
         load_auto_reformat(self._configs_module)
+        load_route_cache_size(self._configs_module)
+        load_max_body_size(self._configs_module)
+        load_etag(self._configs_module)
+        load_cache_max_entries(self._configs_module)
+        load_cache_max_size(self._configs_module)
+        load_cache_l1(self._configs_module)
+        load_throttling_storage(self._configs_module)
         load_background_tasks(self._configs_module)
         load_other_configs(self._configs_module)
         load_urls(self._configs_module, urls=self._urls)
@@ -78,6 +85,25 @@ class Panther:
         load_websocket_connections()
 
         check_endpoints_inheritance()
+        self.load_middlewares_chain()
+
+    def load_middlewares_chain(self) -> None:
+        """
+        Middlewares are instantiated once and shared between all the requests,
+            so they should keep their per-request state on the `request`/ `connection`, not on `self`.
+        """
+        self._http_chain = self.handle_http_endpoint
+        self._fast_dispatch = not config.HTTP_MIDDLEWARES
+        # Some endpoints (e.g. `StaticFiles(bypass_middlewares=True)`) are served before the global middlewares
+        self._bypass_dispatch = bool(config.HTTP_MIDDLEWARES) and any(
+            getattr(endpoint, 'bypass_middlewares', False) for endpoint in config.FLAT_URLS.values()
+        )
+        for middleware in config.HTTP_MIDDLEWARES:
+            self._http_chain = middleware(dispatch=self._http_chain)
+
+        self._ws_chain = self.handle_ws_endpoint
+        for middleware in config.WS_MIDDLEWARES:
+            self._ws_chain = middleware(dispatch=self._ws_chain)
 
     async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
         if scope['type'] == 'http':
@@ -97,7 +123,7 @@ class Panther:
     @staticmethod
     async def handle_ws_endpoint(connection: Websocket):
         # Find Endpoint
-        endpoint, found_path = find_endpoint(path=connection.path)
+        endpoint, path_variables = find_endpoint(path=connection.path)
         if endpoint is None:
             await connection.close()
             return connection
@@ -112,24 +138,17 @@ class Panther:
         final_connection = endpoint(parent=connection)
         del connection
 
-        # Collect Path Variables
-        final_connection.collect_path_variables(found_path=found_path)
+        final_connection.path_variables = path_variables
 
         return await config.WEBSOCKET_CONNECTIONS.listen(connection=final_connection)
 
-    @classmethod
-    async def handle_ws(cls, scope: dict, receive: Callable, send: Callable) -> None:
+    async def handle_ws(self, scope: dict, receive: Callable, send: Callable) -> None:
         # Create Temp Connection
         connection = Websocket(scope=scope, receive=receive, send=send)
 
-        # Create Middlewares chain
-        chained_func = cls.handle_ws_endpoint
-        for middleware in config.WS_MIDDLEWARES:
-            chained_func = middleware(dispatch=chained_func)
-
         # Call Middlewares & Endpoint
         try:
-            connection = await chained_func(connection=connection)
+            connection = await self._ws_chain(connection=connection)
         except BaseError as e:
             connection.log(e.detail)
             await connection.close()
@@ -137,45 +156,65 @@ class Panther:
             logger.error(traceback_message(exception=e))
             await connection.close()
 
+    @classmethod
+    async def handle_http_endpoint(cls, request: Request) -> Response:
+        if request.path_variables is None:
+            request.endpoint, request.path_variables = find_endpoint(path=request.path)
+        return await cls.call_http_endpoint(
+            request=request,
+            endpoint=request.endpoint,
+            path_variables=request.path_variables,
+        )
+
     @staticmethod
-    async def handle_http_endpoint(request: Request) -> Response:
-        # Find Endpoint
-        endpoint, found_path = find_endpoint(path=request.path)
+    async def call_http_endpoint(request: Request, endpoint: Callable | None, path_variables: dict) -> Response:
         if endpoint is None:
             raise NotFoundAPIError
 
-        # Collect Path Variables
-        request.collect_path_variables(found_path=found_path)
+        request.path_variables = path_variables
 
         if endpoint._endpoint_type is ENDPOINT_FUNCTION_BASED_API:
             return await endpoint(request=request)
         if endpoint._endpoint_type is ENDPOINT_CLASS_BASED_API:
-            return await endpoint().call_method(request=request)
+            return await endpoint.call_method(request=request)
+        if endpoint._endpoint_type is ENDPOINT_STATIC_FILES:
+            return await endpoint(request=request)
 
         # ENDPOINT_WEBSOCKET
         raise UpgradeRequiredError
 
-    @classmethod
-    async def handle_http(cls, scope: dict, receive: Callable, send: Callable) -> None:
-        # Create `Request` and its body
+    async def handle_http(self, scope: dict, receive: Callable, send: Callable) -> None:
+        # Create `Request`, its body is read later, only if the endpoint needs it
         request = Request(scope=scope, receive=receive, send=send)
-        await request.read_body()
-
-        # Create Middlewares chain
-        chained_func = cls.handle_http_endpoint
-        for middleware in config.HTTP_MIDDLEWARES:
-            chained_func = middleware(dispatch=chained_func)
 
         # Call Middlewares & Endpoint
         try:
-            response = await chained_func(request=request)
+            if self._fast_dispatch or self._bypass_dispatch:
+                # Find the endpoint here & serve `fast` endpoints directly,
+                #   if there are global middlewares, only the ones which bypass them.
+                endpoint, path_variables = find_endpoint(path=request.path)
+                fast_handler = getattr(endpoint, 'fast_handler', None)
+                if fast_handler and (self._fast_dispatch or getattr(endpoint, 'bypass_middlewares', False)):
+                    request.path_variables = path_variables
+                    if (response := await fast_handler(request=request, send=send)) is None:
+                        return  # It has been sent already
+                elif self._fast_dispatch:
+                    response = await self.call_http_endpoint(
+                        request=request,
+                        endpoint=endpoint,
+                        path_variables=path_variables,
+                    )
+                else:
+                    # It's routed again after the middlewares, they may change the path (e.g. strip a prefix).
+                    response = await self._http_chain(request=request)
+            else:
+                response = await self._http_chain(request=request)
             if response is None:
                 logger.error('You forgot to return `response` on the `Middlewares.__call__()`')
-                response = Response(
-                    data={'detail': 'Internal Server Error'},
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+                return await INTERNAL_SERVER_ERROR_RESPONSE.send(send=send, receive=receive)
         except APIError as e:
+            if error_response := get_error_response(error=e):
+                return await error_response.send(send=send, receive=receive, headers=e.headers)
             response = Response(
                 data=e.detail if isinstance(e.detail, dict) else {'detail': e.detail},
                 headers=e.headers,
@@ -183,13 +222,10 @@ class Panther:
             )
         except Exception as e:  # Handle Unknown Exceptions
             logger.error(traceback_message(exception=e))
-            response = Response(
-                data={'detail': 'Internal Server Error'},
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return await INTERNAL_SERVER_ERROR_RESPONSE.send(send=send, receive=receive)
 
         # Return Response
-        await response.send(send=send, receive=receive)
+        await response.send(send=send, receive=receive, request=request)
 
     def __del__(self):
         Event.run_shutdowns()
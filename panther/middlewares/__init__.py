@@ -1,3 +1,4 @@
 from panther.middlewares.base import HTTPMiddleware, WebsocketMiddleware  # noqa: F401
+from panther.middlewares.compression import CompressionMiddleware  # noqa: F401
 from panther.middlewares.cors import CORSMiddleware  # noqa: F401
 from panther.middlewares.monitoring import MonitoringMiddleware, WebsocketMonitoringMiddleware  # noqa: F401
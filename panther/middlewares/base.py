@@ -7,7 +7,11 @@ from panther.websocket import GenericWebsocket
 
 
 class HTTPMiddleware:
-    """Used only in http requests"""
+    """
+    Used only in http requests
+    Middlewares are instantiated once and shared between all the requests,
+        so keep the per-request state on the `request`, not on `self`.
+    """
 
     def __init__(self, dispatch: typing.Callable):
         self.dispatch = dispatch
@@ -17,7 +21,11 @@ class HTTPMiddleware:
 
 
 class WebsocketMiddleware:
-    """Used only in ws requests"""
+    """
+    Used only in ws requests
+    Middlewares are instantiated once and shared between all the connections,
+        so keep the per-connection state on the `connection`, not on `self`.
+    """
 
     def __init__(self, dispatch: typing.Callable):
         self.dispatch = dispatch
@@ -0,0 +1,186 @@
+import asyncio
+import zlib
+from collections.abc import AsyncGenerator
+
+from panther._utils import accepted_encodings
+from panther.configs import config
+from panther.middlewares import HTTPMiddleware
+from panther.request import Request
+from panther.response import FileResponse, NotModifiedResponse, Response, StreamingResponse, is_etag_matched
+
+try:
+    import brotli
+except ImportError:
+    # `br` is not going to be used, if you want it, install `brotli`
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    # `zstd` is not going to be used, if you want it, install `zstandard`
+    zstandard = None
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 --> gzip header & trailer
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Everything compressed so far can be decompressed by the client"""
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+COMPRESSORS = {
+    'zstd': ZstdCompressor if zstandard else None,
+    'br': BrotliCompressor if brotli else None,
+    'gzip': GzipCompressor,
+}
+DEFAULT_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+# Content types which are already compressed
+EXCLUDED_CONTENT_TYPES = (
+    'image/',
+    'video/',
+    'audio/',
+    'font/woff',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-7z-compressed',
+    'application/x-rar-compressed',
+    'application/pdf',
+)
+
+
+def compress(compressor, body: bytes) -> bytes:
+    return compressor.compress(body) + compressor.finish()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """'"3f2-a1b2c3d4"' --> '"3f2-a1b2c3d4-gzip"', each encoding is another representation (RFC 9110, 8.8.3)"""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+async def compress_stream(compressor, chunks: AsyncGenerator) -> AsyncGenerator:
+    """Compress & flush each chunk, so the client receives them as soon as they are produced."""
+    async for chunk in chunks:
+        if data := compressor.compress(chunk) + compressor.flush():
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(HTTPMiddleware):
+    """
+    Compresses the responses with the best encoding (`zstd`, `br` or `gzip`) which the client accepts.
+    `br` and `zstd` are only used if `brotli` and `zstandard` are installed.
+
+    Configuration attributes (set these in your config):
+    ---------------------------------------------------
+    COMPRESSION_MIN_SIZE: int
+        Smaller bodies are not compressed. Default: 500
+    COMPRESSION_THREAD_SIZE: int
+        Bigger bodies are compressed in a thread, so they don't block the event loop. Default: 262144 (256 KB)
+    COMPRESSION_LEVELS: dict[str, int]
+        Compression level of each encoding. Default: {'zstd': 3, 'br': 4, 'gzip': 6}
+    COMPRESSION_EXCLUDED_TYPES: list[str]
+        Extra (prefix of) content types which should not be compressed,
+        images, videos, archives, ... are never compressed.
+
+    Usage:
+    ------
+    Add 'panther.middlewares.compression.CompressionMiddleware' as the first item of your MIDDLEWARES,
+        so the other middlewares can still read the `response.data` before it gets compressed.
+    """
+
+    async def __call__(self, request: Request) -> Response:
+        response = await self.dispatch(request=request)
+
+        if (
+            isinstance(response, FileResponse)  # It is streamed from the disk & supports `Range`
+            or response.status_code < 200
+            or response.status_code in {204, 304}
+            or 'Content-Encoding' in response.headers
+            or not (encoding := self.negotiate(request.headers.accept_encoding))
+        ):
+            return response
+
+        content_type = response.headers.get('Content-Type') or ''
+        excluded_types = (*EXCLUDED_CONTENT_TYPES, *(config.COMPRESSION_EXCLUDED_TYPES or []))
+        if content_type.startswith(excluded_types):
+            return response
+
+        if not isinstance(response, StreamingResponse):
+            min_size = 500 if config.COMPRESSION_MIN_SIZE is None else config.COMPRESSION_MIN_SIZE
+            if len(response.body) < min_size:
+                return response
+
+        if not (vary := response.headers.get('Vary')):
+            response.headers['Vary'] = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            response.headers['Vary'] = f'{vary}, Accept-Encoding'
+
+        # The identity `ETag` must not validate the compressed body, the endpoint has only compared the identity one
+        if etag := response.headers.get('ETag'):
+            response.headers['ETag'] = etag = encoded_etag(etag=etag, encoding=encoding)
+            if is_etag_matched(if_none_match=request.headers.if_none_match, etag=etag.removeprefix('W/')):
+                return NotModifiedResponse.from_response(response)
+
+        level = (config.COMPRESSION_LEVELS or {}).get(encoding, DEFAULT_LEVELS[encoding])
+        compressor = COMPRESSORS[encoding](level)
+
+        if isinstance(response, StreamingResponse):
+            response.data = compress_stream(compressor=compressor, chunks=response.body)
+        else:
+            body = response.body
+            if len(body) >= (config.COMPRESSION_THREAD_SIZE or 256 * 1024):
+                # `zlib`, `brotli` & `zstandard` release the GIL while they compress
+                response.data = await asyncio.to_thread(compress, compressor, body)
+            else:
+                response.data = compress(compressor=compressor, body=body)
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @classmethod
+    def negotiate(cls, accept_encoding: str | None) -> str | None:
+        if not accept_encoding:
+            return None
+        encodings = accepted_encodings(accept_encoding)
+        for encoding, compressor in COMPRESSORS.items():
+            if compressor and (encoding in encodings or '*' in encodings):
+                return encoding
+        return None
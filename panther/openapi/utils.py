@@ -16,6 +16,7 @@ from pydantic import BaseModel
 from panther import status
 from panther.app import GenericAPI
 from panther.configs import config
+from panther.routings import is_mount
 
 logger = logging.getLogger('panther')
 
@@ -277,7 +278,7 @@ class OpenAPIGenerator:
         """
         param_names = []
         for url, endpoint in config.FLAT_URLS.items():
-            if endpoint.__name__ == endpoint_name:
+            if getattr(endpoint, '__name__', None) == endpoint_name:
                 for part in url.split('/'):
                     if part.startswith('<'):
                         param_names.append(part.strip('< >'))
@@ -423,7 +424,7 @@ class OpenAPIGenerator:
             throttling = f'{endpoint.throttling.rate} per {endpoint.throttling.duration}'
 
         # Extract cache
-        cache = str(endpoint.cache) if endpoint.cache else None
+        cache = str(getattr(endpoint.cache, 'duration', endpoint.cache)) if endpoint.cache else None
 
         # Extract middlewares
         middlewares = None
@@ -536,6 +537,8 @@ class OpenAPIGenerator:
 
         # Process all registered endpoints
         for url, endpoint in config.FLAT_URLS.items():
+            if is_mount(endpoint):
+                continue  # e.g. `StaticFiles`
             url = url.replace('<', '{').replace('>', '}')
             if not url.startswith('/'):
                 url = f'/{url}'
@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable
 from typing import Literal
 from urllib.parse import parse_qsl
 
@@ -7,17 +7,22 @@ import orjson as json
 from orjson import JSONDecodeError
 from pydantic import ValidationError
 
-from panther._utils import read_multipart_form_data
+from panther._utils import MultipartParser, read_multipart_form_data
 from panther.base_request import BaseRequest
-from panther.exceptions import BadRequestAPIError, UnprocessableEntityError
+from panther.configs import config
+from panther.exceptions import BadRequestAPIError, PantherError, PayloadTooLargeAPIError, UnprocessableEntityError
 
 logger = logging.getLogger('panther')
 
 
 class Request(BaseRequest):
+    __slots__ = ('_data', 'validated_data', '__body', '_stream_consumed')
+
     def __init__(self, scope: dict, receive: Callable, send: Callable):
         self._data = ...
         self.validated_data = None  # It's been set in self.validate_input()
+        self.__body: bytes | None = None  # It's been set in self.read_body()
+        self._stream_consumed = False
         super().__init__(scope=scope, receive=receive, send=send)
 
     @property
@@ -28,6 +33,9 @@ class Request(BaseRequest):
     def data(self) -> dict | bytes:
         """Data before validation"""
         if self._data is ...:
+            if self.__body is None:
+                msg = 'The body has not been read yet, you may want to call `await request.read_body()` first.'
+                raise PantherError(msg)
             match (self.headers.content_type or '').split('; boundary='):
                 case ['' | 'application/json']:
                     self._data = json.loads(self.__body or b'{}')
@@ -41,14 +49,64 @@ class Request(BaseRequest):
                     self._data = self.__body
         return self._data
 
-    async def read_body(self) -> None:
-        """Read the entire body from an incoming ASGI message."""
-        self.__body = b''
+    async def stream(self) -> AsyncGenerator[bytes, None]:
+        """
+        Receive the body chunk by chunk from the ASGI server, without buffering it.
+        It rejects the request with 413 as soon as it gets bigger than `config.MAX_BODY_SIZE`.
+
+        Example:
+            async for chunk in request.stream():
+                ...
+        """
+        if self.__body is not None:
+            if self.__body:
+                yield self.__body
+            return
+        if self._stream_consumed:
+            raise PantherError('The body has already been consumed by `request.stream()`.')
+        self._stream_consumed = True
+
+        max_body_size = config.MAX_BODY_SIZE
+        if max_body_size:
+            content_length = self.headers.content_length
+            if content_length and content_length.isdigit() and int(content_length) > max_body_size:
+                raise PayloadTooLargeAPIError
+
+        received = 0
         more_body = True
         while more_body:
             message = await self.asgi_receive()
-            self.__body += message.get('body', b'')
             more_body = message.get('more_body', False)
+            if chunk := message.get('body', b''):
+                received += len(chunk)
+                if max_body_size and received > max_body_size:
+                    raise PayloadTooLargeAPIError
+                yield chunk
+
+    async def read_body(self) -> None:
+        """
+        Read the entire body from the incoming ASGI messages (if it has not been read yet).
+        It is called right before the endpoint (after auth, permissions & throttling),
+            so you only need to call it yourself if you want `request.data` in a middleware.
+        """
+        if self.__body is not None:
+            return
+
+        match (self.headers.content_type or '').split('; boundary='):
+            case ['multipart/form-data', boundary]:
+                # Parse it while receiving, so the file parts don't need to be kept in memory
+                parser = MultipartParser(boundary=boundary)
+                try:
+                    async for chunk in self.stream():
+                        await parser.feed_async(chunk)
+                    self._data = await parser.finish_async()
+                except BaseException:
+                    # e.g. `413`, a disconnected client or a cancellation, don't leave the spooled files behind
+                    parser.abort()
+                    raise
+                self.__body = b''
+            case _:
+                self.__body = b''.join([chunk async for chunk in self.stream()])
 
     def validate_data(self, model):
         if isinstance(self.data, bytes):
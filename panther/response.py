@@ -1,15 +1,27 @@
 import asyncio
 import logging
+import mimetypes
+import os
+import zlib
 from collections.abc import AsyncGenerator, Generator
 from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
 from http import cookies
+from pathlib import Path
 from sys import version_info
 from types import NoneType
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 import jinja2
 
-from panther.exceptions import APIError
+from panther.exceptions import (
+    APIError,
+    AuthenticationAPIError,
+    AuthorizationAPIError,
+    MethodNotAllowedAPIError,
+    NotFoundAPIError,
+    ThrottlingAPIError,
+)
 
 if version_info >= (3, 11):
     from typing import LiteralString
@@ -28,6 +40,9 @@ from panther.configs import config
 from panther.db.cursor import Cursor
 from panther.pagination import Pagination
 
+if TYPE_CHECKING:
+    from panther.request import Request
+
 ResponseDataTypes = (
     list | tuple | set | Cursor | PantherDBCursor | dict | int | float | str | bool | bytes | NoneType | type[BaseModel]
 )
@@ -36,6 +51,36 @@ StreamingDataTypes = Generator | AsyncGenerator
 
 logger = logging.getLogger('panther')
 
+# Pre-encoded header items of the default content types, so they are not encoded on every response
+ENCODED_HEADERS: dict[tuple[str, str], tuple[bytes, bytes]] = {
+    ('Content-Type', content_type): (b'Content-Type', content_type.encode())
+    for content_type in (
+        'application/json',
+        'application/octet-stream',
+        'text/html; charset=utf-8',
+        'text/plain; charset=utf-8',
+    )
+}
+
+
+def encode_header(item: tuple[str, Any]) -> tuple[bytes, bytes]:
+    """(name, value) --> (bytes, bytes), the value can be anything (e.g. a `list`), it is converted with `str()`"""
+    if type(item[1]) is str and (encoded := ENCODED_HEADERS.get(item)):
+        return encoded
+    return item[0].encode(), str(item[1]).encode()
+
+
+def generate_etag(body: bytes) -> str:
+    """A fast (non-cryptographic) strong `ETag` of the body, e.g. '"3f2-a1b2c3d4"' (length-crc32)"""
+    return f'"{len(body):x}-{zlib.crc32(body):08x}"'
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of the `If-None-Match` header, e.g. 'W/"3f2-a1b2c3d4", "1a-2b3c4d5e"'"""
+    if not if_none_match:
+        return False
+    return any(tag.strip().removeprefix('W/') in {etag, '*'} for tag in if_none_match.split(','))
+
 
 @dataclass(slots=True)
 class Cookie:
@@ -96,9 +141,12 @@ class Response:
         """
         if isinstance(data, (Cursor, PantherDBCursor)):
             data = list(data)
-        self.data = data
+        self.data = data  # It resets the memoized `self.body` too
         self.status_code = status_code
-        self.headers = {'Content-Type': self.content_type} | (headers or {})
+        if headers:
+            self.headers = {'Content-Type': self.content_type, **headers}
+        else:
+            self.headers = {'Content-Type': self.content_type}
         self.pagination: Pagination | None = pagination
         self.cookies = None
         if set_cookies:
@@ -124,8 +172,23 @@ class Response:
 
     __repr__ = __str__
 
+    @property
+    def data(self) -> ResponseDataTypes:
+        return self._data
+
+    @data.setter
+    def data(self, value: ResponseDataTypes):
+        self._data = value
+        self._body = None
+
     @property
     def body(self) -> bytes:
+        """Rendered once and memoized, until `data` is reassigned."""
+        if self._body is None:
+            self._body = self.render_body()
+        return self._body
+
+    def render_body(self) -> bytes:
         def default(obj: Any):
             if isinstance(obj, BaseModel):
                 return obj.model_dump()
@@ -144,12 +207,12 @@ class Response:
     @property
     def bytes_headers(self) -> list[tuple[bytes, bytes]]:
         headers = {'Content-Length': len(self.body)} | self.headers
-        result = [(k.encode(), str(v).encode()) for k, v in headers.items()]
+        result = [encode_header(item) for item in headers.items()]
         if self.cookies:
             result += self.cookies
         return result
 
-    async def send(self, send, receive):
+    async def send(self, send, receive, request: 'Request | None' = None):
         await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.bytes_headers})
         await send({'type': 'http.response.body', 'body': self.body, 'more_body': False})
 
@@ -210,20 +273,25 @@ class StreamingResponse(Response):
 
     @property
     def bytes_headers(self) -> list[tuple[bytes, bytes]]:
-        result = [(k.encode(), str(v).encode()) for k, v in self.headers.items()]
+        result = [encode_header(item) for item in self.headers.items()]
         if self.cookies:
             result += self.cookies
         return result
 
     @property
-    async def body(self) -> AsyncGenerator:
-        if not isinstance(self.data, (Generator, AsyncGenerator)):
-            raise TypeError(f'Type {type(self.data)} is not streamable, should be `Generator` or `AsyncGenerator`.')
+    def body(self) -> AsyncGenerator:
+        """The chunks (as `bytes`) of the current `data`, so it can be wrapped, e.g. by `CompressionMiddleware`"""
+        return self.iter_chunks(self.data)
 
-        if isinstance(self.data, Generator):
-            self.data = to_async_generator(self.data)
+    @classmethod
+    async def iter_chunks(cls, data: Generator | AsyncGenerator) -> AsyncGenerator:
+        if not isinstance(data, (Generator, AsyncGenerator)):
+            raise TypeError(f'Type {type(data)} is not streamable, should be `Generator` or `AsyncGenerator`.')
 
-        async for chunk in self.data:
+        if isinstance(data, Generator):
+            data = to_async_generator(data)
+
+        async for chunk in data:
             if isinstance(chunk, bytes):
                 yield chunk
             elif chunk is None:
@@ -231,7 +299,7 @@ class StreamingResponse(Response):
             else:
                 yield json.dumps(chunk)
 
-    async def send(self, send, receive):
+    async def send(self, send, receive, request: 'Request | None' = None):
         # Send Headers
         await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.bytes_headers})
         # Send Body as chunks
@@ -256,8 +324,7 @@ class HTMLResponse(Response):
 
     content_type = 'text/html; charset=utf-8'
 
-    @property
-    def body(self) -> bytes:
+    def render_body(self) -> bytes:
         if isinstance(self.data, bytes):
             return self.data
         return self.data.encode()
@@ -274,8 +341,7 @@ class PlainTextResponse(Response):
 
     content_type = 'text/plain; charset=utf-8'
 
-    @property
-    def body(self) -> bytes:
+    def render_body(self) -> bytes:
         if isinstance(self.data, bytes):
             return self.data
         return self.data.encode()
@@ -287,21 +353,152 @@ class FileResponse(Response):
         from panther.response import FileResponse
 
         def my_api():
-            return FileResponse(data="file.txt")
+            return FileResponse(file_path="file.txt")
+
+    The file is streamed in chunks (or with `http.response.pathsend`/ `http.response.zerocopysend`
+        if the server supports them), it supports `Range` requests (206) and
+        conditional requests with `If-None-Match`/ `If-Modified-Since` (304).
     """
 
+    chunk_size = 64 * 1024
+
     def __init__(self, file_path: str, headers: dict | NoneType = None, status_code: int = status.HTTP_200_OK):
         """
         :param file_path: path of the file
         :param headers: should be dict of headers
         :param status_code: should be int
         """
-        file = config.BASE_DIR / file_path
-        if not file.exists():
-            super().__init__(data={'detail': 'Not Found'}, headers=headers, status_code=status.HTTP_404_NOT_FOUND)
-        else:
-            headers = {'Content-Type': detect_mime_type(file)} | (headers or {})
-            super().__init__(data=file.read_bytes(), headers=headers, status_code=status_code)
+        self.file_path: Path = config.BASE_DIR / file_path
+        headers = headers or {}
+        if 'Content-Type' not in headers and (content_type := mimetypes.guess_type(self.file_path)[0]):
+            headers = {'Content-Type': content_type} | headers
+        self.has_content_type = 'Content-Type' in headers
+        super().__init__(headers=headers, status_code=status_code)
+
+    def render_body(self) -> bytes:
+        """Only used if someone needs the whole content, e.g. `set_response_in_cache()`"""
+        try:
+            return self.file_path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError):
+            return b''
+
+    def stat(self) -> tuple[os.stat_result, str] | None:
+        """Blocking, it is called in a thread."""
+        try:
+            stat = self.file_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not self.file_path.is_file():
+            return None
+        content_type = self.headers['Content-Type'] if self.has_content_type else detect_mime_type(self.file_path)
+        return stat, content_type
+
+    @classmethod
+    def is_not_modified(cls, request: 'Request', etag: str, last_modified: float) -> bool:
+        if if_none_match := request.headers.if_none_match:
+            return is_etag_matched(if_none_match=if_none_match, etag=etag)
+        if if_modified_since := request.headers.if_modified_since:
+            try:
+                return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @classmethod
+    def parse_range(cls, request: 'Request', size: int, etag: str, last_modified: str) -> tuple[int, int] | None:
+        """
+        Returns the (start, end) of a single `bytes` range, `None` means send the whole file.
+        Raises `ValueError` if the range is not satisfiable.
+        """
+        range_header = request.headers.range
+        if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+            return None  # Multiple ranges are not supported, the whole file is sent
+        if (if_range := request.headers.if_range) and if_range not in {etag, last_modified}:
+            return None
+
+        start, _, end = range_header.removeprefix('bytes=').strip().partition('-')
+        if not start:  # Suffix range, e.g. `bytes=-500`
+            if not end.isdigit() or int(end) == 0:
+                raise ValueError
+            return max(size - int(end), 0), size - 1
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            raise ValueError
+        return start, end
+
+    async def send(self, send, receive, request: 'Request | None' = None):
+        if (result := await asyncio.to_thread(self.stat)) is None:
+            self.status_code = status.HTTP_404_NOT_FOUND
+            return await ERROR_RESPONSES[NotFoundAPIError].send(send=send, receive=receive)
+
+        stat, content_type = result
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.headers = self.headers | {
+            'Content-Type': content_type,
+            'Accept-Ranges': 'bytes',
+            'ETag': etag,
+            'Last-Modified': last_modified,
+        }
+
+        start, end = 0, stat.st_size - 1
+        if request is not None and request.method == 'GET':
+            if self.is_not_modified(request=request, etag=etag, last_modified=stat.st_mtime):
+                self.status_code = status.HTTP_304_NOT_MODIFIED
+                headers = [(k.encode(), str(v).encode()) for k, v in self.headers.items() if k != 'Content-Type']
+                await send({'type': 'http.response.start', 'status': self.status_code, 'headers': headers})
+                return await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            try:
+                if file_range := self.parse_range(
+                    request=request,
+                    size=stat.st_size,
+                    etag=etag,
+                    last_modified=last_modified,
+                ):
+                    start, end = file_range
+                    self.status_code = status.HTTP_206_PARTIAL_CONTENT
+                    self.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            except ValueError:
+                self.status_code = status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+                headers = [(b'Content-Range', f'bytes */{stat.st_size}'.encode()), (b'Content-Length', b'0')]
+                await send({'type': 'http.response.start', 'status': self.status_code, 'headers': headers})
+                return await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+        count = end - start + 1
+        headers = [
+            (b'Content-Length', str(count).encode()),
+            *(encode_header(item) for item in self.headers.items()),
+        ]
+        if self.cookies:
+            headers += self.cookies
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': headers})
+
+        extensions = request.scope.get('extensions') or {} if request is not None else {}
+        if 'http.response.pathsend' in extensions and count == stat.st_size:
+            return await send({'type': 'http.response.pathsend', 'path': str(self.file_path.resolve())})
+
+        file = await asyncio.to_thread(open, self.file_path, 'rb')
+        try:
+            if 'http.response.zerocopysend' in extensions:
+                return await send(
+                    {'type': 'http.response.zerocopysend', 'file': file, 'offset': start, 'count': count},
+                )
+
+            await asyncio.to_thread(file.seek, start)
+            more_body = True
+            while count > 0:
+                chunk = await asyncio.to_thread(file.read, min(self.chunk_size, count))
+                if not chunk:
+                    break
+                count -= len(chunk)
+                more_body = count > 0
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+            if more_body:  # The file is empty, or it got shorter while it was being sent
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            await asyncio.to_thread(file.close)
 
 
 class TemplateResponse(HTMLResponse):
@@ -383,3 +580,80 @@ class RedirectResponse(Response):
             status_code=status_code,
             set_cookies=set_cookies,
         )
+
+
+class NotModifiedResponse(Response):
+    """
+    Bodiless `304 Not Modified`, it only has the validators (e.g. `ETag`) and the headers which are set on it.
+    """
+
+    # RFC 9110 (15.4.5), a 304 has to send these headers if the 200 would have sent them
+    FORWARDED_HEADERS = frozenset({'cache-control', 'content-location', 'date', 'etag', 'expires', 'vary'})
+
+    def __init__(self, headers: dict | None = None):
+        super().__init__(status_code=status.HTTP_304_NOT_MODIFIED)
+        self.headers = headers or {}
+
+    @classmethod
+    def from_response(cls, response: Response) -> 'NotModifiedResponse':
+        return cls(headers={k: v for k, v in response.headers.items() if k.lower() in cls.FORWARDED_HEADERS})
+
+    @property
+    def bytes_headers(self) -> list[tuple[bytes, bytes]]:
+        result = [(k.encode(), str(v).encode()) for k, v in self.headers.items()]
+        if self.cookies:
+            result += self.cookies
+        return result
+
+
+@dataclass(frozen=True, slots=True)
+class PrebuiltResponse:
+    """
+    Immutable, already rendered JSON response, used for the framework-generated errors,
+        so they cost (almost) nothing to build. Extra headers (e.g. `Retry-After`) can be passed to `send()`.
+    """
+
+    status_code: int
+    body: bytes
+    headers: tuple[tuple[bytes, bytes], ...]
+
+    @classmethod
+    def from_data(cls, data: dict, status_code: int) -> 'PrebuiltResponse':
+        body = json.dumps(data)
+        return cls(
+            status_code=status_code,
+            body=body,
+            headers=(
+                (b'Content-Length', str(len(body)).encode()),
+                ENCODED_HEADERS[('Content-Type', 'application/json')],
+            ),
+        )
+
+    async def send(self, send, receive, headers: dict | None = None):
+        raw_headers = self.headers
+        if headers:
+            raw_headers = [*raw_headers, *((k.encode(), str(v).encode()) for k, v in headers.items())]
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': self.body, 'more_body': False})
+
+
+ERROR_RESPONSES: dict[type[APIError], PrebuiltResponse] = {
+    error: PrebuiltResponse.from_data(data={'detail': error.detail}, status_code=error.status_code)
+    for error in (
+        APIError,
+        AuthenticationAPIError,
+        AuthorizationAPIError,
+        NotFoundAPIError,
+        MethodNotAllowedAPIError,
+        ThrottlingAPIError,
+    )
+}
+INTERNAL_SERVER_ERROR_RESPONSE = ERROR_RESPONSES[APIError]
+
+
+def get_error_response(error: APIError) -> PrebuiltResponse | None:
+    """Return the prebuilt response of `error`, if it has been raised with its default `detail` & `status_code`"""
+    error_class = type(error)
+    if error.detail is error_class.detail and error.status_code == error_class.status_code:
+        return ERROR_RESPONSES.get(error_class)
+    return None
@@ -1,10 +1,12 @@
 import re
 import types
-from collections import Counter
+from collections import Counter, OrderedDict, namedtuple
 from collections.abc import Callable, Mapping, MutableMapping
 from copy import deepcopy
+from dataclasses import dataclass, field
 from functools import partial, reduce
 
+from panther._utils import ENDPOINT_STATIC_FILES
 from panther.configs import config
 from panther.exceptions import PantherError
 
@@ -128,67 +130,161 @@ def _is_recursive_merge(a, b):
     return both_mapping and not both_counter
 
 
-ENDPOINT_NOT_FOUND = (None, '')
+@dataclass(slots=True)
+class RouteNode:
+    """
+    A single segment of the compiled router.
+        children: static segments, e.g. `user` in `user/<id>/`
+        variable: the only path-variable child of this node (`check_urls_path_variables()` guarantees it)
+        endpoint: the endpoint of this node, if any
+        variables: names of the path variables of the `endpoint` (already stripped), e.g. ('id',) for 'user/<id>'
+        mount: the `endpoint` serves every path under this node too (e.g. `StaticFiles`), the rest is its `path`
+    """
 
+    children: dict[str, 'RouteNode'] = field(default_factory=dict)
+    variable: 'RouteNode | None' = None
+    endpoint: Callable | None = None
+    variables: tuple[str, ...] = ()
+    mount: bool = False
 
-def find_endpoint(path: str) -> tuple[Callable | None, str]:
-    urls = config.URLS
 
-    # 'user/list/?name=ali' --> 'user/list/' --> 'user/list' --> ['user', 'list']
-    parts = path.split('?')[0].strip('/').split('/')
-    paths_len = len(parts)
-
-    found_path = []
-    for i, part in enumerate(parts):
-        last_path = bool((i + 1) == paths_len)
-        found = urls.get(part)
-
-        if last_path:
-            # `found` is callable
-            if callable(found):
-                found_path.append(part)
-                return found, '/'.join(found_path)
-
-            # `found` is dict
-            if isinstance(found, dict):
-                if (endpoint := found.get('')) and callable(endpoint):
-                    found_path.append(part)
-                    return endpoint, '/'.join(found_path)
-                else:
-                    return ENDPOINT_NOT_FOUND
-
-            # `found` is None
-            for key, value in urls.items():
-                if key.startswith('<'):
-                    if callable(value):
-                        found_path.append(key)
-                        return value, '/'.join(found_path)
-
-                    elif isinstance(value, dict) and (endpoint := value.get('')):
-                        if callable(endpoint):
-                            found_path.append(key)
-                            return endpoint, '/'.join(found_path)
-                        else:
-                            return ENDPOINT_NOT_FOUND
-
-            return ENDPOINT_NOT_FOUND
-
-        # `found` is dict
-        elif isinstance(found, dict):
-            found_path.append(part)
-            urls = found
+def is_mount(endpoint: Callable) -> bool:
+    return getattr(endpoint, '_endpoint_type', None) == ENDPOINT_STATIC_FILES
+
+
+def compile_urls(urls: dict, variables: tuple[str, ...] = ()) -> RouteNode:
+    """Convert the nested dict (result of `finalize_urls()`) to a tree of `RouteNode`"""
+    node = RouteNode(variables=variables)
+    if callable(endpoint := urls.get('')):
+        node.endpoint = endpoint
+        node.mount = is_mount(endpoint)
+
+    variable_subtree = None
+    variable_endpoint = None
+    for key, value in urls.items():
+        if key == '':
             continue
 
-        # `found` is callable
-        elif callable(found):
-            return ENDPOINT_NOT_FOUND
+        if key.startswith('<'):
+            new_variables = (*variables, key.strip('< >'))
+            # Continue the path with the first path variable which points to a dict
+            if variable_subtree is None and isinstance(value, dict):
+                variable_subtree = compile_urls(value, variables=new_variables)
+            # End the path with the first path variable which has an endpoint
+            if variable_endpoint is None:
+                if callable(value):
+                    variable_endpoint = RouteNode(endpoint=value, variables=new_variables, mount=is_mount(value))
+                elif isinstance(value, dict) and (endpoint := value.get('')):
+                    endpoint = endpoint if callable(endpoint) else None
+                    variable_endpoint = RouteNode(endpoint=endpoint, variables=new_variables, mount=is_mount(endpoint))
+
+        elif isinstance(value, dict):
+            node.children[key] = compile_urls(value, variables=variables)
+        elif callable(value):
+            node.children[key] = RouteNode(endpoint=value, variables=variables, mount=is_mount(value))
+
+    # Merge both of them into the single path-variable child
+    if variable_subtree is None:
+        node.variable = variable_endpoint
+    else:
+        node.variable = variable_subtree
+        if variable_endpoint is not None:
+            variable_subtree.endpoint = variable_endpoint.endpoint
+            variable_subtree.variables = variable_endpoint.variables
+            variable_subtree.mount = variable_endpoint.mount
 
-        else:
-            # `found` is None
-            for key, value in urls.items():
-                if key.startswith('<') and isinstance(value, dict):
-                    found_path.append(key)
-                    urls = value
-                    break
-            else:
-                return ENDPOINT_NOT_FOUND
+    return node
+
+
+RouteCacheInfo = namedtuple('RouteCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class RouteCache:
+    """
+    Bounded LRU of the resolved routes, `path` --> (endpoint, path_variables)
+    The size comes from `config.ROUTE_CACHE_SIZE`, `0` means it is disabled.
+    Not found paths are never cached.
+    """
+
+    def __init__(self):
+        self.routes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> tuple[Callable, dict[str, str]] | None:
+        if (route := self.routes.get(path)) is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.routes.move_to_end(path)
+        return route
+
+    def set(self, path: str, route: tuple[Callable, dict[str, str]]) -> None:
+        self.routes[path] = route
+        if len(self.routes) > config.ROUTE_CACHE_SIZE:
+            self.routes.popitem(last=False)
+
+    def clear(self) -> None:
+        self.routes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> RouteCacheInfo:
+        return RouteCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=config.ROUTE_CACHE_SIZE,
+            currsize=len(self.routes),
+        )
+
+
+route_cache = RouteCache()
+
+
+def refresh_router() -> RouteNode:
+    """Compile the `config.URLS` and drop the cached routes of the previous one"""
+    config.ROUTER = compile_urls(config.URLS)
+    route_cache.clear()
+    return config.ROUTER
+
+
+# Only for comparison, `match_route()` returns a new `dict` on each miss, so callers can mutate it.
+ENDPOINT_NOT_FOUND = (None, {})
+
+
+def find_endpoint(path: str) -> tuple[Callable | None, dict[str, str]]:
+    """Return the endpoint and its path variables, e.g. (user_detail, {'user_id': '1'}) for 'user/1/'"""
+    if (node := config.ROUTER) is None:
+        # `config.URLS` has been changed, so we have to compile it again.
+        node = refresh_router()
+
+    if config.ROUTE_CACHE_SIZE:
+        if route := route_cache.get(path):
+            return route[0], route[1].copy()
+        endpoint, path_variables = match_route(node=node, path=path)
+        if endpoint is not None:
+            route_cache.set(path, (endpoint, path_variables.copy()))
+        return endpoint, path_variables
+
+    return match_route(node=node, path=path)
+
+
+def match_route(node: RouteNode, path: str) -> tuple[Callable | None, dict[str, str]]:
+    values = []
+    # 'user/list/?name=ali' --> 'user/list/' --> 'user/list' --> ['user', 'list']
+    if path := path.split('?', 1)[0].strip('/'):
+        parts = path.split('/')
+        for index, part in enumerate(parts):
+            if (child := node.children.get(part)) is None:
+                if (child := node.variable) is None:
+                    if node.mount:
+                        # e.g. 'static/css/app.css' --> {'path': 'css/app.css'}
+                        return node.endpoint, {**dict(zip(node.variables, values)), 'path': '/'.join(parts[index:])}
+                    return None, {}
+                values.append(part)
+            node = child
+
+    if node.endpoint is None:
+        return None, {}
+    return node.endpoint, dict(zip(node.variables, values))
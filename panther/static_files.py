@@ -0,0 +1,226 @@
+import asyncio
+import dataclasses
+import mimetypes
+import os
+import stat
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from functools import cached_property
+from pathlib import Path
+
+from panther._utils import ENDPOINT_STATIC_FILES, accepted_encodings, detect_mime_type
+from panther.configs import config
+from panther.exceptions import MethodNotAllowedAPIError, NotFoundAPIError
+from panther.request import Request
+from panther.response import ENCODED_HEADERS, FileResponse, Response
+
+__all__ = ('StaticFiles',)
+
+# Precompressed siblings, in order of preference, e.g. `app.js.br` & `app.js.gz` of `app.js`
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+@dataclass(slots=True, frozen=True)
+class StaticFile:
+    """Content of a cached file, with its headers already built (and encoded)"""
+
+    path: Path
+    mtime_ns: int
+    size: int
+    body: bytes
+    headers: dict[str, str]
+    raw_headers: list[tuple[bytes, bytes]]
+    checked_at: float  # `time.monotonic()` of the last `stat()`
+
+
+class StaticFilesCache:
+    """Bounded LRU of the `StaticFile`s, `max_size` is the sum of their sizes in bytes."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.files: OrderedDict[tuple, StaticFile] = OrderedDict()
+
+    def get(self, key: tuple) -> StaticFile | None:
+        if (file := self.files.get(key)) is not None:
+            self.files.move_to_end(key)
+        return file
+
+    def set(self, key: tuple, file: StaticFile) -> None:
+        if (old := self.files.pop(key, None)) is not None:
+            self.size -= old.size
+        self.files[key] = file
+        self.size += file.size
+        while self.size > self.max_size:
+            _, evicted = self.files.popitem(last=False)
+            self.size -= evicted.size
+
+    def clear(self) -> None:
+        self.files.clear()
+        self.size = 0
+
+
+class StaticFiles:
+    """
+    Usage Example:
+        from panther.static_files import StaticFiles
+
+        urls = {
+            'static': StaticFiles(directory='static'),
+        }
+
+    Serves the files of `directory` (relative to `BASE_DIR`) on every path under its url, e.g. `static/css/app.css`
+    directory: The directory of the files.
+    cache_size: Max total size (bytes) of the files which are kept in memory, they are validated with their `mtime`.
+    check_interval: Seconds which a cached file is served without checking its `mtime` again.
+    max_file_size: Bigger files are not cached, they are streamed with `FileResponse`.
+    precompressed: Serve the `.br`/ `.gz` sibling of the file (if it exists) when the `Accept-Encoding` allows it.
+    bypass_middlewares: Serve the files before (without) the global middlewares.
+    """
+
+    _endpoint_type = ENDPOINT_STATIC_FILES
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        cache_size: int = 32 * 1024 * 1024,
+        check_interval: float = 1,
+        max_file_size: int = 1024 * 1024,
+        precompressed: bool = True,
+        bypass_middlewares: bool = False,
+    ):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.max_file_size = max_file_size
+        self.precompressed = precompressed
+        self.bypass_middlewares = bypass_middlewares
+        self.cache = StaticFilesCache(max_size=cache_size)
+        # `Panther.handle_http()` calls it directly when there are no global middlewares (or `bypass_middlewares`)
+        self.fast_handler = self.handle_fast_endpoint
+
+    def __deepcopy__(self, memo: dict) -> 'StaticFiles':
+        # The urls are deep-copied while they are being merged, keep this instance (and its cache)
+        return self
+
+    @cached_property
+    def root(self) -> Path:
+        # `BASE_DIR` is not set yet when the urls are being defined, so it is resolved on the first request.
+        return (config.BASE_DIR / self.directory).resolve()
+
+    async def __call__(self, request: Request) -> Response:
+        file = await self.find_file(request=request)
+        if isinstance(file, FileResponse):
+            return file
+        return Response(data=file.body, headers=file.headers)
+
+    async def handle_fast_endpoint(self, request: Request, send) -> Response | None:
+        """Send the cached files directly, with their prebuilt headers"""
+        file = await self.find_file(request=request)
+        if isinstance(file, FileResponse):
+            return file
+        await send({'type': 'http.response.start', 'status': 200, 'headers': file.raw_headers})
+        await send({'type': 'http.response.body', 'body': file.body, 'more_body': False})
+        return None
+
+    async def find_file(self, request: Request) -> StaticFile | FileResponse:
+        if request.method != 'GET':
+            raise MethodNotAllowedAPIError
+
+        # e.g. `static//etc/passwd` --> '/etc/passwd' & `static/css/../../secret` are rejected here,
+        #   symlinks to the outside of the `root` are rejected by `lookup()`.
+        path = (request.path_variables or {}).get('path')
+        if not path or '\x00' in path or any(part in {'', '.', '..'} for part in path.split('/')):
+            raise NotFoundAPIError
+
+        # Conditional, range and big files are handled by `FileResponse`
+        headers = request.headers
+        conditional = bool(headers.range or headers.if_none_match or headers.if_modified_since)
+        candidates = self.candidates(accept_encoding=headers.accept_encoding)
+        key = (path, candidates)
+
+        file = None if conditional else self.cache.get(key)
+        if file is not None and time.monotonic() - file.checked_at < self.check_interval:
+            return file
+
+        # `stat()` (and reading the file) may block on a slow disk, so it is done in a thread.
+        result = await asyncio.to_thread(self.lookup, path, candidates, file, conditional)
+        if result is None:
+            raise NotFoundAPIError
+        if isinstance(result, StaticFile):
+            self.cache.set(key, result)
+        return result
+
+    def lookup(
+        self,
+        path: str,
+        candidates: tuple[tuple[str | None, str], ...],
+        cached: StaticFile | None,
+        conditional: bool,
+    ) -> StaticFile | FileResponse | None:
+        """Blocking, it is called in a thread. Returns `None` if none of the candidates is a file inside the `root`."""
+        content_type = mimetypes.guess_type(path)[0]
+        for encoding, suffix in candidates:
+            file_path = (self.root / (path + suffix)).resolve()
+            if not file_path.is_relative_to(self.root):
+                continue
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+
+            response_headers = {'Content-Type': content_type} if content_type else {}
+            if encoding:
+                response_headers['Content-Encoding'] = encoding
+            if self.precompressed:
+                response_headers['Vary'] = 'Accept-Encoding'
+            if conditional or file_stat.st_size > self.max_file_size:
+                return FileResponse(file_path=file_path, headers=response_headers)
+
+            if (
+                cached is not None
+                and cached.path == file_path
+                and cached.mtime_ns == file_stat.st_mtime_ns
+                and cached.size == file_stat.st_size
+            ):
+                return dataclasses.replace(cached, checked_at=time.monotonic())
+            return self.load_file(file_path=file_path, file_stat=file_stat, headers=response_headers)
+        return None
+
+    def candidates(self, accept_encoding: str | None) -> tuple[tuple[str | None, str], ...]:
+        """(encoding, suffix) of the files which can be sent, the original file is the last one."""
+        if not self.precompressed or not accept_encoding:
+            return ((None, ''),)
+        encodings = accepted_encodings(accept_encoding)
+        if '*' in encodings:
+            return (*PRECOMPRESSED_SUFFIXES, (None, ''))
+        return (*(candidate for candidate in PRECOMPRESSED_SUFFIXES if candidate[0] in encodings), (None, ''))
+
+    @classmethod
+    def load_file(cls, file_path: Path, file_stat: os.stat_result, headers: dict[str, str]) -> StaticFile:
+        """Blocking, it is called in a thread."""
+        body = file_path.read_bytes()
+        headers = {
+            'Content-Type': headers.get('Content-Type') or detect_mime_type(file_path),
+            **headers,
+            'Accept-Ranges': 'bytes',
+            'ETag': f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"',  # Same as the `FileResponse`
+            'Last-Modified': formatdate(file_stat.st_mtime, usegmt=True),
+        }
+        raw_headers = [
+            (b'Content-Length', str(len(body)).encode()),
+            *(ENCODED_HEADERS.get(item) or (item[0].encode(), item[1].encode()) for item in headers.items()),
+        ]
+        return StaticFile(
+            path=file_path,
+            mtime_ns=file_stat.st_mtime_ns,
+            size=len(body),
+            body=body,
+            headers=headers,
+            raw_headers=raw_headers,
+            checked_at=time.monotonic(),
+        )
@@ -57,19 +57,20 @@ class RequestClient:
         )
         response_headers = {key.decode(): value.decode() for key, value in self.header['headers']}
         cookies = [(key, value) for key, value in self.header['headers'] if key.decode() == 'Set-Cookie']
-        if response_headers['Content-Type'] == 'text/html; charset=utf-8':
+        content_type = response_headers.get('Content-Type')
+        if content_type == 'text/html; charset=utf-8':
             data = self.response.decode()
             response = HTMLResponse(data=data, status_code=self.header['status'], headers=response_headers)
 
-        elif response_headers['Content-Type'] == 'text/plain; charset=utf-8':
+        elif content_type == 'text/plain; charset=utf-8':
             data = self.response.decode()
             response = PlainTextResponse(data=data, status_code=self.header['status'], headers=response_headers)
 
-        elif response_headers['Content-Type'] == 'application/octet-stream':
+        elif content_type == 'application/octet-stream':
             data = self.response.decode()
             response = PlainTextResponse(data=data, status_code=self.header['status'], headers=response_headers)
 
-        elif response_headers['Content-Type'] == 'application/json':
+        elif content_type == 'application/json':
             data = json.loads(self.response or b'null')
             response = Response(data=data, status_code=self.header['status'], headers=response_headers)
 
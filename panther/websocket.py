@@ -4,6 +4,7 @@ from typing import Callable
 
 from panther import status
 from panther._utils import ENDPOINT_WEBSOCKET
+from panther.base_request import BaseRequest
 from panther.base_websocket import Websocket
 from panther.configs import config
 
@@ -14,6 +15,10 @@ class GenericWebsocket(Websocket):
     permissions: list = []
 
     def __init__(self, parent):
+        # `BaseRequest` attributes are slots, so they are not in the `__dict__`
+        for attr in BaseRequest.__slots__:
+            if attr != '__dict__':
+                setattr(self, attr, getattr(parent, attr))
         self.__dict__ = parent.__dict__.copy()
 
     async def connect(self, **kwargs):
@@ -34,6 +34,8 @@ EXTRAS_REQUIRE = {
         'websockets~=15.0.1',
         'cryptography~=45.0.5',
         'watchfiles~=1.1.0',
+        'brotli~=1.1.0',
+        'zstandard~=0.23.0',
     ],
 }
 
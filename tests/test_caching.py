@@ -1,14 +1,35 @@
 import asyncio
 import time
 from datetime import timedelta
-from unittest import IsolatedAsyncioTestCase
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
 
 import pytest
+from fakeredis import FakeAsyncRedis
 
 from panther import Panther
 from panther.app import API
+from panther.base_request import Address
+from panther.caching import (
+    WORKER_ID,
+    CachedResponse,
+    CachePolicy,
+    MemoryCache,
+    api_cache_key,
+    caches,
+    delete_response_from_cache,
+    get_response_from_cache,
+    invalidate_l1_cache,
+    l1_caches,
+    pack_cached_response,
+    set_response_in_cache,
+    start_invalidation_listener,
+    unpack_cached_response,
+)
 from panther.configs import config
-from panther.response import HTMLResponse
+from panther.exceptions import BadRequestAPIError, PantherError
+from panther.request import Request
+from panther.response import HTMLResponse, Response
 from panther.test import APIClient
 
 
@@ -30,10 +51,44 @@ async def expired_cache_html_response():
     return HTMLResponse(data=f'<html>{time.time()}</html>')
 
 
+def make_request(path: str, query_string: bytes = b'', headers: list | None = None, ip: str = '127.0.0.1') -> Request:
+    scope = {'type': 'http', 'path': path, 'query_string': query_string, 'headers': headers or [], 'client': (ip, 8000)}
+    return Request(scope=scope, receive=None, send=None)
+
+
+CALLS = []
+FAIL_FIRST_CALL = False
+
+
+@API(cache=timedelta(seconds=10))
+async def slow_cache_api():
+    CALLS.append(time.time())
+    await asyncio.sleep(0.1)
+    if len(CALLS) == 1 and FAIL_FIRST_CALL:
+        raise BadRequestAPIError
+    return {'detail': len(CALLS)}
+
+
+@API(cache=timedelta(seconds=1), stale_while_revalidate=timedelta(seconds=10))
+async def stale_cache_api():
+    CALLS.append(time.time())
+    await asyncio.sleep(0.05)
+    return {'detail': len(CALLS)}
+
+
+@API(cache=CachePolicy(duration=timedelta(seconds=10), public=True, vary_headers=['Accept-Language']))
+async def public_cache_api(request: Request):
+    CALLS.append(time.time())
+    return {'detail': len(CALLS), 'language': request.headers.accept_language}
+
+
 urls = {
     'without-cache': without_cache_api,
     'with-expired-cache': expired_cache_api,
     'with-html-response-cache': expired_cache_html_response,
+    'slow-cache': slow_cache_api,
+    'stale-cache': stale_cache_api,
+    'public-cache': public_cache_api,
 }
 
 
@@ -43,9 +98,14 @@ class TestInMemoryCaching(IsolatedAsyncioTestCase):
         app = Panther(__name__, configs=__name__, urls=urls)
         cls.client = APIClient(app=app)
 
+    def setUp(self) -> None:
+        caches.clear()
+        CALLS.clear()
+
     @classmethod
     def tearDownClass(cls):
         config.refresh()
+        caches.clear()
 
     async def test_without_cache(self):
         res1 = await self.client.get('without-cache')
@@ -64,7 +124,10 @@ class TestInMemoryCaching(IsolatedAsyncioTestCase):
 
         # Check Logs
         assert len(captured.records) == 1
-        assert captured.records[0].getMessage() == '`cache` is not very accurate when `redis` is not connected.'
+        assert (
+            captured.records[0].getMessage()
+            == '`cache` is not shared between the workers when `redis` is not connected.'
+        )
 
         # Second Request
         res2 = await self.client.get('with-expired-cache')
@@ -96,3 +159,322 @@ class TestInMemoryCaching(IsolatedAsyncioTestCase):
 
         # Check Content-Type
         assert res1.headers['Content-Type'] == res2.headers['Content-Type']
+
+    async def test_cache_info(self):
+        await self.client.get('with-expired-cache')
+        await self.client.get('with-expired-cache')
+        info = caches.info()
+        assert info.hits == 1
+        assert info.misses == 1
+        assert info.entries == 1
+        assert info.size > 0
+
+    async def test_single_flight(self):
+        responses = await asyncio.gather(*[self.client.get('slow-cache') for _ in range(10)])
+        assert len(CALLS) == 1
+        assert {res.status_code for res in responses} == {200}
+        assert {res.data['detail'] for res in responses} == {1}
+
+    async def test_single_flight_failure(self):
+        global FAIL_FIRST_CALL
+        FAIL_FIRST_CALL = True
+        try:
+            responses = await asyncio.gather(*[self.client.get('slow-cache') for _ in range(5)])
+        finally:
+            FAIL_FIRST_CALL = False
+        # The others don't share the failure, one of them calls the endpoint again
+        assert len(CALLS) == 2
+        assert sorted(res.status_code for res in responses) == [200, 200, 200, 200, 400]
+
+    async def test_stale_while_revalidate(self):
+        res = await self.client.get('stale-cache')
+        assert res.data == {'detail': 1}
+
+        with patch('panther.caching.time.time', return_value=time.time() + 2):
+            responses = await asyncio.gather(*[self.client.get('stale-cache') for _ in range(5)])
+            # The stale response is served, while it is being refreshed once
+            assert [res.data for res in responses] == [{'detail': 1}] * 5
+            await asyncio.sleep(0.1)
+            assert len(CALLS) == 2
+            res = await self.client.get('stale-cache')
+        assert res.data == {'detail': 2}
+
+    async def test_public_cache_policy(self):
+        res1 = await self.client.get('public-cache', headers={'Accept-Language': 'en'})
+        assert res1.data == {'detail': 1, 'language': 'en'}
+        assert res1.headers['Vary'] == 'Accept-Language'
+
+        # Shared between the users (IPs)
+        with patch('panther.base_request.BaseRequest.client', Address('10.0.0.1', 8000)):
+            res2 = await self.client.get('public-cache', headers={'Accept-Language': 'en'})
+        assert res2.data == res1.data
+        assert res2.headers['Vary'] == 'Accept-Language'
+
+        # The `vary_headers` make a different response
+        res3 = await self.client.get('public-cache', headers={'Accept-Language': 'fa'})
+        assert res3.data == {'detail': 2, 'language': 'fa'}
+        assert len(CALLS) == 2
+
+    async def test_duration_instead_of_policy(self):
+        request = make_request('/a', b'x=1')
+        # The interface before `CachePolicy`, it means the default per-user policy
+        assert api_cache_key(request=request) == CachePolicy(duration=timedelta(seconds=10)).build_cache_key(request)
+        assert await get_response_from_cache(request=request, duration=timedelta(seconds=10)) is None
+
+        await set_response_in_cache(request=request, response=Response(data={'a': 1}), duration=timedelta(seconds=10))
+        cached = await get_response_from_cache(request=request, duration=timedelta(seconds=10))
+        assert cached.data == b'{"a":1}'
+        assert cached == await get_response_from_cache(
+            request=request, policy=CachePolicy(duration=timedelta(seconds=10))
+        )
+
+        await delete_response_from_cache(request=request)
+        assert await get_response_from_cache(request=request, duration=timedelta(seconds=10)) is None
+
+        with self.assertRaises(TypeError):
+            await get_response_from_cache(request=request)
+
+    def test_stale_while_revalidate_needs_cache(self):
+        with pytest.raises(PantherError, match='`stale_while_revalidate` needs `cache`.'):
+            API(stale_while_revalidate=timedelta(seconds=10))
+
+
+class TestMemoryCache(TestCase):
+    def setUp(self) -> None:
+        self.cache = MemoryCache()
+
+    def tearDown(self) -> None:
+        config.refresh()
+
+    def test_get_and_set(self):
+        assert self.cache.get('a') is None
+        self.cache.set('a', value='A', ttl=10, size=1)
+        assert self.cache.get('a') == 'A'
+        assert self.cache.info()[:4] == (1, 1, 0, 0)
+
+    def test_max_entries_evicts_least_recently_used(self):
+        config.CACHE_MAX_ENTRIES = 2
+        self.cache.set('a', value='A', ttl=10, size=1)
+        self.cache.set('b', value='B', ttl=10, size=1)
+        self.cache.get('a')
+        self.cache.set('c', value='C', ttl=10, size=1)
+        assert list(self.cache.entries) == ['a', 'c']
+        assert self.cache.evictions == 1
+
+    def test_max_size(self):
+        config.CACHE_MAX_SIZE = 10
+        self.cache.set('a', value='A', ttl=10, size=6)
+        self.cache.set('b', value='B', ttl=10, size=6)
+        assert list(self.cache.entries) == ['b']
+        assert self.cache.size == 6
+
+        # Bigger than the whole budget, it is not cached at all
+        self.cache.set('c', value='C', ttl=10, size=11)
+        assert list(self.cache.entries) == ['b']
+
+        # Replacing an entry doesn't count its old size
+        self.cache.set('b', value='B2', ttl=10, size=4)
+        assert self.cache.size == 4
+
+    def test_lazy_expiration(self):
+        with patch('panther.caching.time.monotonic', return_value=100):
+            self.cache.set('a', value='A', ttl=5, size=1)
+        with patch('panther.caching.time.monotonic', return_value=104):
+            assert self.cache.get('a') == 'A'
+        with patch('panther.caching.time.monotonic', return_value=105):
+            assert self.cache.get('a') is None
+        assert self.cache.expirations == 1
+        assert self.cache.size == 0
+
+    def test_periodic_expiration(self):
+        with patch('panther.caching.time.monotonic', return_value=100):
+            self.cache.last_sweep = 100
+            self.cache.set('a', value='A', ttl=5, size=1)
+            self.cache.set('b', value='B', ttl=500, size=1)
+        with patch('panther.caching.time.monotonic', return_value=100 + MemoryCache.sweep_interval):
+            self.cache.set('c', value='C', ttl=5, size=1)
+        assert list(self.cache.entries) == ['b', 'c']
+        assert self.cache.expirations == 1
+
+
+class TestCachePolicy(TestCase):
+    def test_per_user_key(self):
+        policy = CachePolicy(duration=timedelta(seconds=10))
+        key = policy.build_cache_key(make_request('/a', b'x=1'))
+        assert key.startswith('cache-')
+        assert len(key) == 38
+        assert key == policy.build_cache_key(make_request('/a', b'x=1'))
+        assert key != policy.build_cache_key(make_request('/a', b'x=1', ip='10.0.0.1'))
+        assert key != policy.build_cache_key(make_request('/a', b'x=2'))
+        assert key != policy.build_cache_key(make_request('/b', b'x=1'))
+
+    def test_public_key(self):
+        policy = CachePolicy(duration=timedelta(seconds=10), public=True)
+        assert policy.build_cache_key(make_request('/a')) == policy.build_cache_key(make_request('/a', ip='10.0.0.1'))
+
+    def test_vary_query_params(self):
+        policy = CachePolicy(duration=timedelta(seconds=10), vary_query_params=['page'])
+        key = policy.build_cache_key(make_request('/a', b'page=1&utm_source=x'))
+        assert key == policy.build_cache_key(make_request('/a', b'utm_source=y&page=1'))
+        assert key != policy.build_cache_key(make_request('/a', b'page=2'))
+
+        # The order of all the query params doesn't matter
+        policy = CachePolicy(duration=timedelta(seconds=10))
+        key = policy.build_cache_key(make_request('/a', b'a=1&b=2'))
+        assert key == policy.build_cache_key(make_request('/a', b'b=2&a=1'))
+
+    def test_vary_headers(self):
+        policy = CachePolicy(duration=timedelta(seconds=10), vary_headers=['Accept-Language'])
+        en = policy.build_cache_key(make_request('/a', headers=[(b'accept-language', b'en')]))
+        fa = policy.build_cache_key(make_request('/a', headers=[(b'accept-language', b'fa')]))
+        assert en != fa
+        assert en == policy.build_cache_key(make_request('/a', headers=[(b'accept-language', b'en'), (b'x', b'y')]))
+
+    def test_key_func(self):
+        policy = CachePolicy(duration=timedelta(seconds=10), key_func=lambda request: request.path.split('/')[1])
+        key = policy.build_cache_key(make_request('/a/1'))
+        assert key == policy.build_cache_key(make_request('/a/2', ip='1.1.1.1'))
+        assert key != policy.build_cache_key(make_request('/b/1'))
+
+
+class TestRedisCaching(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        app = Panther(__name__, configs=__name__, urls=urls)
+        cls.client = APIClient(app=app)
+
+    def setUp(self) -> None:
+        self.redis = FakeAsyncRedis()
+        self.redis.is_connected = True
+        patcher = patch('panther.caching.redis', self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config.CACHE_L1_SIZE = 0
+        config.CACHE_L1_INVALIDATION = False
+        l1_caches.clear()
+        CALLS.clear()
+
+    async def asyncTearDown(self) -> None:
+        await self.redis.aclose()
+
+    @classmethod
+    def tearDownClass(cls):
+        config.refresh()
+        l1_caches.clear()
+
+    def test_pack_and_unpack(self):
+        cached = CachedResponse(data=b'<html>', headers={'Content-Type': 'text/html'}, status_code=201, fresh_until=5.5)
+        value = pack_cached_response(cached)
+        assert value.endswith(b'{"Content-Type":"text/html"}<html>')
+        assert unpack_cached_response(value) == cached
+        # The older (json) format is a miss
+        assert unpack_cached_response(b'["{}", {}, 200]') is None
+
+    async def test_redis_cache(self):
+        res1 = await self.client.get('with-html-response-cache')
+        res2 = await self.client.get('with-html-response-cache')
+        assert res1.data == res2.data
+        assert res1.headers['Content-Type'] == res2.headers['Content-Type'] == 'text/html; charset=utf-8'
+
+        keys = await self.redis.keys()
+        assert len(keys) == 1
+        assert 0 < await self.redis.ttl(keys[0]) <= 2
+        assert l1_caches.entries == {}  # L1 is disabled by default
+
+    async def test_l1_cache(self):
+        config.CACHE_L1_SIZE = 10
+        res1 = await self.client.get('with-html-response-cache')
+        assert len(l1_caches.entries) == 1
+
+        # It is served from L1, even if Redis has lost it
+        await self.redis.flushall()
+        res2 = await self.client.get('with-html-response-cache')
+        assert res1.data == res2.data
+        assert l1_caches.hits == 1
+
+    async def test_l1_ttl_is_bounded_by_redis_ttl(self):
+        config.CACHE_L1_SIZE = 10
+        await self.client.get('with-html-response-cache')
+        l1_caches.clear()
+
+        # Filled from Redis, with the remaining TTL of the entry
+        with patch('panther.caching.time.time', return_value=time.time() + 1.5):
+            await self.client.get('with-html-response-cache')
+        ((expires_at, _, _),) = l1_caches.entries.values()
+        assert expires_at - time.monotonic() <= 0.5
+
+    def test_invalidate_l1_cache(self):
+        config.CACHE_L1_SIZE = 10
+        l1_caches.set('key', value='value', ttl=10, size=1)
+
+        invalidate_l1_cache(f'{WORKER_ID}:key'.encode())
+        assert 'key' in l1_caches.entries  # Its own message
+
+        invalidate_l1_cache(b'another-worker:key')
+        assert l1_caches.entries == {}
+
+    async def test_wait_for_another_worker(self):
+        # Another worker is calling the endpoint
+        await self.client.get('without-cache')  # Nothing is cached
+        key = CachePolicy(duration=timedelta(seconds=10)).build_cache_key(make_request('/slow-cache'))
+        await self.redis.set(f'{key}-lock', 'another-worker', px=5000)
+
+        async def cache_it():
+            await asyncio.sleep(0.1)
+            cached = CachedResponse(data=b'{"detail":"another-worker"}', headers={}, status_code=200)
+            await self.redis.set(key, pack_cached_response(cached))
+            await self.redis.delete(f'{key}-lock')
+
+        _, res = await asyncio.gather(cache_it(), self.client.get('slow-cache'))
+        assert res.data == {'detail': 'another-worker'}
+        assert CALLS == []
+
+    async def test_lock_is_released(self):
+        await self.redis.flushall()
+        key = CachePolicy(duration=timedelta(seconds=10)).build_cache_key(make_request('/slow-cache'))
+
+        res = await self.client.get('slow-cache')
+        assert res.status_code == 200
+        assert await self.redis.exists(f'{key}-lock') == 0
+
+    async def test_lock_of_another_worker_is_not_released(self):
+        await self.redis.flushall()
+        key = CachePolicy(duration=timedelta(seconds=10)).build_cache_key(make_request('/slow-cache'))
+
+        async def take_the_lock():
+            await asyncio.sleep(0.05)
+            # The lock of this worker has expired, and another worker has taken it
+            await self.redis.set(f'{key}-lock', 'another-worker', px=5000)
+
+        _, res = await asyncio.gather(take_the_lock(), self.client.get('slow-cache'))
+        assert res.status_code == 200
+        assert await self.redis.get(f'{key}-lock') == b'another-worker'
+
+    async def test_invalidation_listener_failure_is_logged(self):
+        config.CACHE_L1_SIZE = 10
+        l1_caches.set('key', value='value', ttl=10, size=1)
+
+        async def listen_to_invalidations():
+            raise ConnectionError('Connection lost')
+
+        with (
+            patch('panther.caching._invalidation_listener', None),
+            patch('panther.caching.listen_to_invalidations', listen_to_invalidations),
+            self.assertLogs('panther', level='ERROR') as captured,
+        ):
+            start_invalidation_listener()
+            await asyncio.sleep(0.01)
+
+        assert 'L1 cache invalidation listener has stopped: Connection lost' in captured.output[0]
+        assert l1_caches.entries == {}  # Its invalidations may have been missed
+
+    async def test_l1_invalidation_through_pubsub(self):
+        config.CACHE_L1_SIZE = 10
+        config.CACHE_L1_INVALIDATION = True
+        await self.client.get('with-html-response-cache')
+        (key,) = l1_caches.entries
+        await asyncio.sleep(0.05)  # Let the listener subscribe
+
+        await self.redis.publish('panther:cache:invalidate', f'another-worker:{key}')
+        await asyncio.sleep(0.05)
+        assert l1_caches.entries == {}
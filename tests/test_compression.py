@@ -0,0 +1,169 @@
+import gzip
+import zlib
+from unittest import IsolatedAsyncioTestCase
+
+from panther import Panther
+from panther.app import API
+from panther.configs import config
+from panther.middlewares.compression import CompressionMiddleware
+from panther.response import FileResponse, Response, StreamingResponse
+
+DATA = [{'id': i, 'username': f'user-{i}'} for i in range(100)]
+
+
+@API()
+async def list_api():
+    return DATA
+
+
+@API(etag=True)
+async def etag_api():
+    return DATA
+
+
+@API()
+async def small_api():
+    return {'detail': 'ok'}
+
+
+@API()
+async def image_api():
+    return Response(data=b'\x89PNG' * 1000, headers={'Content-Type': 'image/png'})
+
+
+@API()
+async def file_api():
+    return FileResponse('README.md')
+
+
+def chunks():
+    for i in range(3):
+        yield f'chunk-{i}-'.encode() * 100
+
+
+@API()
+async def stream_api():
+    return StreamingResponse(data=chunks())
+
+
+urls = {
+    'list': list_api,
+    'etag': etag_api,
+    'small': small_api,
+    'image': image_api,
+    'file': file_api,
+    'stream': stream_api,
+}
+
+MIDDLEWARES = [CompressionMiddleware]
+
+
+class TestCompressionMiddleware(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = Panther(__name__, configs=__name__, urls=urls)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        config.refresh()
+
+    async def request(
+        self,
+        path: str,
+        accept_encoding: str | None = 'gzip',
+        if_none_match: str | None = None,
+    ) -> tuple[int, dict, list[bytes]]:
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        headers = [(b'accept-encoding', accept_encoding.encode())] if accept_encoding else []
+        if if_none_match:
+            headers.append((b'if-none-match', if_none_match.encode()))
+        scope = {'type': 'http', 'method': 'GET', 'path': f'/{path}', 'headers': headers, 'query_string': b''}
+        await self.app(scope=scope, receive=receive, send=send)
+        start = messages[0]
+        bodies = [m['body'] for m in messages[1:] if m['type'] == 'http.response.body']
+        return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, bodies
+
+    async def test_compress(self):
+        status, headers, bodies = await self.request('list')
+        assert status == 200
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Vary'] == 'Accept-Encoding'
+        body = b''.join(bodies)
+        assert int(headers['Content-Length']) == len(body)
+        assert gzip.decompress(body) == Response(data=DATA).body
+
+    async def test_compress_in_thread(self):
+        config.COMPRESSION_THREAD_SIZE = 1
+        try:
+            _, headers, bodies = await self.request('list')
+        finally:
+            config.COMPRESSION_THREAD_SIZE = None
+        assert headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(b''.join(bodies)) == Response(data=DATA).body
+
+    async def test_not_accepted(self):
+        for accept_encoding in (None, 'identity', 'gzip;q=0', 'compress'):
+            _, headers, bodies = await self.request('list', accept_encoding=accept_encoding)
+            assert 'Content-Encoding' not in headers
+            assert b''.join(bodies) == Response(data=DATA).body
+
+    async def test_skip_small_body(self):
+        _, headers, bodies = await self.request('small')
+        assert 'Content-Encoding' not in headers
+        assert bodies == [b'{"detail":"ok"}']
+
+    async def test_skip_compressed_content_types(self):
+        _, headers, _ = await self.request('image')
+        assert 'Content-Encoding' not in headers
+
+    async def test_skip_file_response(self):
+        _, headers, _ = await self.request('file')
+        assert 'Content-Encoding' not in headers
+
+    async def test_streaming_response(self):
+        status, headers, bodies = await self.request('stream')
+        assert status == 200
+        assert headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in headers
+
+        # Each chunk is flushed, so it can be decompressed as soon as it is received
+        decompressor = zlib.decompressobj(31)
+        received = [decompressor.decompress(body) for body in bodies]
+        assert received[:3] == [f'chunk-{i}-'.encode() * 100 for i in range(3)]
+        assert b''.join(received) == b''.join(f'chunk-{i}-'.encode() * 100 for i in range(3))
+        assert decompressor.eof
+
+    async def test_etag_of_each_encoding(self):
+        _, identity_headers, _ = await self.request('etag', accept_encoding=None)
+        _, gzip_headers, _ = await self.request('etag')
+        identity_etag = identity_headers['ETag']
+        gzip_etag = gzip_headers['ETag']
+        assert gzip_etag == f'{identity_etag[:-1]}-gzip"'
+
+        # Each `ETag` only validates its own representation
+        status, headers, bodies = await self.request('etag', if_none_match=gzip_etag)
+        assert status == 304
+        assert headers['ETag'] == gzip_etag
+        assert headers['Vary'] == 'Accept-Encoding'
+        assert b''.join(bodies) == b''
+
+        status, headers, bodies = await self.request('etag', accept_encoding=None, if_none_match=gzip_etag)
+        assert status == 200
+        assert b''.join(bodies) == Response(data=DATA).body
+
+        status, headers, _ = await self.request('etag', accept_encoding=None, if_none_match=identity_etag)
+        assert status == 304
+        assert headers['ETag'] == identity_etag
+
+    def test_negotiate(self):
+        assert CompressionMiddleware.negotiate('gzip, deflate') == 'gzip'
+        assert CompressionMiddleware.negotiate('*') is not None
+        assert CompressionMiddleware.negotiate('deflate') is None
+        assert CompressionMiddleware.negotiate(None) is None
@@ -77,6 +77,15 @@ class TestConfig(TestCase):
             MODELS, \
             FLAT_URLS, \
             URLS, \
+            ROUTE_CACHE_SIZE, \
+            MAX_BODY_SIZE, \
+            ETAG, \
+            CACHE_MAX_ENTRIES, \
+            CACHE_MAX_SIZE, \
+            CACHE_L1_SIZE, \
+            CACHE_L1_INVALIDATION, \
+            THROTTLING_MAX_KEYS, \
+            THROTTLING_SHARED_MEMORY, \
             WEBSOCKET_CONNECTIONS, \
             BACKGROUND_TASKS, \
             HAS_WS, \
@@ -103,6 +112,15 @@ class TestConfig(TestCase):
         TIMEZONE = 'Asia/Tehran'
         TEMPLATES_DIR = 'templates/'
         AUTO_REFORMAT = True
+        ROUTE_CACHE_SIZE = 128
+        MAX_BODY_SIZE = 10 * 1024 * 1024
+        ETAG = True
+        CACHE_MAX_ENTRIES = 500
+        CACHE_MAX_SIZE = 1024 * 1024
+        CACHE_L1_SIZE = 100
+        CACHE_L1_INVALIDATION = True
+        THROTTLING_MAX_KEYS = 1000
+        THROTTLING_SHARED_MEMORY = True
         DATABASE = {
             'engine': {
                 'class': 'panther.db.connections.PantherDBConnection',
@@ -124,6 +142,15 @@ class TestConfig(TestCase):
         assert [User, Book, Author] == config.MODELS  # This is ok.
         assert config.FLAT_URLS == {}
         assert config.URLS == {}
+        assert config.ROUTE_CACHE_SIZE == 0
+        assert config.MAX_BODY_SIZE is None
+        assert config.ETAG is False
+        assert config.CACHE_MAX_ENTRIES == 10_000
+        assert config.CACHE_MAX_SIZE == 100 * 1024 * 1024
+        assert config.CACHE_L1_SIZE == 0
+        assert config.CACHE_L1_INVALIDATION is False
+        assert config.THROTTLING_MAX_KEYS == 100_000
+        assert config.THROTTLING_SHARED_MEMORY is False
         assert config.WEBSOCKET_CONNECTIONS is None
         assert config.BACKGROUND_TASKS is False
         assert config.HAS_WS is True
@@ -152,6 +179,16 @@ class TestConfig(TestCase):
             'MODELS',
             'FLAT_URLS',
             'URLS',
+            'ROUTER',
+            'ROUTE_CACHE_SIZE',
+            'MAX_BODY_SIZE',
+            'ETAG',
+            'CACHE_MAX_ENTRIES',
+            'CACHE_MAX_SIZE',
+            'CACHE_L1_SIZE',
+            'CACHE_L1_INVALIDATION',
+            'THROTTLING_MAX_KEYS',
+            'THROTTLING_SHARED_MEMORY',
             'WEBSOCKET_CONNECTIONS',
             'BACKGROUND_TASKS',
             'HAS_WS',
@@ -180,6 +217,15 @@ class TestConfig(TestCase):
         assert [User, Book, Author] == config.MODELS
         assert {'dummy/': DummyAPI, 'ws/': DummyWS} == config.FLAT_URLS
         assert {'dummy': DummyAPI, 'ws': DummyWS} == config.URLS
+        assert config.ROUTE_CACHE_SIZE == 128
+        assert config.MAX_BODY_SIZE == 10 * 1024 * 1024
+        assert config.ETAG is True
+        assert config.CACHE_MAX_ENTRIES == 500
+        assert config.CACHE_MAX_SIZE == 1024 * 1024
+        assert config.CACHE_L1_SIZE == 100
+        assert config.CACHE_L1_INVALIDATION is True
+        assert config.THROTTLING_MAX_KEYS == 1000
+        assert config.THROTTLING_SHARED_MEMORY is True
         assert isinstance(config.WEBSOCKET_CONNECTIONS, WebsocketConnections)
         assert config.BACKGROUND_TASKS is True
         assert config.HAS_WS is True
@@ -233,6 +279,15 @@ class TestConfig(TestCase):
             MODELS, \
             FLAT_URLS, \
             URLS, \
+            ROUTE_CACHE_SIZE, \
+            MAX_BODY_SIZE, \
+            ETAG, \
+            CACHE_MAX_ENTRIES, \
+            CACHE_MAX_SIZE, \
+            CACHE_L1_SIZE, \
+            CACHE_L1_INVALIDATION, \
+            THROTTLING_MAX_KEYS, \
+            THROTTLING_SHARED_MEMORY, \
             WEBSOCKET_CONNECTIONS, \
             BACKGROUND_TASKS, \
             HAS_WS, \
@@ -259,6 +314,15 @@ class TestConfig(TestCase):
         TIMEZONE = 'Asia/Tehran'
         TEMPLATES_DIR = 'templates/'
         AUTO_REFORMAT = True
+        ROUTE_CACHE_SIZE = 128
+        MAX_BODY_SIZE = 10 * 1024 * 1024
+        ETAG = True
+        CACHE_MAX_ENTRIES = 500
+        CACHE_MAX_SIZE = 1024 * 1024
+        CACHE_L1_SIZE = 100
+        CACHE_L1_INVALIDATION = True
+        THROTTLING_MAX_KEYS = 1000
+        THROTTLING_SHARED_MEMORY = True
         DATABASE = {
             'engine': {
                 'class': 'panther.db.connections.PantherDBConnection',
@@ -283,6 +347,15 @@ class TestConfig(TestCase):
         assert config.MODELS == []
         assert config.FLAT_URLS == {}
         assert config.URLS == {}
+        assert config.ROUTE_CACHE_SIZE == 0
+        assert config.MAX_BODY_SIZE is None
+        assert config.ETAG is False
+        assert config.CACHE_MAX_ENTRIES == 10_000
+        assert config.CACHE_MAX_SIZE == 100 * 1024 * 1024
+        assert config.CACHE_L1_SIZE == 0
+        assert config.CACHE_L1_INVALIDATION is False
+        assert config.THROTTLING_MAX_KEYS == 100_000
+        assert config.THROTTLING_SHARED_MEMORY is False
         assert config.WEBSOCKET_CONNECTIONS is None
         assert config.BACKGROUND_TASKS is False
         assert config.HAS_WS is False
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from panther import Panther
+from panther.app import API, GenericAPI
+from panther.configs import config
+from panther.response import Response, generate_etag
+from panther.test import APIClient
+
+CALLS = {'feed': 0}
+
+
+@API(etag=True)
+async def etag_api():
+    return {'items': [1, 2, 3]}
+
+
+@API(etag=True, cache=timedelta(seconds=10))
+async def cached_etag_api():
+    CALLS['feed'] += 1
+    return {'items': [4, 5, 6]}
+
+
+@API(etag=True)
+async def etag_with_headers_api():
+    headers = {
+        'Cache-Control': 'max-age=60',
+        'Vary': 'Authorization',
+        'Expires': 'Thu, 01 Jan 2099 00:00:00 GMT',
+        'Content-Location': '/etag-with-headers',
+        'X-Custom': 'custom',
+    }
+    return Response(data={'items': [1, 2, 3]}, headers=headers)
+
+
+@API()
+async def without_etag_api():
+    return {'items': [1, 2, 3]}
+
+
+class ETagAPI(GenericAPI):
+    etag = True
+
+    async def get(self):
+        return {'items': [7, 8, 9]}
+
+    async def post(self):
+        return {'items': [7, 8, 9]}
+
+
+urls = {
+    'etag': etag_api,
+    'cached-etag': cached_etag_api,
+    'etag-with-headers': etag_with_headers_api,
+    'without-etag': without_etag_api,
+    'class-etag': ETagAPI,
+}
+
+
+class TestETag(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        app = Panther(__name__, configs=__name__, urls=urls)
+        self.client = APIClient(app=app)
+
+    def tearDown(self) -> None:
+        config.refresh()
+
+    async def test_etag(self):
+        res = await self.client.get('etag')
+        assert res.status_code == 200
+        assert res.headers['ETag'] == generate_etag(b'{"items":[1,2,3]}')
+
+        res = await self.client.get('etag', headers={'If-None-Match': res.headers['ETag']})
+        assert res.status_code == 304
+        assert res.body == b''
+        assert 'Content-Length' not in res.headers
+
+        res = await self.client.get('etag', headers={'If-None-Match': '"something-else"'})
+        assert res.status_code == 200
+        assert res.data == {'items': [1, 2, 3]}
+
+    async def test_not_modified_keeps_the_cache_headers(self):
+        res = await self.client.get('etag-with-headers')
+        etag = res.headers['ETag']
+
+        res = await self.client.get('etag-with-headers', headers={'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.body == b''
+        assert res.headers['ETag'] == etag
+        assert res.headers['Cache-Control'] == 'max-age=60'
+        assert res.headers['Vary'] == 'Authorization'
+        assert res.headers['Expires'] == 'Thu, 01 Jan 2099 00:00:00 GMT'
+        assert res.headers['Content-Location'] == '/etag-with-headers'
+        assert 'X-Custom' not in res.headers
+
+    async def test_weak_and_multiple_if_none_match(self):
+        etag = generate_etag(b'{"items":[1,2,3]}')
+        res = await self.client.get('etag', headers={'If-None-Match': f'"a-b", W/{etag}'})
+        assert res.status_code == 304
+
+    async def test_without_etag(self):
+        res = await self.client.get('without-etag')
+        assert res.status_code == 200
+        assert 'ETag' not in res.headers
+
+    async def test_global_etag(self):
+        config.ETAG = True
+        res = await self.client.get('without-etag')
+        assert res.headers['ETag'] == generate_etag(b'{"items":[1,2,3]}')
+
+    async def test_class_based_etag(self):
+        res = await self.client.get('class-etag')
+        assert res.headers['ETag'] == generate_etag(b'{"items":[7,8,9]}')
+
+        res = await self.client.post('class-etag')
+        assert res.status_code == 200
+        assert 'ETag' not in res.headers
+
+    async def test_etag_is_cached(self):
+        CALLS['feed'] = 0
+        res = await self.client.get('cached-etag')
+        etag = res.headers['ETag']
+
+        with patch('panther.app.generate_etag') as generate_etag_mock:
+            res = await self.client.get('cached-etag', headers={'If-None-Match': etag})
+            assert res.status_code == 304
+            assert res.headers['ETag'] == etag
+
+            res = await self.client.get('cached-etag')
+            assert res.status_code == 200
+            assert res.headers['ETag'] == etag
+            assert res.data == {'items': [4, 5, 6]}
+        generate_etag_mock.assert_not_called()
+        assert CALLS['feed'] == 1
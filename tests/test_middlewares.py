@@ -1,12 +1,15 @@
+from datetime import timedelta
 from unittest import IsolatedAsyncioTestCase, TestCase
 
 from panther import Panther
 from panther.app import API
 from panther.base_websocket import Websocket
 from panther.configs import config
+from panther.exceptions import AuthenticationAPIError, PantherError
 from panther.middlewares.base import HTTPMiddleware, WebsocketMiddleware
 from panther.request import Request
 from panther.test import APIClient, WebsocketClient
+from panther.throttling import Throttle, get_fallback_storage
 from panther.websocket import GenericWebsocket
 
 
@@ -51,6 +54,14 @@ class AfterMiddleware3(HTTPMiddleware):
         return response
 
 
+class CountInstancesMiddleware(HTTPMiddleware):
+    instances = 0
+
+    def __init__(self, dispatch):
+        CountInstancesMiddleware.instances += 1
+        super().__init__(dispatch=dispatch)
+
+
 class MyWSMiddleware1(WebsocketMiddleware):
     async def __call__(self, connection: Websocket):
         connection.middlewares = [*getattr(connection, 'middlewares', []), 'MyWSMiddleware1']
@@ -87,6 +98,11 @@ async def handle_middlewares(request: Request):
     return states
 
 
+@API(middlewares=[CountInstancesMiddleware])
+async def handle_private_count_instances_middlewares(request: Request):
+    return ['FunctionCall']
+
+
 @API(middlewares=[])
 async def handle_private_empty_middlewares(request: Request):
     states = ['FunctionCall']
@@ -103,6 +119,11 @@ async def handle_private_middlewares(request: Request):
     return states
 
 
+@API(methods=['GET'], fast=True)
+async def handle_fast(request: Request):
+    return {'middlewares': getattr(request, 'middlewares', [])}
+
+
 class WebsocketHandleMiddlewares(GenericWebsocket):
     async def connect(self):
         await self.accept()
@@ -116,7 +137,9 @@ class WebsocketHandleMiddlewares(GenericWebsocket):
 urls = {
     '': handle_middlewares,
     'private-empty': handle_private_empty_middlewares,
+    'private-count-instances': handle_private_count_instances_middlewares,
     'private': handle_private_middlewares,
+    'fast': handle_fast,
     'websocket': WebsocketHandleMiddlewares,
 }
 
@@ -154,6 +177,86 @@ class TestMiddleware(IsolatedAsyncioTestCase):
         assert response.status_code == 200
         assert response.data == ['MyMiddleware', 'FunctionCall', 'MyMiddleware']
 
+    async def test_middleware_instantiated_once(self):
+        global MIDDLEWARES
+        MIDDLEWARES = [CountInstancesMiddleware, MyMiddleware]
+        CountInstancesMiddleware.instances = 0
+        app = Panther(__name__, configs=__name__, urls=urls)
+        client = APIClient(app=app)
+        for _ in range(3):
+            response = await client.get('')
+            assert response.status_code == 200
+            assert response.data == ['MyMiddleware', 'FunctionCall', 'MyMiddleware']
+        assert CountInstancesMiddleware.instances == 1
+        MIDDLEWARES = []
+
+    async def test_private_middleware_instantiated_once(self):
+        CountInstancesMiddleware.instances = 0
+        app = Panther(__name__, configs=__name__, urls=urls)
+        client = APIClient(app=app)
+        for _ in range(3):
+            response = await client.get('private-count-instances')
+            assert response.status_code == 200
+            assert response.data == ['FunctionCall']
+        assert CountInstancesMiddleware.instances == 1
+
+    async def test_fast_api_without_global_middlewares(self):
+        app = Panther(__name__, configs=__name__, urls=urls)
+        client = APIClient(app=app)
+        response = await client.get('fast')
+        assert response.status_code == 200
+        assert response.data == {'middlewares': []}
+        assert response.headers == {'Content-Length': '18', 'Content-Type': 'application/json'}
+
+        response = await client.post('fast')
+        assert response.status_code == 405
+        assert response.data == {'detail': 'Method Not Allowed'}
+
+    async def test_fast_api_with_global_middlewares(self):
+        global MIDDLEWARES
+        MIDDLEWARES = [BeforeMiddleware1]
+        app = Panther(__name__, configs=__name__, urls=urls)
+        client = APIClient(app=app)
+        response = await client.get('fast')
+        assert response.status_code == 200
+        assert response.data == {'middlewares': ['BeforeMiddleware1']}
+        MIDDLEWARES = []
+
+    async def test_fast_api_with_global_auth_and_throttling(self):
+        class DenyAuthentication:
+            async def __call__(self, request: Request):
+                raise AuthenticationAPIError
+
+        for middlewares in ([], [BeforeMiddleware1]):
+            global MIDDLEWARES
+            MIDDLEWARES = middlewares
+            client = APIClient(app=Panther(__name__, configs=__name__, urls=urls))
+            MIDDLEWARES = []
+
+            # They are not skipped, it is served on the normal path
+            config.AUTHENTICATION = DenyAuthentication
+            response = await client.get('fast')
+            assert response.status_code == 401
+
+            config.AUTHENTICATION = None
+            get_fallback_storage().clear()
+            config.THROTTLING = Throttle(rate=1, duration=timedelta(minutes=1))
+            assert (await client.get('fast')).status_code == 200
+            assert (await client.get('fast')).status_code == 429
+            config.refresh()
+
+    async def test_fast_api_with_middlewares(self):
+        with self.assertRaises(PantherError) as e:
+
+            @API(fast=True, middlewares=[MyMiddleware])
+            async def fast_api():
+                return {}
+
+        assert e.exception.args[0] == (
+            '`fast` API can not have `auth`, `permissions`, `throttling`, `cache`, '
+            '`input_model`, `output_model`, `middlewares` or `etag`.'
+        )
+
     async def test_websocket_middleware_in_http(self):
         global MIDDLEWARES
         MIDDLEWARES = [MyWSMiddleware1]
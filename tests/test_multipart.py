@@ -1,8 +1,15 @@
+import asyncio
+import gc
+import tempfile
+from pathlib import Path
 from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
 
 from panther import Panther
+from panther._utils import MultipartParser
 from panther.app import API
 from panther.configs import config
+from panther.exceptions import PayloadTooLargeAPIError
 from panther.request import Request
 from panther.test import APIClient
 
@@ -212,3 +219,124 @@ class TestMultipart(IsolatedAsyncioTestCase):
             payload=self.MULTI_LINE_PAYLOAD,
         )
         assert res.data == {'team': 'SRE', 'phone': '09033333333', 'message': 'My\r\nName\r\nIs\r\nAli\r\n'}
+
+    async def test_parser_fed_byte_by_byte(self):
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792')
+        for i in range(len(self.COMPLEX_PAYLOAD)):
+            parser.feed(self.COMPLEX_PAYLOAD[i : i + 1])
+        data = parser.finish()
+        assert data['name'] == 'Ali Rn'
+        assert data['age'] == '25'
+        assert data['file1'].file == b'Hello World1\n'
+        assert data['file2'].file == b'Hello World2\n'
+
+    async def test_parser_lf_newlines(self):
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792')
+        parser.feed(self.SINGLE_FILE_PAYLOAD.replace(b'\r\n', b'\n'))
+        data = parser.finish()
+        assert data['file'].file_name == 'hello_world.txt'
+        assert data['file'].content_type == 'text/plain'
+        assert data['file'].file == b'Hello World\n'
+
+    async def test_parser_spools_big_files(self):
+        content = b'0123456789' * 1000
+        payload = (
+            b'----------------------------201301649688174364392792\r\n'
+            b'Content-Disposition: form-data; name="file"; filename="big.txt"\r\n'
+            b'Content-Type: text/plain\r\n\r\n' + content + b'\r\n'
+            b'----------------------------201301649688174364392792--\r\n'
+        )
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792', spool_size=1024)
+        for i in range(0, len(payload), 700):
+            parser.feed(payload[i : i + 700])
+        file = parser.finish()['file']
+
+        assert file.file is None
+        assert file.size == len(content)
+        assert file.read(10) == b'0123456789'
+        file.seek(0)
+        assert file.read() == content
+
+        temporary_path = file._file_path
+        with tempfile.TemporaryDirectory() as tmp_dir_name:
+            saved_path = file.save(f'{tmp_dir_name}/')
+            assert Path(saved_path) == Path(tmp_dir_name) / 'big.txt'
+            assert Path(saved_path).read_bytes() == content
+            assert not temporary_path.exists()  # It has been moved, not copied
+
+    async def test_parser_writes_spooled_files_in_thread(self):
+        contents = [b'0123456789' * 300, b'abcdefghij' * 300]
+        payload = b''.join(
+            b'----------------------------201301649688174364392792\r\n'
+            b'Content-Disposition: form-data; name="file%d"; filename="big%d.txt"\r\n'
+            b'Content-Type: text/plain\r\n\r\n' % (i, i) + content + b'\r\n'
+            for i, content in enumerate(contents)
+        )
+        payload += b'----------------------------201301649688174364392792--\r\n'
+
+        # `feed()` doesn't write to the disk by itself
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792', spool_size=1024)
+        parser.feed(payload[:2000])
+        assert Path(parser.temporary_file.name).stat().st_size == 0
+        parser.finish()
+
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792', spool_size=1024)
+        with patch('panther._utils.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+            for i in range(0, len(payload), 700):
+                await parser.feed_async(payload[i : i + 700])
+            data = await parser.finish_async()
+        assert to_thread.call_count > 2
+
+        for i, content in enumerate(contents):
+            assert data[f'file{i}'].file is None
+            assert data[f'file{i}'].read() == content
+        with tempfile.TemporaryDirectory() as tmp_dir_name:
+            saved_path = await data['file0'].save_async(f'{tmp_dir_name}/')
+            assert Path(saved_path).read_bytes() == contents[0]
+
+    async def test_parser_removes_unsaved_spooled_files(self):
+        payload = (
+            b'----------------------------201301649688174364392792\r\n'
+            b'Content-Disposition: form-data; name="file"; filename="big.txt"\r\n'
+            b'Content-Type: text/plain\r\n\r\n' + b'0' * 2048 + b'\r\n'
+            b'----------------------------201301649688174364392792--\r\n'
+        )
+        parser = MultipartParser(boundary='--------------------------201301649688174364392792', spool_size=1024)
+        parser.feed(payload)
+        file = parser.finish()['file']
+        temporary_path = file._file_path
+        assert temporary_path.exists()
+
+        del file, parser
+        gc.collect()
+        assert not temporary_path.exists()
+
+    async def test_too_large_upload_removes_spooled_files(self):
+        payload = b''.join(
+            b'----------------------------201301649688174364392792\r\n'
+            b'Content-Disposition: form-data; name="file%d"; filename="big%d.txt"\r\n'
+            b'Content-Type: text/plain\r\n\r\n' % (i, i) + b'0' * 1_500_000 + b'\r\n'
+            for i in range(3)
+        )
+        messages = [
+            {'type': 'http.request', 'body': payload[i : i + 100_000], 'more_body': True}
+            for i in range(0, len(payload), 100_000)
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        config.MAX_BODY_SIZE = 4_300_000
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir_name, patch('tempfile.tempdir', tmp_dir_name):
+                request = Request(
+                    scope={'headers': [(b'content-type', self.CONTENT_TYPE_1.encode())]},
+                    receive=receive,
+                    send=None,
+                )
+                with self.assertRaises(PayloadTooLargeAPIError):
+                    await request.read_body()
+                # Neither the finished parts nor the current one are left behind
+                assert list(Path(tempfile.gettempdir()).glob('panther-*')) == []
+        finally:
+            config.MAX_BODY_SIZE = None
@@ -14,6 +14,16 @@ class AlwaysDeniedPermission(BasePermission):
         return False
 
 
+class CountInstancesPermission(BasePermission):
+    instances = 0
+
+    def __init__(self):
+        CountInstancesPermission.instances += 1
+
+    async def __call__(self, request: Request) -> bool:
+        return True
+
+
 class NotInheritedPermission:
     async def __call__(self, request: Request) -> bool:
         return False
@@ -74,8 +84,22 @@ async def multiple_permissions_api(request: Request):
     return request.user
 
 
+@API(permissions=[CountInstancesPermission])
+async def count_instances_permission_api(request: Request):
+    return request.user
+
+
+class DeniedPermissionGetOnlyAPI(GenericAPI):
+    permissions = [AlwaysDeniedPermission]
+
+    async def get(self, request: Request):
+        return request.user
+
+
 urls = {
     'without': without_permission_api,
+    'denied-permission-get-only': DeniedPermissionGetOnlyAPI,
+    'count-instances-permission': count_instances_permission_api,
     'denied-permission': denied_permission_api,
     'single-denied-permission': single_denied_permission_api,
     'not-inherited-permission': not_inherited_permission_api,
@@ -97,12 +121,28 @@ class TestPermission(IsolatedAsyncioTestCase):
         assert res.status_code == 200
         assert res.data is None
 
+    async def test_permission_instantiated_once(self):
+        CountInstancesPermission.instances = 0
+        for _ in range(3):
+            res = await self.client.get('count-instances-permission')
+            assert res.status_code == 200
+        assert CountInstancesPermission.instances == 1
+
     async def test_denied_permission(self):
         with self.assertNoLogs(level='ERROR'):
             res = await self.client.get('denied-permission')
         assert res.status_code == 403
         assert res.data['detail'] == 'Permission Denied'
 
+    async def test_not_overridden_method_skips_permission(self):
+        res = await self.client.get('denied-permission-get-only')
+        assert res.status_code == 403
+        assert res.data['detail'] == 'Permission Denied'
+
+        res = await self.client.post('denied-permission-get-only')
+        assert res.status_code == 405
+        assert res.data['detail'] == 'Method Not Allowed'
+
     async def test_single_denied_permission(self):
         with self.assertNoLogs(level='ERROR'):
             res = await self.client.get('single-denied-permission')
@@ -1,10 +1,13 @@
 from unittest import IsolatedAsyncioTestCase
 
 import orjson as json
+from pydantic import BaseModel
 
 from panther import Panther
 from panther.app import API, GenericAPI
+from panther.base_request import Headers
 from panther.configs import config
+from panther.exceptions import PantherError
 from panther.request import Request
 from panther.response import Response
 from panther.test import APIClient
@@ -30,6 +33,22 @@ async def request_data(request: Request):
     return request.data
 
 
+@API(stream=True)
+async def request_stream(request: Request):
+    return [len(chunk) async for chunk in request.stream()]
+
+
+@API()
+async def request_stream_buffered(request: Request):
+    return [len(chunk) async for chunk in request.stream()]
+
+
+@API()
+async def request_data_named_stream(request: Request):
+    stream = request.data
+    return stream
+
+
 @API()
 async def request_path_variables(name: str, age: int, is_alive: bool):
     return {'name': name, 'age': age, 'is_alive': is_alive}
@@ -154,6 +173,9 @@ urls = {
     'client': request_client,
     'query-params': request_query_params,
     'data': request_data,
+    'stream': request_stream,
+    'stream-buffered': request_stream_buffered,
+    'data-named-stream': request_data_named_stream,
     'path/<name>/variable/<age>/<is_alive>/': request_path_variables,
     'header': request_header,
     'header-str': request_header_str,
@@ -211,6 +233,81 @@ class TestRequest(IsolatedAsyncioTestCase):
         assert res.status_code == 200
         assert res.data == payload
 
+    async def test_max_body_size(self):
+        config.MAX_BODY_SIZE = 10
+        try:
+            res = await self.client.post('data/', payload=json.dumps({'detail': 'ok'}))
+            assert res.status_code == 413
+            assert res.data == {'detail': 'Request Entity Too Large'}
+
+            res = await self.client.post('data/', payload=b'{}', headers={'Content-Length': 100})
+            assert res.status_code == 413
+
+            res = await self.client.post('data/', payload=b'{"a":1}')
+            assert res.status_code == 200
+            assert res.data == {'a': 1}
+        finally:
+            config.MAX_BODY_SIZE = None
+
+    async def test_stream(self):
+        messages = [
+            {'type': 'http.request', 'body': b'a' * 3, 'more_body': True},
+            {'type': 'http.request', 'body': b'', 'more_body': True},
+            {'type': 'http.request', 'body': b'b' * 5, 'more_body': False},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        request = Request(scope={'headers': []}, receive=receive, send=None)
+        assert [chunk async for chunk in request.stream()] == [b'aaa', b'bbbbb']
+        with self.assertRaises(PantherError):
+            await request.read_body()
+
+        res = await self.client.post('stream/', payload=b'12345')
+        assert res.data == [5]
+
+    async def test_stream_api_does_not_read_body(self):
+        messages = [
+            {'type': 'http.request', 'body': b'a' * 3, 'more_body': True},
+            {'type': 'http.request', 'body': b'b' * 5, 'more_body': False},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        request = Request(scope={'method': 'POST', 'headers': []}, receive=receive, send=None)
+        request.path_variables = {}
+        response = await request_stream(request=request)
+        assert response.data == [3, 5]
+
+        # Without `stream=True` the body is read beforehand, `request.stream()` yields it at once
+        messages = [
+            {'type': 'http.request', 'body': b'a' * 3, 'more_body': True},
+            {'type': 'http.request', 'body': b'b' * 5, 'more_body': False},
+        ]
+        request = Request(scope={'method': 'POST', 'headers': []}, receive=receive, send=None)
+        request.path_variables = {}
+        response = await request_stream_buffered(request=request)
+        assert response.data == [8]
+
+    async def test_data_in_api_with_stream_name(self):
+        res = await self.client.post('data-named-stream/', payload={'a': 1})
+        assert res.status_code == 200
+        assert res.data == {'a': 1}
+
+    def test_stream_api_with_input_model(self):
+        class Input(BaseModel):
+            name: str
+
+        with self.assertRaises(PantherError):
+            API(stream=True, input_model=Input)
+
+    async def test_data_before_read_body(self):
+        request = Request(scope={'headers': []}, receive=None, send=None)
+        with self.assertRaises(PantherError):
+            request.data
+
     async def test_path_variables(self):
         res = await self.client.post('path/Ali/variable/27/true/')
         expected_response = {'name': 'Ali', 'age': 27, 'is_alive': True}
@@ -288,6 +385,17 @@ class TestRequest(IsolatedAsyncioTestCase):
         res = await self.client.post('header-contains/accept/')
         assert res.data is False
 
+    async def test_headers_lazy_lookup(self):
+        headers = Headers([(b'content-type', b'application/json'), (b'x-request-id', b'1'), (b'x-request-id', b'2')])
+        assert headers._cache == {}
+
+        assert headers.content_type == 'application/json'
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['x-request-id'] == '2'
+        assert headers.x_request_id == '2'
+        assert headers.accept is None
+        assert headers._cache == {'content_type': 'application/json', 'x_request_id': '2', 'accept': None}
+
     # # # Methods
     async def test_method_all(self):
         res_func = await self.client.get('all-func/')
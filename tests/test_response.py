@@ -1,4 +1,7 @@
+import math
 import platform
+import tempfile
+from pathlib import Path
 from unittest import IsolatedAsyncioTestCase
 
 from pydantic import BaseModel
@@ -7,6 +10,8 @@ from panther import Panther
 from panther.app import API, GenericAPI
 from panther.configs import config
 from panther.db import Model
+from panther.exceptions import APIError, NotFoundAPIError, ThrottlingAPIError
+from panther.request import Request
 from panther.response import (
     Cookie,
     FileResponse,
@@ -15,6 +20,7 @@ from panther.response import (
     Response,
     StreamingResponse,
     TemplateResponse,
+    get_error_response,
 )
 from panther.test import APIClient
 
@@ -604,14 +610,84 @@ class TestResponses(IsolatedAsyncioTestCase):
         assert res.status_code == 200
         assert res.data
         assert res.body
-        assert set(res.headers.keys()) == {'Content-Type', 'Content-Length'}
+        assert set(res.headers.keys()) == {'Content-Type', 'Content-Length', 'Accept-Ranges', 'ETag', 'Last-Modified'}
         assert res.headers['Content-Type'] == 'text/markdown'
+        assert res.headers['Accept-Ranges'] == 'bytes'
         if platform.system() == 'Windows':
             # Line breaks are \n\r
             assert res.headers['Content-Length'] == '4783'
         else:
             assert res.headers['Content-Length'] == '4645'
 
+    async def test_response_file_range(self):
+        content = Path('README.md').read_bytes()
+        res = await self.client.get('file/', headers={'Range': 'bytes=2-11'})
+        assert res.status_code == 206
+        assert res.body == content[2:12]
+        assert res.headers['Content-Length'] == '10'
+        assert res.headers['Content-Range'] == f'bytes 2-11/{len(content)}'
+
+        res = await self.client.get('file/', headers={'Range': 'bytes=-5'})
+        assert res.status_code == 206
+        assert res.body == content[-5:]
+
+        res = await self.client.get('file/', headers={'Range': f'bytes={len(content)}-'})
+        assert res.status_code == 416
+        assert res.body == b''
+        assert res.headers['Content-Range'] == f'bytes */{len(content)}'
+
+    async def test_response_file_not_modified(self):
+        res = await self.client.get('file/')
+        etag, last_modified = res.headers['ETag'], res.headers['Last-Modified']
+
+        res = await self.client.get('file/', headers={'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.body == b''
+        assert res.headers['ETag'] == etag
+
+        res = await self.client.get('file/', headers={'If-Modified-Since': last_modified})
+        assert res.status_code == 304
+
+        res = await self.client.get('file/', headers={'If-None-Match': '"something-else"'})
+        assert res.status_code == 200
+        assert res.body == Path('README.md').read_bytes()
+
+    async def test_response_file_chunks(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        request = Request(scope={'type': 'http', 'method': 'GET', 'headers': []}, receive=None, send=send)
+        response = FileResponse('README.md')
+        response.chunk_size = 1024
+        await response.send(send=send, receive=None, request=request)
+        chunks = [m for m in sent if m['type'] == 'http.response.body']
+        assert len(chunks) == math.ceil(len(response.body) / 1024)
+        assert b''.join(m['body'] for m in chunks) == response.body
+        assert chunks[-1]['more_body'] is False
+
+        sent.clear()
+        request.scope['extensions'] = {'http.response.pathsend': {}}
+        await response.send(send=send, receive=None, request=request)
+        assert sent[-1] == {'type': 'http.response.pathsend', 'path': str(Path('README.md').resolve())}
+
+    async def test_response_empty_file(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        with tempfile.TemporaryDirectory() as tmp_dir_name:
+            file_path = Path(tmp_dir_name) / 'empty.txt'
+            file_path.touch()
+            request = Request(scope={'type': 'http', 'method': 'GET', 'headers': []}, receive=None, send=send)
+            await FileResponse(file_path).send(send=send, receive=None, request=request)
+
+        assert sent[0]['type'] == 'http.response.start'
+        assert (b'Content-Length', b'0') in sent[0]['headers']
+        assert sent[1:] == [{'type': 'http.response.body', 'body': b'', 'more_body': False}]
+
     async def test_response_plain(self):
         res = await self.client.get('plain/')
         assert res.status_code == 200
@@ -686,3 +762,37 @@ class TestResponses(IsolatedAsyncioTestCase):
         assert res.status_code == 200
         assert 'Set-Cookie' in res.headers
         assert res.cookies == [(b'Set-Cookie', b'custom_key=custom_value; Path=/; SameSite=lax')]
+
+    async def test_body_is_memoized_until_data_is_reassigned(self):
+        res = Response(data={'detail': 'ok'})
+        body = res.body
+        assert body == b'{"detail":"ok"}'
+        assert res.body is body
+
+        res.data = [1, 2, 3]
+        assert res.body == b'[1,2,3]'
+        assert res.bytes_headers[0] == (b'Content-Length', b'7')
+
+    async def test_non_string_header_values(self):
+        headers = {'X-List': ['a', 'b'], 'X-Dict': {'a': 1}, 'X-Number': 1}
+        expected = [(b'X-List', b"['a', 'b']"), (b'X-Dict', b"{'a': 1}"), (b'X-Number', b'1')]
+        assert Response(data={'detail': 'ok'}, headers=headers).bytes_headers[2:] == expected
+        assert StreamingResponse(data=iter([b'ok']), headers=headers).bytes_headers[1:] == expected
+
+    async def test_prebuilt_error_responses(self):
+        not_found = get_error_response(NotFoundAPIError())
+        assert not_found.status_code == 404
+        assert not_found.body == b'{"detail":"Not Found"}'
+        assert not_found.headers == ((b'Content-Length', b'22'), (b'Content-Type', b'application/json'))
+        assert get_error_response(NotFoundAPIError()) is not_found
+        assert get_error_response(ThrottlingAPIError(headers={'Retry-After': '1'})).status_code == 429
+        assert get_error_response(APIError()).status_code == 500
+
+        # Customized errors are rendered as usual
+        assert get_error_response(NotFoundAPIError(detail='User Not Found')) is None
+        assert get_error_response(APIError(status_code=501)) is None
+
+        res = await self.client.get('not-exists/')
+        assert res.status_code == 404
+        assert res.data == {'detail': 'Not Found'}
+        assert res.headers == {'Content-Length': '22', 'Content-Type': 'application/json'}
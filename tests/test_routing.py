@@ -1,14 +1,15 @@
 import random
 from unittest import TestCase
 
-from panther.base_request import BaseRequest
 from panther.configs import config
 from panther.exceptions import PantherError
 from panther.routings import (
     ENDPOINT_NOT_FOUND,
+    compile_urls,
     finalize_urls,
     find_endpoint,
     flatten_urls,
+    route_cache,
 )
 
 
@@ -676,7 +677,7 @@ class TestRoutingFunctions(TestCase):
         assert admin_v2_users_list_registered_func == admin_v2_users_list_registered
         assert admin_v2_users_detail_not_registered_func == admin_v2_users_detail_not_registered
 
-    def test_find_endpoint_success_path(self):
+    def test_find_endpoint_success_path_variables(self):
         def user_id_profile_id():
             pass
 
@@ -738,25 +739,25 @@ class TestRoutingFunctions(TestCase):
                 },
             },
         }
-        _, user_id_profile_id_path = find_endpoint(f'user/{random.randint(0, 100)}/profile/{random.randint(2, 100)}')
-        _, user_profile_path = find_endpoint('user/profile/')
-        _, payment_path = find_endpoint('payments/')
-        _, admin_v1_profile_avatar_path = find_endpoint('admin/v1/profile/avatar')
-        _, admin_v1_id_path = find_endpoint(f'admin/v1/{random.randint(0, 100)}')
-        _, admin_v1_id_registered_path = find_endpoint(f'admin/v1/{random.randint(0, 100)}/list/registered')
-        _, admin_v1_id_registered1_path = find_endpoint(f'admin/v1/{random.randint(0, 100)}/list/1/')
-        _, admin_v2_users_list_registered_path = find_endpoint('admin/v1/users/list/registered/')
-        _, admin_v2_users_detail_not_registered_path = find_endpoint('admin/v1/users/detail/not-registered')
-
-        assert user_id_profile_id_path == 'user/<user_id>/profile/<id>'
-        assert user_profile_path == 'user/profile'
-        assert payment_path == 'payments'
-        assert admin_v1_profile_avatar_path == 'admin/v1/profile/avatar'
-        assert admin_v1_id_path == 'admin/v1/<user_id>'
-        assert admin_v1_id_registered_path == 'admin/v1/<user_id2>/list/registered'
-        assert admin_v1_id_registered1_path == 'admin/v1/<user_id2>/list/<registered1>'
-        assert admin_v2_users_list_registered_path == 'admin/v1/users/list/registered'
-        assert admin_v2_users_detail_not_registered_path == 'admin/v1/users/detail/not-registered'
+        _, user_id_profile_id_variables = find_endpoint('user/10/profile/20')
+        _, user_profile_variables = find_endpoint('user/profile/')
+        _, payment_variables = find_endpoint('payments/')
+        _, admin_v1_profile_avatar_variables = find_endpoint('admin/v1/profile/avatar')
+        _, admin_v1_id_variables = find_endpoint('admin/v1/30')
+        _, admin_v1_id_registered_variables = find_endpoint('admin/v1/40/list/registered')
+        _, admin_v1_id_registered1_variables = find_endpoint('admin/v1/50/list/1/')
+        _, admin_v2_users_list_registered_variables = find_endpoint('admin/v1/users/list/registered/')
+        _, admin_v2_users_detail_not_registered_variables = find_endpoint('admin/v1/users/detail/not-registered')
+
+        assert user_id_profile_id_variables == {'user_id': '10', 'id': '20'}
+        assert user_profile_variables == {}
+        assert payment_variables == {}
+        assert admin_v1_profile_avatar_variables == {}
+        assert admin_v1_id_variables == {'user_id': '30'}
+        assert admin_v1_id_registered_variables == {'user_id2': '40'}
+        assert admin_v1_id_registered1_variables == {'user_id2': '50', 'registered1': '1'}
+        assert admin_v2_users_list_registered_variables == {}
+        assert admin_v2_users_detail_not_registered_variables == {}
 
     def test_find_endpoint_not_found(self):
         def temp_func():
@@ -785,7 +786,7 @@ class TestRoutingFunctions(TestCase):
         assert admin_v2_users_list_registered_func is None
         assert admin_v2_users_detail_not_registered_func is None
 
-    def test_find_endpoint_not_found_path(self):
+    def test_find_endpoint_not_found_path_variables(self):
         def temp_func():
             pass
 
@@ -796,21 +797,23 @@ class TestRoutingFunctions(TestCase):
                 'list': temp_func,
             },
         }
-        _, user_id_profile_id_path = find_endpoint(f'user/{random.randint(0, 100)}/profile/{random.randint(2, 100)}')
-        _, user_profile_path = find_endpoint('user/profile/')
-        _, payment_path = find_endpoint('payments/')
-        _, admin_v1_profile_avatar_path = find_endpoint('admin/v1/profile/avatar')
-        _, admin_v1_id_path = find_endpoint(f'admin/v1/{random.randint(0, 100)}')
-        _, admin_v2_users_list_registered_path = find_endpoint('admin/v1/users/list/registered/')
-        _, admin_v2_users_detail_not_registered_path = find_endpoint('admin/v1/users/detail/not-registered')
-
-        assert user_id_profile_id_path == ''
-        assert user_profile_path == ''
-        assert payment_path == ''
-        assert admin_v1_profile_avatar_path == ''
-        assert admin_v1_id_path == ''
-        assert admin_v2_users_list_registered_path == ''
-        assert admin_v2_users_detail_not_registered_path == ''
+        _, user_id_profile_id_variables = find_endpoint(
+            f'user/{random.randint(0, 100)}/profile/{random.randint(2, 100)}'
+        )
+        _, user_profile_variables = find_endpoint('user/profile/')
+        _, payment_variables = find_endpoint('payments/')
+        _, admin_v1_profile_avatar_variables = find_endpoint('admin/v1/profile/avatar')
+        _, admin_v1_id_variables = find_endpoint(f'admin/v1/{random.randint(0, 100)}')
+        _, admin_v2_users_list_registered_variables = find_endpoint('admin/v1/users/list/registered/')
+        _, admin_v2_users_detail_not_registered_variables = find_endpoint('admin/v1/users/detail/not-registered')
+
+        assert user_id_profile_id_variables == {}
+        assert user_profile_variables == {}
+        assert payment_variables == {}
+        assert admin_v1_profile_avatar_variables == {}
+        assert admin_v1_id_variables == {}
+        assert admin_v2_users_list_registered_variables == {}
+        assert admin_v2_users_detail_not_registered_variables == {}
 
     def test_find_endpoint_not_found_last_is_path_variable(self):
         def temp_func():
@@ -839,7 +842,7 @@ class TestRoutingFunctions(TestCase):
         assert admin_v2_users_list_registered_func is None
         assert admin_v2_users_detail_not_registered_func is None
 
-    def test_find_endpoint_not_found_path_last_is_path_variable(self):
+    def test_find_endpoint_not_found_path_variables_last_is_path_variable(self):
         def temp_func():
             pass
 
@@ -850,21 +853,23 @@ class TestRoutingFunctions(TestCase):
                 '<name>': temp_func,
             },
         }
-        _, user_id_profile_id_path = find_endpoint(f'user/{random.randint(0, 100)}/profile/{random.randint(2, 100)}')
-        _, user_profile_path = find_endpoint('user/ali/')
-        _, payment_path = find_endpoint('payments/')
-        _, admin_v1_profile_avatar_path = find_endpoint('admin/v1/profile/avatar')
-        _, admin_v1_id_path = find_endpoint(f'admin/v1/{random.randint(0, 100)}')
-        _, admin_v2_users_list_registered_path = find_endpoint('admin/v1/users/list/registered/')
-        _, admin_v2_users_detail_not_registered_path = find_endpoint('admin/v1/users/detail/not-registered')
-
-        assert user_id_profile_id_path == ''
-        assert user_profile_path != ''
-        assert payment_path == ''
-        assert admin_v1_profile_avatar_path == ''
-        assert admin_v1_id_path == ''
-        assert admin_v2_users_list_registered_path == ''
-        assert admin_v2_users_detail_not_registered_path == ''
+        _, user_id_profile_id_variables = find_endpoint(
+            f'user/{random.randint(0, 100)}/profile/{random.randint(2, 100)}'
+        )
+        _, user_profile_variables = find_endpoint('user/ali/')
+        _, payment_variables = find_endpoint('payments/')
+        _, admin_v1_profile_avatar_variables = find_endpoint('admin/v1/profile/avatar')
+        _, admin_v1_id_variables = find_endpoint(f'admin/v1/{random.randint(0, 100)}')
+        _, admin_v2_users_list_registered_variables = find_endpoint('admin/v1/users/list/registered/')
+        _, admin_v2_users_detail_not_registered_variables = find_endpoint('admin/v1/users/detail/not-registered')
+
+        assert user_id_profile_id_variables == {}
+        assert user_profile_variables == {'name': 'ali'}
+        assert payment_variables == {}
+        assert admin_v1_profile_avatar_variables == {}
+        assert admin_v1_id_variables == {}
+        assert admin_v2_users_list_registered_variables == {}
+        assert admin_v2_users_detail_not_registered_variables == {}
 
     def test_find_endpoint_not_found_too_many(self):
         def temp_func():
@@ -875,9 +880,9 @@ class TestRoutingFunctions(TestCase):
         config.URLS = {
             'user/name': temp_func,
         }
-        func, path = find_endpoint('user/name/troublemaker')
+        func, path_variables = find_endpoint('user/name/troublemaker')
 
-        assert path == ''
+        assert path_variables == {}
         assert func is None
 
     def test_find_endpoint_not_found_not_enough(self):
@@ -889,9 +894,9 @@ class TestRoutingFunctions(TestCase):
         config.URLS = {
             'user/name': temp_func,
         }
-        func, path = find_endpoint('user/')
+        func, path_variables = find_endpoint('user/')
 
-        assert path == ''
+        assert path_variables == {}
         assert func is None
 
     def test_find_endpoint_same_pre_path_variable(self):
@@ -921,7 +926,7 @@ class TestRoutingFunctions(TestCase):
         assert temp_2_func == temp_2
         assert temp_3_func == temp_3
 
-    def test_find_endpoint_same_pre_path_variable_path(self):
+    def test_find_endpoint_same_pre_path_variable_path_variables(self):
         def temp_1():
             pass
 
@@ -940,13 +945,13 @@ class TestRoutingFunctions(TestCase):
                 '<id>': temp_3,
             },
         }
-        _, temp_1_path = find_endpoint('')
-        _, temp_2_path = find_endpoint(f'{random.randint(2, 100)}')
-        _, temp_3_path = find_endpoint(f'{random.randint(2, 100)}/{random.randint(2, 100)}')
+        _, temp_1_variables = find_endpoint('')
+        _, temp_2_variables = find_endpoint('2')
+        _, temp_3_variables = find_endpoint('3/4')
 
-        assert temp_1_path == ''
-        assert temp_2_path == '<index>'
-        assert temp_3_path == '<index>/<id>'
+        assert temp_1_variables == {}
+        assert temp_2_variables == {'index': '2'}
+        assert temp_3_variables == {'index': '3', 'id': '4'}
 
     def test_find_endpoint_same_pre_key(self):
         def temp_1():
@@ -976,7 +981,7 @@ class TestRoutingFunctions(TestCase):
         assert temp_2_func == temp_2
         assert temp_3_func == temp_3
 
-    def test_find_endpoint_same_pre_key_path(self):
+    def test_find_endpoint_same_pre_key_path_variables(self):
         def temp_1():
             pass
 
@@ -995,14 +1000,14 @@ class TestRoutingFunctions(TestCase):
                 '<id>': temp_3,
             },
         }
-        _, temp_1_path = find_endpoint('')
+        _, temp_1_variables = find_endpoint('')
 
-        _, temp_2_path = find_endpoint('hello')
-        _, temp_3_path = find_endpoint(f'hello/{random.randint(2, 100)}')
+        _, temp_2_variables = find_endpoint('hello')
+        _, temp_3_variables = find_endpoint('hello/5')
 
-        assert temp_1_path == ''
-        assert temp_2_path == 'hello'
-        assert temp_3_path == 'hello/<id>'
+        assert temp_1_variables == {}
+        assert temp_2_variables == {}
+        assert temp_3_variables == {'id': '5'}
 
     def test_find_endpoint_with_params(self):
         def user_id_profile_id():
@@ -1021,6 +1026,169 @@ class TestRoutingFunctions(TestCase):
 
         assert user_id_profile_id_func == user_id_profile_id
 
+    def test_find_endpoint_recompiles_after_urls_changed(self):
+        def temp_1():
+            pass
+
+        def temp_2():
+            pass
+
+        from panther.configs import config
+
+        config.URLS = {'hello': temp_1}
+        func, _ = find_endpoint('hello')
+        assert func == temp_1
+        assert config.ROUTER is not None
+
+        config.URLS = {'hello': temp_2}
+        assert config.ROUTER is None
+        func, _ = find_endpoint('hello')
+        assert func == temp_2
+
+    # Route Cache
+    def test_route_cache_disabled_by_default(self):
+        def temp_func():
+            pass
+
+        config.URLS = {'user': {'<user_id>': temp_func}}
+        find_endpoint('user/1')
+
+        assert route_cache.info() == (0, 0, 0, 0)
+
+    def test_route_cache_hit_and_miss(self):
+        def temp_func():
+            pass
+
+        config.ROUTE_CACHE_SIZE = 10
+        config.URLS = {'user': {'<user_id>': temp_func}}
+
+        func, path_variables = find_endpoint('user/1')
+        assert func == temp_func
+        assert path_variables == {'user_id': '1'}
+        assert route_cache.info() == (0, 1, 10, 1)
+
+        func, path_variables = find_endpoint('user/1')
+        assert func == temp_func
+        assert path_variables == {'user_id': '1'}
+        assert route_cache.info() == (1, 1, 10, 1)
+
+        # Path variables of a hit should be a new dict each time
+        path_variables['user_id'] = '2'
+        _, path_variables = find_endpoint('user/1')
+        assert path_variables == {'user_id': '1'}
+
+    def test_route_cache_does_not_cache_not_found(self):
+        def temp_func():
+            pass
+
+        config.ROUTE_CACHE_SIZE = 10
+        config.URLS = {'user': {'<user_id>': temp_func}}
+
+        assert find_endpoint('users/1') == ENDPOINT_NOT_FOUND
+        assert find_endpoint('users/1') == ENDPOINT_NOT_FOUND
+        assert route_cache.info() == (0, 2, 10, 0)
+
+    def test_not_found_path_variables_is_not_shared(self):
+        def temp_func():
+            pass
+
+        config.URLS = {'user': {'<user_id>': temp_func}}
+
+        _, path_variables = find_endpoint('users/1')
+        path_variables['user_id'] = '1'
+        assert find_endpoint('users/2') == ENDPOINT_NOT_FOUND
+        assert ENDPOINT_NOT_FOUND == (None, {})
+
+    def test_route_cache_evicts_least_recently_used(self):
+        def temp_func():
+            pass
+
+        config.ROUTE_CACHE_SIZE = 2
+        config.URLS = {'user': {'<user_id>': temp_func}}
+
+        find_endpoint('user/1')
+        find_endpoint('user/2')
+        find_endpoint('user/1')  # `user/2` is the least recently used now
+        find_endpoint('user/3')
+
+        assert list(route_cache.routes) == ['user/1', 'user/3']
+
+    def test_route_cache_invalidated_after_urls_changed(self):
+        def temp_1():
+            pass
+
+        def temp_2():
+            pass
+
+        config.ROUTE_CACHE_SIZE = 10
+        config.URLS = {'hello': temp_1}
+        find_endpoint('hello')
+        find_endpoint('hello')
+        assert route_cache.info() == (1, 1, 10, 1)
+
+        config.URLS = {'hello': temp_2}
+        func, _ = find_endpoint('hello')
+        assert func == temp_2
+        assert route_cache.info() == (0, 1, 10, 1)
+
+    # Compile URLs
+    def test_compile_urls(self):
+        def temp_1():
+            pass
+
+        def temp_2():
+            pass
+
+        def temp_3():
+            pass
+
+        urls = {
+            '': temp_1,
+            'user': {
+                '<user_id>': {
+                    '': temp_2,
+                    'profile': temp_3,
+                },
+                'list': ...,
+            },
+        }
+        router = compile_urls(urls)
+
+        assert router.endpoint == temp_1
+        assert router.variables == ()
+        assert router.variable is None
+        assert list(router.children) == ['user']
+
+        user = router.children['user']
+        assert user.endpoint is None
+        assert user.children == {}
+
+        user_id = user.variable
+        assert user_id.endpoint == temp_2
+        assert user_id.variables == ('user_id',)
+        assert user_id.children['profile'].endpoint == temp_3
+        assert user_id.children['profile'].variables == ('user_id',)
+
+    def test_compile_urls_merge_same_level_path_variables(self):
+        def temp_1():
+            pass
+
+        def temp_2():
+            pass
+
+        urls = {
+            '<name>': temp_1,
+            '<id>': {
+                'detail': temp_2,
+            },
+        }
+        router = compile_urls(urls)
+
+        assert router.variable.endpoint == temp_1
+        assert router.variable.variables == ('name',)
+        assert router.variable.children['detail'].endpoint == temp_2
+        assert router.variable.children['detail'].variables == ('id',)
+
     # Collect PathVariables
     def test_collect_path_variables(self):
         def temp_func():
@@ -1042,10 +1210,7 @@ class TestRoutingFunctions(TestCase):
         _id = random.randint(0, 100)
         request_path = f'user/{_user_id}/profile/{_id}'
 
-        _, found_path = find_endpoint(request_path)
-        request = BaseRequest(scope={'path': request_path}, receive=lambda x: x, send=lambda x: x)
-        request.collect_path_variables(found_path=found_path)
-        path_variables = request.path_variables
+        _, path_variables = find_endpoint(request_path)
 
         assert isinstance(path_variables, dict)
 
@@ -1124,42 +1289,42 @@ class TestRoutingFunctions(TestCase):
         }
 
         test_cases = {
-            '': (_, ''),
+            '': (_, {}),
             '0': ENDPOINT_NOT_FOUND,
             '0/21': ENDPOINT_NOT_FOUND,
-            '3': (_3, '3'),
-            '_4': (_4, '<4>'),
-            '1': (_1, '1'),
-            '1/_5/_9': (_159, '1/<5>/<9>'),
-            '1/6': (_16, '1/6'),
-            '1/7/10': (_1710, '1/7/10'),
+            '3': (_3, {}),
+            '_4': (_4, {'4': '_4'}),
+            '1': (_1, {}),
+            '1/_5/_9': (_159, {'5': '_5', '9': '_9'}),
+            '1/6': (_16, {}),
+            '1/7/10': (_1710, {}),
             '1/7': ENDPOINT_NOT_FOUND,
-            '1/_8': (_18, '1/<8>'),
-            '_2/11': (_211, '<2>/11'),
-            '_2/12/15/16': (_2121516, '<2>/12/15/16'),
-            '_2/_14/_17/_18': (_2141718, '<2>/<14>/<17>/<18>'),
-            '_2/19': (_19, '<2>/19'),
-            '_2/_20': (_220, '<2>/<20>'),
-            '_2/21/_22': (_22122, '<2>/21/<22>'),
+            '1/_8': (_18, {'8': '_8'}),
+            '_2/11': (_211, {'2': '_2'}),
+            '_2/12/15/16': (_2121516, {'2': '_2'}),
+            '_2/_14/_17/_18': (_2141718, {'2': '_2', '14': '_14', '17': '_17', '18': '_18'}),
+            '_2/19': (_19, {'2': '_2'}),
+            '_2/_20': (_220, {'2': '_2', '20': '_20'}),
+            '_2/21/_22': (_22122, {'2': '_2', '22': '_22'}),
             # # #
-            '/': (_, ''),
+            '/': (_, {}),
             '/0/': ENDPOINT_NOT_FOUND,
             '/0/21/': ENDPOINT_NOT_FOUND,
-            '/3/': (_3, '3'),
-            '/_4/': (_4, '<4>'),
-            '/1/': (_1, '1'),
-            '/1/_5/_9/': (_159, '1/<5>/<9>'),
-            '/1/6/': (_16, '1/6'),
-            '/1/7/10/': (_1710, '1/7/10'),
+            '/3/': (_3, {}),
+            '/_4/': (_4, {'4': '_4'}),
+            '/1/': (_1, {}),
+            '/1/_5/_9/': (_159, {'5': '_5', '9': '_9'}),
+            '/1/6/': (_16, {}),
+            '/1/7/10/': (_1710, {}),
             '/1/7/': ENDPOINT_NOT_FOUND,
-            '/1/_8/': (_18, '1/<8>'),
-            '/_2/11/': (_211, '<2>/11'),
-            '/_2/12/15/16/': (_2121516, '<2>/12/15/16'),
-            '/_2/_14/_17/_18/': (_2141718, '<2>/<14>/<17>/<18>'),
+            '/1/_8/': (_18, {'8': '_8'}),
+            '/_2/11/': (_211, {'2': '_2'}),
+            '/_2/12/15/16/': (_2121516, {'2': '_2'}),
+            '/_2/_14/_17/_18/': (_2141718, {'2': '_2', '14': '_14', '17': '_17', '18': '_18'}),
             '/_2/_14/_17/': ENDPOINT_NOT_FOUND,
-            '/_2/19/': (_19, '<2>/19'),
-            '/_2/_20/': (_220, '<2>/<20>'),
-            '/_2/21/_22/': (_22122, '<2>/21/<22>'),
+            '/_2/19/': (_19, {'2': '_2'}),
+            '/_2/_20/': (_220, {'2': '_2', '20': '_20'}),
+            '/_2/21/_22/': (_22122, {'2': '_2', '22': '_22'}),
         }
 
         for test_url, expected in test_cases.items():
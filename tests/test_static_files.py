@@ -0,0 +1,207 @@
+import gzip
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from panther import Panther
+from panther._utils import accepted_encodings
+from panther.app import API
+from panther.configs import config
+from panther.exceptions import AuthenticationAPIError
+from panther.middlewares.base import HTTPMiddleware
+from panther.request import Request
+from panther.routings import find_endpoint
+from panther.static_files import StaticFiles
+from panther.test import APIClient
+
+STATIC_DIR = tempfile.TemporaryDirectory()
+STATIC_ROOT = Path(STATIC_DIR.name)
+OUTSIDE_DIR = tempfile.TemporaryDirectory()
+OUTSIDE_ROOT = Path(OUTSIDE_DIR.name)
+
+
+class DenyMiddleware(HTTPMiddleware):
+    async def __call__(self, request: Request):
+        raise AuthenticationAPIError
+
+
+@API()
+async def hello_api():
+    return 'Hello'
+
+
+static = StaticFiles(directory=STATIC_ROOT)
+small_cache_static = StaticFiles(directory=STATIC_ROOT, cache_size=10, precompressed=False)
+bypass_static = StaticFiles(directory=STATIC_ROOT, bypass_middlewares=True)
+
+urls = {
+    'hello': hello_api,
+    'static': static,
+    'small-cache': small_cache_static,
+    'bypass': bypass_static,
+}
+
+
+class TestStaticFiles(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        (STATIC_ROOT / 'css').mkdir(exist_ok=True)
+        (STATIC_ROOT / 'css' / 'app.css').write_text('body { color: red; }')
+        (STATIC_ROOT / 'app.js').write_text('console.log(1);')
+        (STATIC_ROOT / 'app.js.gz').write_bytes(gzip.compress(b'console.log(1);'))
+        (OUTSIDE_ROOT / 'secret.txt').write_text('secret')
+
+    def setUp(self) -> None:
+        app = Panther(__name__, configs=__name__, urls=urls)
+        self.client = APIClient(app=app)
+        for endpoint in (static, small_cache_static, bypass_static):
+            endpoint.cache.clear()
+
+    def tearDown(self) -> None:
+        config.refresh()
+
+    def test_find_endpoint(self):
+        assert find_endpoint('static/css/app.css') == (static, {'path': 'css/app.css'})
+        assert find_endpoint('hello/world') == (None, {})
+
+    async def test_static_file(self):
+        res = await self.client.get('static/css/app.css')
+        assert res.status_code == 200
+        assert res.body == b'body { color: red; }'
+        assert res.headers['Content-Type'] == 'text/css'
+        assert res.headers['Content-Length'] == '20'
+        assert res.headers['ETag'].startswith('"')
+        assert res.headers['Last-Modified']
+        assert [path for path, _ in static.cache.files] == ['css/app.css']
+
+    async def test_static_file_not_found(self):
+        for path in ('static/missing.css', 'static/css', 'static/', 'static/css/../app.js', 'static/./app.js'):
+            res = await self.client.get(path)
+            assert res.status_code == 404, path
+
+    async def test_static_file_outside_of_root(self):
+        secret = OUTSIDE_ROOT / 'secret.txt'
+        res = await self.client.get(f'static/{secret}')  # `static//tmp/.../secret.txt`
+        assert res.status_code == 404
+        assert res.body != b'secret'
+
+        res = await self.client.get(f'static/{"../" * len(STATIC_ROOT.parts)}{str(secret).lstrip("/")}')
+        assert res.status_code == 404
+
+        link = STATIC_ROOT / 'link.txt'
+        link.symlink_to(secret)
+        try:
+            for headers in ({}, {'Range': 'bytes=0-2'}):
+                res = await self.client.get('static/link.txt', headers=headers)
+                assert res.status_code == 404, headers
+                assert res.body != b'secret'
+        finally:
+            link.unlink()
+
+        # Symlinks inside of the root are followed
+        link.symlink_to(STATIC_ROOT / 'app.js')
+        try:
+            res = await self.client.get('static/link.txt')
+            assert res.status_code == 200
+            assert res.body == b'console.log(1);'
+        finally:
+            link.unlink()
+
+    async def test_static_file_without_extension(self):
+        (STATIC_ROOT / 'LICENSE').write_text('MIT')
+        res = await self.client.get('static/LICENSE')
+        assert res.status_code == 200
+        assert res.body == b'MIT'
+        assert res.headers['Content-Type'] == 'application/octet-stream'
+
+    async def test_static_file_method_not_allowed(self):
+        res = await self.client.post('static/app.js')
+        assert res.status_code == 405
+
+    async def test_cache_is_validated_with_mtime(self):
+        file = STATIC_ROOT / 'changing.txt'
+        file.write_text('first')
+        res = await self.client.get('static/changing.txt')
+        assert res.body == b'first'
+
+        file.write_text('second')
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        # It is not checked again in `check_interval`
+        res = await self.client.get('static/changing.txt')
+        assert res.body == b'first'
+
+        with patch('panther.static_files.time.monotonic', return_value=time.monotonic() + static.check_interval):
+            res = await self.client.get('static/changing.txt')
+        assert res.body == b'second'
+
+    async def test_cache_is_bounded(self):
+        await self.client.get('small-cache/app.js')
+        assert small_cache_static.cache.files == {}
+
+        (STATIC_ROOT / 'tiny.txt').write_text('tiny')
+        await self.client.get('small-cache/tiny.txt')
+        assert [path for path, _ in small_cache_static.cache.files] == ['tiny.txt']
+        assert small_cache_static.cache.size == 4
+
+    async def test_precompressed(self):
+        res = await self.client.get('static/app.js', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert res.status_code == 200
+        assert gzip.decompress(res.body) == b'console.log(1);'
+        assert res.headers['Content-Encoding'] == 'gzip'
+        assert res.headers['Content-Type'] == 'text/javascript'
+        assert res.headers['Vary'] == 'Accept-Encoding'
+
+        res = await self.client.get('static/app.js', headers={'Accept-Encoding': 'br, gzip;q=0'})
+        assert res.body == b'console.log(1);'
+        assert 'Content-Encoding' not in res.headers
+
+    async def test_not_modified(self):
+        res = await self.client.get('static/css/app.css')
+        res = await self.client.get('static/css/app.css', headers={'If-None-Match': res.headers['ETag']})
+        assert res.status_code == 304
+        assert res.body == b''
+
+    async def test_bypass_middlewares(self):
+        global MIDDLEWARES
+        MIDDLEWARES = [DenyMiddleware]
+        client = APIClient(app=Panther(__name__, configs=__name__, urls=urls))
+        MIDDLEWARES = []
+
+        res = await client.get('static/css/app.css')
+        assert res.status_code == 401
+        res = await client.get('hello')
+        assert res.status_code == 401
+        res = await client.get('bypass/css/app.css')
+        assert res.status_code == 200
+        assert res.body == b'body { color: red; }'
+
+    async def test_bypass_middlewares_routes_after_the_middlewares(self):
+        class StripPrefixMiddleware(HTTPMiddleware):
+            async def __call__(self, request: Request):
+                request.scope['path'] = request.path.removeprefix('/v1')
+                return await self.dispatch(request=request)
+
+        global MIDDLEWARES
+        MIDDLEWARES = [StripPrefixMiddleware]
+        client = APIClient(app=Panther(__name__, configs=__name__, urls=urls))
+        MIDDLEWARES = []
+
+        # The path which the middleware has changed is routed, not the original one
+        res = await client.get('v1/hello')
+        assert res.status_code == 200
+        assert res.data == 'Hello'
+
+        res = await client.get('v1/not-found')
+        assert res.status_code == 404
+
+        # The bypass mount itself is still served before the middlewares
+        res = await client.get('bypass/css/app.css')
+        assert res.status_code == 200
+
+    def test_accepted_encodings(self):
+        assert accepted_encodings('gzip, br;q=0.8, zstd;q=0') == {'gzip', 'br'}
+        assert accepted_encodings(None) == set()
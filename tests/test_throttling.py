@@ -1,12 +1,33 @@
 import asyncio
+import contextlib
+import math
+import multiprocessing
+import sys
+import time
+import uuid
 from datetime import datetime, timedelta
-from unittest import IsolatedAsyncioTestCase
+from multiprocessing import shared_memory
+from unittest import IsolatedAsyncioTestCase, TestCase, skipIf
+from unittest.mock import patch
 
-from panther import Panther
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from panther import Panther, throttling
 from panther.app import API
 from panther.configs import config
+from panther.exceptions import PantherError, ThrottlingAPIError
 from panther.test import APIClient
-from panther.throttling import Throttle
+from panther.throttling import (
+    LeasedThrottle,
+    MemoryThrottleStorage,
+    SharedMemoryThrottleStorage,
+    SlidingWindow,
+    Throttle,
+    TokenBucket,
+    _fallback_throttle_storage,
+    get_fallback_storage,
+)
 from panther.utils import round_datetime
 
 
@@ -25,15 +46,46 @@ async def throttling_headers_api():
     return 'ok'
 
 
+@API(throttling=TokenBucket(rate=2, duration=timedelta(seconds=10), burst=3))
+async def token_bucket_api():
+    return 'ok'
+
+
 THROTTLING = Throttle(rate=1, duration=timedelta(seconds=10))
 
 urls = {
     'without-throttling': without_throttling_api,
     'with-throttling': with_throttling_api,
     'throttling-headers': throttling_headers_api,
+    'token-bucket': token_bucket_api,
 }
 
 
+def make_request(ip: str = '127.0.0.1', path: str = '/'):
+    return type('Request', (), {'user': None, 'client': type('Client', (), {'ip': ip}), 'path': path})
+
+
+async def send(
+    throttling: Throttle,
+    number: int = 1,
+    at: float | None = None,
+    concurrently: bool = False,
+) -> list[bool]:
+    """Send `number` requests (at the `at` timestamp) and return whether each one is allowed"""
+
+    async def is_allowed() -> bool:
+        try:
+            await throttling.check_and_increment(request=make_request())
+        except ThrottlingAPIError:
+            return False
+        return True
+
+    with patch('panther.throttling.time.time', return_value=at) if at else contextlib.nullcontext():
+        if concurrently:
+            return list(await asyncio.gather(*[is_allowed() for _ in range(number)]))
+        return [await is_allowed() for _ in range(number)]
+
+
 class TestThrottling(IsolatedAsyncioTestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -100,7 +152,7 @@ class TestThrottling(IsolatedAsyncioTestCase):
         assert res.headers == {
             'Content-Type': 'application/json',
             'Content-Length': '29',
-            'Retry-After': str(int((reset_time - datetime.now()).total_seconds())),
+            'Retry-After': str(math.ceil((reset_time - datetime.now()).total_seconds())),
             'X-RateLimit-Reset': str(int(reset_time.timestamp())),
         }
 
@@ -110,3 +162,387 @@ class TestThrottling(IsolatedAsyncioTestCase):
 
         res2 = await self.client.get('without-throttling')
         assert res2.status_code == 429
+
+
+class TestThrottlingStrategies(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        _fallback_throttle_storage.clear()
+
+    async def test_deprecated_request_count(self):
+        throttling = Throttle(rate=10, duration=timedelta(hours=1))
+        request = make_request()
+        with self.assertWarns(DeprecationWarning):
+            assert await throttling.get_request_count(request) == 0
+        with self.assertWarns(DeprecationWarning):
+            await throttling.increment_request_count(request)
+        await throttling.increment(request)
+        with self.assertWarns(DeprecationWarning):
+            assert await throttling.get_request_count(request) == 2
+
+    async def test_sliding_window(self):
+        throttling = SlidingWindow(rate=10, duration=timedelta(seconds=10))
+        # The end of a window
+        assert await send(throttling, at=1009, number=10) == [True] * 10
+        # The start of the next one, the previous one is still counted (90%)
+        assert await send(throttling, at=1011, number=2) == [True, False]
+        # It slides (40% of the previous one + 1 request of this one, the rejected requests are not counted)
+        assert await send(throttling, at=1016, number=7) == [True] * 5 + [False] * 2
+        assert await send(throttling, at=1031, number=10) == [True] * 10
+
+    async def test_sliding_window_rejected_requests_are_not_counted(self):
+        throttling = SlidingWindow(rate=10, duration=timedelta(seconds=60))
+        assert await send(throttling, at=6000, number=1000) == [True] * 10 + [False] * 990
+        with (
+            patch('panther.throttling.time.time', return_value=6000),
+            self.assertRaises(ThrottlingAPIError) as captured,
+        ):
+            await throttling.check_and_increment(request=make_request())
+        # The previous window (10 requests) weighs less than 9 after the first 6 seconds of the next one
+        assert captured.exception.headers == {'Retry-After': '66', 'X-RateLimit-Reset': '6066'}
+        assert await send(throttling, at=6065, number=1) == [False]
+        assert await send(throttling, at=6067, number=2) == [True, False]
+
+    async def test_sliding_window_headers(self):
+        throttling = SlidingWindow(rate=1, duration=timedelta(seconds=10))
+        with patch('panther.throttling.time.time', return_value=1005):
+            await throttling.check_and_increment(request=make_request())
+            with self.assertRaises(ThrottlingAPIError) as captured:
+                await throttling.check_and_increment(request=make_request())
+        # The next window, when this one doesn't weigh anything
+        assert captured.exception.headers == {'Retry-After': '15', 'X-RateLimit-Reset': '1020'}
+
+    async def test_token_bucket(self):
+        throttling = TokenBucket(rate=2, duration=timedelta(seconds=10), burst=3)
+        # The burst
+        assert await send(throttling, at=1000, number=4) == [True, True, True, False]
+        # A token every 5 seconds
+        assert await send(throttling, at=1004, number=1) == [False]
+        assert await send(throttling, at=1005, number=2) == [True, False]
+        # The bucket is full again (not more than `burst`)
+        assert await send(throttling, at=1100, number=4) == [True, True, True, False]
+
+    async def test_token_bucket_headers(self):
+        throttling = TokenBucket(rate=1, duration=timedelta(seconds=10))
+        with patch('panther.throttling.time.time', return_value=1000):
+            await throttling.check_and_increment(request=make_request())
+            with self.assertRaises(ThrottlingAPIError) as captured:
+                await throttling.check_and_increment(request=make_request())
+        assert captured.exception.headers == {'Retry-After': '10', 'X-RateLimit-Reset': '1010'}
+
+    async def test_retry_after_is_rounded_up(self):
+        throttling = TokenBucket(rate=4, duration=timedelta(seconds=10))
+        assert await send(throttling, at=1000, number=4) == [True] * 4
+        with (
+            patch('panther.throttling.time.time', return_value=1002.2),
+            self.assertRaises(ThrottlingAPIError) as captured,
+        ):
+            await throttling.check_and_increment(request=make_request())
+        # A token is added at 1002.5
+        assert captured.exception.headers['Retry-After'] == '1'
+
+    async def test_token_bucket_default_burst(self):
+        throttling = TokenBucket(rate=3, duration=timedelta(seconds=3))
+        assert await send(throttling, at=1000, number=4) == [True, True, True, False]
+
+    async def test_leased_throttle_without_redis(self):
+        throttling = LeasedThrottle(rate=3, duration=timedelta(minutes=1), lease=10)
+        assert await send(throttling, at=time.time(), number=4) == [True, True, True, False]
+
+    async def test_state_per_key(self):
+        await send(SlidingWindow(rate=10, duration=timedelta(seconds=10)), at=1000, number=5)
+        await send(SlidingWindow(rate=10, duration=timedelta(seconds=10)), at=1011, number=5)
+        await send(TokenBucket(rate=10, duration=timedelta(seconds=10)), at=1000, number=5)
+        assert sorted(_fallback_throttle_storage) == [
+            '100-sliding-127.0.0.1-/',
+            '101-sliding-127.0.0.1-/',
+            'bucket-127.0.0.1-/',
+        ]
+
+
+class TestMemoryThrottleStorage(TestCase):
+    def setUp(self) -> None:
+        self.storage = MemoryThrottleStorage()
+
+    def tearDown(self) -> None:
+        config.refresh()
+
+    def at(self, now: float):
+        return patch('panther.throttling.time.time', return_value=now)
+
+    def test_incr(self):
+        with self.at(1000):
+            assert self.storage.incr('a', ttl=10) == 1
+            assert self.storage.incr('a', ttl=100) == 2
+        # The `ttl` is only set when it is created
+        with self.at(1010):
+            assert self.storage.get('a') == 0
+            assert self.storage.incr('a', ttl=10) == 1
+
+    def test_expired_buckets_are_dropped(self):
+        with self.at(1000):
+            for i in range(100):
+                self.storage.incr(f'a-{i}', ttl=5)
+            self.storage.incr('b', ttl=20)
+            self.storage.set('c', 1.5, ttl=5)
+            self.storage.set('c', 2.5, ttl=30)  # Set again, with another expiry
+        assert len(self.storage) == 102
+        assert sorted(self.storage.buckets) == [1005, 1020, 1030]
+
+        with self.at(1006):
+            assert self.storage.get('b') == 1
+        assert sorted(self.storage) == ['b', 'c']
+        assert sorted(self.storage.buckets) == [1020, 1030]
+
+        with self.at(1025):
+            assert self.storage.get('c') == 2.5
+        assert list(self.storage) == ['c']
+
+    def test_max_keys(self):
+        config.THROTTLING_MAX_KEYS = 2
+        with self.at(1000):
+            self.storage.incr('a', ttl=10)
+            self.storage.incr('b', ttl=10)
+            self.storage.incr('c', ttl=10)
+        assert list(self.storage) == ['b', 'c']
+        assert self.storage.evictions == 1
+        # The evicted keys are removed from their bucket
+        assert self.storage.buckets == {1010: {'b', 'c'}}
+
+        with self.at(1011):
+            self.storage.incr('d', ttl=10)
+        assert list(self.storage) == ['d']
+        assert self.storage.buckets == {1021: {'d'}}
+
+    def test_buckets_are_bounded(self):
+        with self.at(1000):
+            for i in range(300):
+                self.storage.set('a', i, ttl=10)
+                self.storage.incr('b', ttl=10)
+                self.storage.update('c', lambda value: (value + 1, 10))
+        assert self.storage.buckets == {1010: {'a', 'b', 'c'}}
+
+        # It is moved to the bucket of its new expiry
+        with self.at(1005.5):
+            self.storage.set('a', 1, ttl=10)
+        assert self.storage.buckets == {1010: {'b', 'c'}, 1016: {'a'}}
+        with self.at(1011):
+            assert self.storage.get('a') == 1
+        assert list(self.storage) == ['a']
+        assert self.storage.buckets == {1016: {'a'}}
+
+        # The evicted keys leave their bucket
+        config.THROTTLING_MAX_KEYS = 10
+        with self.at(1012):
+            for i in range(300):
+                self.storage.set(f'key-{i}', i, ttl=10 + i % 3)
+        assert sum(len(bucket) for bucket in self.storage.buckets.values()) == len(self.storage) == 10
+
+
+def increment_shared_counter(name: str, number: int) -> None:
+    storage = SharedMemoryThrottleStorage(name=name, max_keys=1000)
+    for _ in range(number):
+        storage.incr('counter', ttl=60)
+    storage.close()
+
+
+@skipIf(sys.platform == 'win32', 'Shared memory throttling is not supported on Windows')
+class TestSharedMemoryThrottleStorage(TestCase):
+    def setUp(self) -> None:
+        self.name = f'pthr-test-{uuid.uuid4().hex[:12]}'
+        self.storage = SharedMemoryThrottleStorage(name=self.name, max_keys=1000)
+
+    def tearDown(self) -> None:
+        self.storage.unlink()
+        self.storage.close()
+        config.refresh()
+
+    def test_shared_between_instances(self):
+        other = SharedMemoryThrottleStorage(name=self.name, max_keys=1000)
+        assert other.regions == self.storage.regions == 16
+        assert self.storage.incr('a', ttl=10) == 1
+        assert other.incr('a', ttl=10) == 2
+        other.set('b', 1.5, ttl=10)
+        assert self.storage.get('b') == 1.5
+        other.close()
+
+    def test_expiration(self):
+        with patch('panther.throttling.time.time', return_value=1000):
+            self.storage.incr('a', ttl=10)
+            self.storage.incr('a', ttl=100)  # The `ttl` is only set when it is created
+            assert self.storage.get('a') == 2
+        with patch('panther.throttling.time.time', return_value=1010):
+            assert self.storage.get('a') == 0
+            assert self.storage.incr('a', ttl=10) == 1
+
+    def test_update(self):
+        assert self.storage.update('a', lambda value: (value + 5, 10)) == (5, True)
+        assert self.storage.update('a', lambda value: None) == (5, False)
+        assert self.storage.get('a') == 5
+
+    def test_another_size(self):
+        # e.g. a segment which has outlived a change of `THROTTLING_MAX_KEYS`
+        with self.assertRaises(PantherError):
+            SharedMemoryThrottleStorage(name=self.name, max_keys=2000)
+
+    def test_name_length(self):
+        with self.assertRaises(PantherError):
+            SharedMemoryThrottleStorage(name='panther-throttling-0123456789abcdef', max_keys=10)
+
+    def test_unlink(self):
+        storage = SharedMemoryThrottleStorage(name=f'{self.name}-1', max_keys=10)
+        assert storage.lock_path.exists()
+        storage.unlink()
+        storage.close()
+        assert not storage.lock_path.exists()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=f'{self.name}-1')
+
+    def test_full_table_evicts(self):
+        storage = SharedMemoryThrottleStorage(name=f'{self.name}-small', max_keys=1)
+        for i in range(1000):
+            storage.set(f'key-{i}', i, ttl=10 + i)
+        assert storage.get('key-999') == 999
+        assert sum(storage.get(f'key-{i}', None) is not None for i in range(1000)) == 64
+        storage.unlink()
+        storage.close()
+
+    def test_clear(self):
+        self.storage.incr('a', ttl=10)
+        self.storage.clear()
+        assert self.storage.get('a') == 0
+
+    def test_between_processes(self):
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=increment_shared_counter, args=(self.name, 250)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert self.storage.get('counter') == 1000
+
+    def test_throttling_with_shared_memory(self):
+        _fallback_throttle_storage.clear()
+        config.THROTTLING_SHARED_MEMORY = True
+        with patch.object(throttling, '_shared_throttle_storage', None):
+            storage = get_fallback_storage()
+            self.addCleanup(storage.close)
+            self.addCleanup(storage.unlink)
+            assert isinstance(storage, SharedMemoryThrottleStorage)
+            assert len(storage.memory.name) <= SharedMemoryThrottleStorage.MAX_NAME_LENGTH
+            storage.clear()
+            bucket = TokenBucket(rate=2, duration=timedelta(minutes=1))
+            assert asyncio.run(send(bucket, number=3)) == [True, True, False]
+            assert len(_fallback_throttle_storage) == 0
+
+
+class TestRedisThrottling(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        app = Panther(__name__, configs=__name__, urls=urls)
+        cls.client = APIClient(app=app)
+
+    @classmethod
+    def tearDownClass(cls):
+        config.refresh()
+
+    async def asyncSetUp(self) -> None:
+        self.redis = FakeAsyncRedis()
+        self.redis.is_connected = True
+        await self.redis.flushall()
+        patcher = patch('panther.throttling.redis', self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self) -> None:
+        await self.redis.aclose()
+
+    async def test_concurrent_requests(self):
+        throttling = Throttle(rate=3, duration=timedelta(minutes=1))
+        results = await send(throttling, number=10, concurrently=True)
+        assert sorted(results) == [False] * 7 + [True] * 3
+
+        keys = await self.redis.keys()
+        assert len(keys) == 1
+        assert int(await self.redis.get(keys[0])) == 10
+        assert 0 < await self.redis.pttl(keys[0]) <= 90_000
+
+    async def test_one_round_trip(self):
+        throttling = Throttle(rate=1, duration=timedelta(seconds=10))
+        request = make_request()
+        with patch.object(self.redis, 'execute_command', wraps=self.redis.execute_command) as execute_command:
+            assert (await throttling.increment(request))[0] == 1
+            count, reset_time = await throttling.increment(request)
+        # `MULTI` is sent as a pipeline, not as separate commands
+        execute_command.assert_not_called()
+        assert count == 2
+        assert reset_time == pytest.approx((throttling.time_window + throttling.duration).timestamp(), abs=0.1)
+
+    async def test_throttling_header(self):
+        await self.client.get('throttling-headers')
+
+        res = await self.client.get('throttling-headers')
+        assert res.status_code == 429
+        reset_time = round_datetime(datetime.now(), timedelta(seconds=1)) + timedelta(seconds=1)
+        assert res.headers['Retry-After'] == str(math.ceil((reset_time - datetime.now()).total_seconds()))
+        assert res.headers['X-RateLimit-Reset'] == str(int(reset_time.timestamp()))
+
+    async def test_concurrent_sliding_window(self):
+        throttling = SlidingWindow(rate=3, duration=timedelta(seconds=10))
+        results = await send(throttling, number=10, concurrently=True)
+        assert sorted(results) == [False] * 7 + [True] * 3
+        # Only the allowed requests are counted
+        keys = await self.redis.keys()
+        assert len(keys) == 1
+        assert int(await self.redis.get(keys[0])) == 3
+
+    async def test_sliding_window(self):
+        throttling = SlidingWindow(rate=10, duration=timedelta(seconds=10))
+        assert await send(throttling, at=1009, number=12) == [True] * 10 + [False] * 2
+        assert await send(throttling, at=1016, number=7) == [True] * 6 + [False]
+        with (
+            patch('panther.throttling.time.time', return_value=1016),
+            self.assertRaises(ThrottlingAPIError) as captured,
+        ):
+            await throttling.check_and_increment(request=make_request())
+        assert captured.exception.headers == {'Retry-After': '1', 'X-RateLimit-Reset': '1017'}
+
+    async def test_concurrent_token_bucket(self):
+        responses = await asyncio.gather(*[self.client.get('token-bucket') for _ in range(10)])
+        assert sorted(res.status_code for res in responses) == [200] * 3 + [429] * 7
+        keys = await self.redis.keys()
+        assert len(keys) == 1
+        assert 0 < await self.redis.pttl(keys[0]) <= 15_000
+
+    async def test_token_bucket_one_round_trip(self):
+        throttling = TokenBucket(rate=2, duration=timedelta(seconds=10))
+        await send(throttling)  # The script is loaded (`EVAL`) once
+        with patch.object(self.redis, 'execute_command', wraps=self.redis.execute_command) as execute_command:
+            assert await send(throttling, number=2) == [True, False]
+        assert execute_command.call_count == 2
+        assert all(call.args[0] == 'EVALSHA' for call in execute_command.call_args_list)
+
+    async def test_leased_throttle(self):
+        throttling = LeasedThrottle(rate=250, duration=timedelta(minutes=1), lease=100)
+        with patch.object(self.redis, 'pipeline', wraps=self.redis.pipeline) as pipeline:
+            results = await send(throttling, number=300)
+        assert results == [True] * 250 + [False] * 50
+        # 3 leases (100, 100 & 50 tokens) & another one which finds the window used up, then it is known locally
+        assert pipeline.call_count == 4
+        keys = await self.redis.keys()
+        assert int(await self.redis.get(keys[0])) == 400
+
+    async def test_leased_throttle_between_workers(self):
+        worker_1 = LeasedThrottle(rate=150, duration=timedelta(minutes=1), lease=100)
+        worker_2 = LeasedThrottle(rate=150, duration=timedelta(minutes=1), lease=100)
+        assert await send(worker_1, number=1) == [True]
+        # `worker_1` holds 99 unused tokens, so `worker_2` gets the other 50
+        assert await send(worker_2, number=60) == [True] * 50 + [False] * 10
+        assert await send(worker_1, number=100) == [True] * 99 + [False]
+
+    async def test_leased_throttle_headers(self):
+        throttling = LeasedThrottle(rate=1, duration=timedelta(minutes=1), lease=10)
+        await send(throttling)
+        with self.assertRaises(ThrottlingAPIError) as captured:
+            await throttling.check_and_increment(request=make_request())
+        reset_time = (throttling.time_window + throttling.duration).timestamp()
+        assert captured.exception.headers['X-RateLimit-Reset'] == str(round(reset_time))